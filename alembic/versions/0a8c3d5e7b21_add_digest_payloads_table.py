@@ -0,0 +1,38 @@
+"""add_digest_payloads_table
+
+Revision ID: 0a8c3d5e7b21
+Revises: f5b7a2c9e031
+Create Date: 2026-10-19 16:41:12.558017
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision: str = "0a8c3d5e7b21"
+down_revision: str | Sequence[str] | None = "f5b7a2c9e031"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """
+    Add digest_payloads for pre-rendered peptides responses.
+
+    Existing digests get no payload; the endpoint assembles theirs from rows.
+    """
+    op.create_table(
+        "digest_payloads",
+        sa.Column("digest_id", sa.String(length=36), nullable=False),
+        sa.Column("content", sa.LargeBinary(length=2**24 - 1), nullable=False),
+        sa.ForeignKeyConstraint(["digest_id"], ["digests.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("digest_id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop digest_payloads."""
+    op.drop_table("digest_payloads")
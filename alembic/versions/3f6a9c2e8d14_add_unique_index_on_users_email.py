@@ -0,0 +1,48 @@
+"""add_unique_index_on_users_email
+
+Revision ID: 3f6a9c2e8d14
+Revises: 5b2e7d41c0a9
+Create Date: 2026-10-19 10:04:27.551930
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision: str = "3f6a9c2e8d14"
+down_revision: str | Sequence[str] | None = "5b2e7d41c0a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """
+    Add unique index on users.email backing login lookups and the user upsert.
+
+    Fails with the offending addresses if duplicate emails exist; merge those
+    users before upgrading.
+    """
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT email FROM users GROUP BY email HAVING COUNT(*) > 1 LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot add unique index on users.email, duplicate emails: {duplicates}"
+        )
+
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+
+
+def downgrade() -> None:
+    """Remove unique index on users.email."""
+    op.drop_index(op.f("ix_users_email"), table_name="users")
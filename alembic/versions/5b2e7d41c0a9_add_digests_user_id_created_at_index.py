@@ -0,0 +1,31 @@
+"""add_digests_user_id_created_at_index
+
+Revision ID: 5b2e7d41c0a9
+Revises: <rev_id>
+Create Date: 2026-10-19 09:12:40.318204
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision: str = "5b2e7d41c0a9"
+down_revision: str | Sequence[str] | None = "<rev_id>"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add composite index backing keyset pagination of a user's digests."""
+    op.create_index(
+        "ix_digests_user_id_created_at",
+        "digests",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Remove composite index on digests (user_id, created_at)."""
+    op.drop_index("ix_digests_user_id_created_at", table_name="digests")
@@ -0,0 +1,50 @@
+"""add_criteria_mask_to_peptides
+
+Revision ID: b7d3e9a14c52
+Revises: 3f6a9c2e8d14
+Create Date: 2026-10-19 11:42:08.316254
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision: str = "b7d3e9a14c52"
+down_revision: str | Sequence[str] | None = "3f6a9c2e8d14"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """
+    Add peptides.criteria_mask and backfill it from peptide_criteria.
+
+    Bit (rank - 1) is set for every criteria the peptide is linked to. The
+    backfill runs one UPDATE per criteria, so its cost is bounded by the size of
+    the criteria catalogue rather than the number of peptides. The join table is
+    left in place.
+    """
+    op.add_column(
+        "peptides",
+        sa.Column("criteria_mask", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    bind = op.get_bind()
+    criteria = bind.execute(sa.text("SELECT id, `rank` FROM criteria")).all()
+    for criteria_id, rank in criteria:
+        bind.execute(
+            sa.text(
+                "UPDATE peptides SET criteria_mask = criteria_mask | :bit "
+                "WHERE id IN (SELECT peptide_id FROM peptide_criteria "
+                "WHERE criteria_id = :criteria_id)"
+            ),
+            {"bit": 1 << (rank - 1), "criteria_id": criteria_id},
+        )
+
+
+def downgrade() -> None:
+    """Remove peptides.criteria_mask."""
+    op.drop_column("peptides", "criteria_mask")
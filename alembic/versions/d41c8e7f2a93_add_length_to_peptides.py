@@ -0,0 +1,61 @@
+"""add_length_to_peptides
+
+Revision ID: d41c8e7f2a93
+Revises: b7d3e9a14c52
+Create Date: 2026-10-19 13:18:51.702417
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+from app.core import settings
+
+revision: str = "d41c8e7f2a93"
+down_revision: str | Sequence[str] | None = "b7d3e9a14c52"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """
+    Add peptides.length, backfilled from the stored sequences, and make
+    peptides.sequence nullable for compact (position, length) storage.
+
+    With COMPACT_PEPTIDE_STORAGE enabled, existing peptides are converted too:
+    their sequence is cleared wherever it equals the slice of the digest
+    sequence it would be read back from. With the setting off (the default),
+    existing rows are left untouched and keep their sequences.
+    """
+    op.add_column("peptides", sa.Column("length", sa.Integer(), nullable=True))
+    op.execute("UPDATE peptides SET length = LENGTH(sequence)")
+    op.alter_column("peptides", "length", existing_type=sa.Integer(), nullable=False)
+    op.alter_column(
+        "peptides", "sequence", existing_type=sa.String(length=500), nullable=True
+    )
+    if settings.COMPACT_PEPTIDE_STORAGE:
+        op.execute(
+            "UPDATE peptides SET sequence = NULL WHERE sequence = ("
+            "SELECT SUBSTR(digests.sequence, peptides.position, peptides.length) "
+            "FROM digests WHERE digests.id = peptides.digest_id"
+            ")"
+        )
+
+
+def downgrade() -> None:
+    """
+    Restore compactly stored peptide sequences from their digests, make
+    peptides.sequence required again and remove peptides.length.
+    """
+    op.execute(
+        "UPDATE peptides SET sequence = ("
+        "SELECT SUBSTR(digests.sequence, peptides.position, peptides.length) "
+        "FROM digests WHERE digests.id = peptides.digest_id"
+        ") WHERE sequence IS NULL"
+    )
+    op.alter_column(
+        "peptides", "sequence", existing_type=sa.String(length=500), nullable=False
+    )
+    op.drop_column("peptides", "length")
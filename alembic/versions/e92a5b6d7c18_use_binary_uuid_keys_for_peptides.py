@@ -0,0 +1,98 @@
+"""use_binary_uuid_keys_for_peptides
+
+Revision ID: e92a5b6d7c18
+Revises: d41c8e7f2a93
+Create Date: 2026-10-19 14:06:33.184920
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision: str = "e92a5b6d7c18"
+down_revision: str | Sequence[str] | None = "d41c8e7f2a93"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (table, column) pairs converted between CHAR(36) and BINARY(16)
+UUID_COLUMNS = [
+    ("peptides", "id"),
+    ("peptide_criteria", "id"),
+    ("peptide_criteria", "peptide_id"),
+]
+
+
+def _drop_peptide_foreign_keys() -> None:
+    """Drop the (unnamed) foreign keys from peptide_criteria to peptides."""
+    inspector = sa.inspect(op.get_bind())
+    for foreign_key in inspector.get_foreign_keys("peptide_criteria"):
+        if foreign_key["referred_table"] == "peptides":
+            op.drop_constraint(
+                foreign_key["name"], "peptide_criteria", type_="foreignkey"
+            )
+
+
+def _convert_uuid_columns(new_type: sa.types.TypeEngine, conversion: str) -> None:
+    """
+    Rebuild the peptide key columns as ``new_type``, filling them by applying the
+    SQL function ``conversion`` to the old values.
+    """
+    _drop_peptide_foreign_keys()
+    op.drop_constraint("uq_peptide_criteria", "peptide_criteria", type_="unique")
+    op.drop_index(op.f("ix_peptide_criteria_peptide_id"), table_name="peptide_criteria")
+
+    for table, column in UUID_COLUMNS:
+        op.add_column(table, sa.Column(f"{column}_new", new_type, nullable=True))
+        op.execute(f"UPDATE {table} SET {column}_new = {conversion}({column})")
+
+    for table in ("peptide_criteria", "peptides"):
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY")
+
+    for table, column in UUID_COLUMNS:
+        op.drop_column(table, column)
+        op.alter_column(
+            table,
+            f"{column}_new",
+            new_column_name=column,
+            existing_type=new_type,
+            nullable=False,
+        )
+
+    op.create_primary_key("pk_peptides", "peptides", ["id"])
+    op.create_primary_key("pk_peptide_criteria", "peptide_criteria", ["id"])
+    op.create_index(
+        op.f("ix_peptide_criteria_peptide_id"),
+        "peptide_criteria",
+        ["peptide_id"],
+        unique=False,
+    )
+    op.create_unique_constraint(
+        "uq_peptide_criteria", "peptide_criteria", ["peptide_id", "criteria_id"]
+    )
+    op.create_foreign_key(
+        None,
+        "peptide_criteria",
+        "peptides",
+        ["peptide_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def upgrade() -> None:
+    """
+    Store peptides.id, peptide_criteria.id and peptide_criteria.peptide_id as
+    BINARY(16) instead of CHAR(36) UUID strings.
+
+    The application still reads and writes the string form, so peptide ids in
+    API responses do not change. Requires MySQL 8 (UUID_TO_BIN).
+    """
+    _convert_uuid_columns(sa.BINARY(16), "UUID_TO_BIN")
+
+
+def downgrade() -> None:
+    """Store the peptide key columns as 36-character UUID strings again."""
+    _convert_uuid_columns(sa.String(length=36), "BIN_TO_UUID")
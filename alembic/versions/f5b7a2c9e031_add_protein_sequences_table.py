@@ -0,0 +1,79 @@
+"""add_protein_sequences_table
+
+Revision ID: f5b7a2c9e031
+Revises: e92a5b6d7c18
+Create Date: 2026-10-19 15:27:40.091352
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision: str = "f5b7a2c9e031"
+down_revision: str | Sequence[str] | None = "e92a5b6d7c18"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+FK_NAME = "fk_digests_sequence_hash_protein_sequences"
+
+
+def upgrade() -> None:
+    """
+    Move digest sequences into the content-addressed protein_sequences table.
+
+    Each distinct sequence is stored once under its SHA-256; digests keep only
+    the hash. SHA2(sequence, 256) matches ProteinSequence.hash_sequence.
+    """
+    op.create_table(
+        "protein_sequences",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("sequence", sa.String(length=3000), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.execute(
+        "INSERT INTO protein_sequences (hash, sequence) "
+        "SELECT SHA2(sequence, 256), MIN(sequence) FROM digests "
+        "GROUP BY SHA2(sequence, 256)"
+    )
+
+    op.add_column(
+        "digests", sa.Column("sequence_hash", sa.String(length=64), nullable=True)
+    )
+    op.execute("UPDATE digests SET sequence_hash = SHA2(sequence, 256)")
+    op.alter_column(
+        "digests", "sequence_hash", existing_type=sa.String(length=64), nullable=False
+    )
+    op.create_index(
+        op.f("ix_digests_sequence_hash"), "digests", ["sequence_hash"], unique=False
+    )
+    op.create_foreign_key(
+        FK_NAME,
+        "digests",
+        "protein_sequences",
+        ["sequence_hash"],
+        ["hash"],
+        ondelete="RESTRICT",
+    )
+    op.drop_column("digests", "sequence")
+
+
+def downgrade() -> None:
+    """Copy sequences back onto digests and drop protein_sequences."""
+    op.add_column(
+        "digests",
+        sa.Column(
+            "sequence", sa.String(length=3000), nullable=False, server_default=""
+        ),
+    )
+    op.execute(
+        "UPDATE digests SET sequence = ("
+        "SELECT protein_sequences.sequence FROM protein_sequences "
+        "WHERE protein_sequences.hash = digests.sequence_hash)"
+    )
+    op.drop_constraint(FK_NAME, "digests", type_="foreignkey")
+    op.drop_index(op.f("ix_digests_sequence_hash"), table_name="digests")
+    op.drop_column("digests", "sequence_hash")
+    op.drop_table("protein_sequences")
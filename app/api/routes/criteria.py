@@ -1,11 +1,17 @@
 import logging
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import verify_internal_api_key
-from app.db.session import get_db
-from app.models import Criteria
+from app.db.session import get_async_read_db
+from app.helpers import (
+    build_etag,
+    criteria_cache_control,
+    etag_matches,
+    not_modified_response,
+    set_cache_headers,
+)
+from app.models.criteria_registry import aget_criteria_registry
 from app.schemas.digest import CriteriaResponse
 
 logger = logging.getLogger(__name__)
@@ -18,12 +24,23 @@ criteria_router = APIRouter(prefix="/criteria", tags=["criteria"])
     response_model=list[CriteriaResponse],
     status_code=status.HTTP_200_OK,
 )
-def list_criteria(
-    api_key: str = Depends(verify_internal_api_key),
-    session: Session = Depends(get_db),
-) -> list[CriteriaResponse]:
+async def list_criteria(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_read_db),
+):
     """
     Return all QPeptide criteria (code, goal, rationale, is_optional, id, rank).
+
+    Criteria are served from the in-memory criteria registry. The response
+    carries an ETag derived from the registry version; a matching If-None-Match
+    returns 304 Not Modified.
     """
-    criteria_records = Criteria.get_all_ordered_by_rank(session)
-    return [CriteriaResponse.model_validate(c) for c in criteria_records]
+    registry = await aget_criteria_registry(session)
+
+    etag = build_etag("criteria", registry.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag, criteria_cache_control())
+
+    set_cache_headers(response, etag, criteria_cache_control())
+    return [CriteriaResponse.model_validate(c) for c in registry.records]
@@ -1,25 +1,70 @@
 import logging
-
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import ValidationError
 from sqlalchemy.exc import DatabaseError, IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import verify_internal_api_key
-from app.db.session import get_db
+from app.core import settings
+from app.db.replica import mark_write
+from app.db.session import (
+    LazyAsyncSession,
+    get_async_primary_db,
+    get_async_read_db,
+    get_db,
+)
 from app.domain import ProteinDomain
-from app.enums import DigestStatusEnum
+from app.enums import DigestStatusEnum, PeptideResponseFormatEnum
 from app.helpers import (
+    ARTIFACT_MEDIA_TYPE,
+    ARTIFACT_SUFFIX,
+    NDJSON_MEDIA_TYPE,
+    PAYLOAD_MEDIA_TYPE,
+    aensure_digest_artifact,
+    afind_digest_read_your_writes_or_raise,
+    afind_digests_read_your_writes_or_raise,
+    digest_cache_control,
+    digest_etag,
+    digest_payload_response,
+    digest_peptides_json,
+    etag_matches,
+    fieldset_response,
+    not_modified_response,
+    remove_digest_artifacts,
+    request_accepts_ndjson,
     request_criteria_ids_valid_or_exception,
-    request_within_digest_limit_or_exception,
+    request_user_within_digest_limit_or_exception,
+    set_cache_headers,
+    stream_digest_peptides_export,
+    stream_digest_peptides_ndjson,
 )
-from app.models import Digest, Peptide, User
+from app.models import Digest, DigestPayload, Peptide, User
+from app.models.criteria_registry import aget_criteria_registry
 from app.schemas.digest import (
+    DigestBatchPeptidesQueryParams,
     DigestJobRequest,
     DigestJobResponse,
+    DigestListQueryParams,
     DigestListResponse,
+    DigestPeptidesBatchResponse,
+    DigestPeptidesColumnarResponse,
     DigestPeptidesResponse,
+    DigestQueryParams,
     DigestResponse,
+    PeptideExportQueryParams,
+    PeptideQueryParams,
 )
 from app.tasks import process_digest_job
 
@@ -36,18 +81,21 @@ digest_router = APIRouter(prefix="/digest", tags=["digest"])
 def create_digest_job(
     job_request: DigestJobRequest,
     background_tasks: BackgroundTasks,
-    api_key: str = Depends(verify_internal_api_key),
+    response: Response,
     session: Session = Depends(get_db),
 ):
     """
     Create a new digest job.
 
+    The user and digest-limit checks share one query, criteria IDs are checked
+    against the in-memory criteria registry, and the digest and its criteria
+    links are written in one flush without a refresh.
+
     Returns the digest job ID.
     """
     logger.info(f"Received digest job request: user_id={job_request.user_id}")
 
-    user: User = User.find_one_by_or_raise(session, id=job_request.user_id)
-    request_within_digest_limit_or_exception(user.id, session)
+    request_user_within_digest_limit_or_exception(job_request.user_id, session)
     request_criteria_ids_valid_or_exception(job_request.criteria_ids, session)
 
     logger.debug(f"Digest checks passed for user_id={job_request.user_id}")
@@ -55,24 +103,35 @@ def create_digest_job(
     try:
         digest: Digest = Digest.create(
             session,
-            flush=True,
+            commit=False,
+            refresh=False,
             status=DigestStatusEnum.PROCESSING,
-            user_id=user.id,
+            user_id=job_request.user_id,
             protease=job_request.protease,
             protein_name=job_request.protein_name,
             sequence=job_request.sequence,
             criteria_ids=job_request.criteria_ids,
         )
 
+        # read before commit, which would expire the digest's attributes
+        digest_id = digest.id
         protein_domain: ProteinDomain = ProteinDomain.from_digest(digest)
+
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        mark_write(response, job_request.user_id)
         background_tasks.add_task(process_digest_job, protein_domain)
 
         logger.info(
-            f"Background task queued for digest_id={digest.id} and user_id={job_request.user_id}"
+            f"Background task queued for digest_id={digest_id} and user_id={job_request.user_id}"
         )
 
         return DigestJobResponse(
-            digest_id=digest.id,
+            digest_id=digest_id,
         )
     except IntegrityError as e:
         logger.error(
@@ -98,26 +157,123 @@ def create_digest_job(
     response_model=DigestListResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_digests_by_id(
+async def get_digests_by_id(
     user_id: str,
-    api_key: str = Depends(verify_internal_api_key),
-    session: Session = Depends(get_db),
+    params: Annotated[DigestListQueryParams, Query()],
+    session: AsyncSession = Depends(get_async_read_db),
 ):
     """
-    Get all digests for a user by id.
+    Get digests for a user by id, newest first.
 
     - user_id: User's id
     - Returns list of digests (without peptides or peptide_criteria)
+    - The protein sequence is only included with include_sequence=true
+    - Paged by limit (20 by default, at most 100): a full page returns
+      next_cursor; pass it back as cursor to get the following page
+    - fields (e.g. fields=id,status) selects and returns only those fields
     """
     logger.info(f"Received digest list request: user_id={user_id}")
 
-    digests: list[Digest] = Digest.find_by(session, user_id=user_id)
+    digests = await Digest.afind_page_by_user_id(
+        session,
+        user_id,
+        include_sequence=params.include_sequence,
+        limit=params.limit,
+        before=params.before,
+        fields=params.fields,
+    )
 
     logger.info(f"Found {len(digests)} digests for user_id={user_id}")
 
-    return DigestListResponse(
-        digests=[DigestResponse.model_validate(digest) for digest in digests]
+    next_cursor = (
+        DigestListQueryParams.encode_cursor(digests[-1].created_at, digests[-1].id)
+        if len(digests) == params.limit
+        else None
+    )
+
+    digest_list = DigestListResponse(
+        digests=[
+            DigestResponse.from_fields(digest, params.fields) for digest in digests
+        ],
+        next_cursor=next_cursor,
     )
+    if params.fields:
+        return fieldset_response(digest_list)
+    return digest_list
+
+
+@digest_router.get(
+    "/peptides/{user_id}",
+    response_model=DigestPeptidesBatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_peptides_for_digests(
+    user_id: str,
+    params: Annotated[DigestBatchPeptidesQueryParams, Query()],
+    session: AsyncSession = Depends(get_async_read_db),
+    primary: LazyAsyncSession = Depends(get_async_primary_db),
+):
+    """
+    Get the peptides of several of a user's digests in one request.
+
+    - user_id: User's id
+    - digest_ids: Digest IDs, repeated (?digest_ids=a&digest_ids=b)
+    - Returns each digest's peptides in rank order, in the order requested, and
+      the criteria used by any of them once; each digest lists the ranks of its
+      own criteria. A digest that is still processing has no peptides yet.
+    - Returns 404 if the user does not exist or any digest does not belong to
+      the user
+    - Ownership of all digests is checked with one query and their peptides are
+      loaded with one more.
+    """
+    logger.info(
+        f"Received multi-digest peptides request: user_id={user_id}, "
+        f"digest_ids={params.digest_ids}"
+    )
+
+    try:
+        await User.aexists_by_or_raise(session, id=user_id)
+        digests, session = await afind_digests_read_your_writes_or_raise(
+            session,
+            primary,
+            user_id=user_id,
+            digest_ids=params.digest_ids,
+            include_sequence=True,
+        )
+
+        await aget_criteria_registry(session)
+        peptides = await Peptide.afind_by_digest_ids_ordered_by_rank(
+            session, {digest.id: digest.sequence for digest in digests}
+        )
+
+        logger.info(
+            f"Successfully returned multi-digest peptides request: user_id={user_id}, "
+            f"digests={len(digests)} number={sum(map(len, peptides.values()))}"
+        )
+
+        return DigestPeptidesBatchResponse.from_digests(digests, peptides)
+
+    except HTTPException:
+        raise
+    except (DatabaseError, OperationalError) as e:
+        logger.error(
+            f"Database error getting peptides: user_id={user_id}, "
+            f"digest_ids={params.digest_ids}, error={str(e)}",
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="A database error occurred while retrieving peptides. Please try again later.",
+        ) from e
+    except ValueError as e:
+        logger.error(
+            f"Value error getting peptides: user_id={user_id}, "
+            f"digest_ids={params.digest_ids}, error={str(e)}",
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
 
 
 @digest_router.delete(
@@ -127,7 +283,7 @@ def get_digests_by_id(
 def delete_digest_by_id(
     user_id: str,
     digest_id: str,
-    api_key: str = Depends(verify_internal_api_key),
+    response: Response,
     session: Session = Depends(get_db),
 ):
     """
@@ -137,19 +293,22 @@ def delete_digest_by_id(
     - digest_id: Digest ID to delete
     - Returns 204 No Content on success
     - Returns 404 if user or digest not found, or if digest doesn't belong to user
+
+    The digest is removed with a single DELETE; its peptides, peptide criteria
+    and criteria links are removed by the database's ON DELETE CASCADE.
     """
     logger.info(
         f"Received digest delete request: user_id={user_id}, digest_id={digest_id}"
     )
 
-    digest: Digest = Digest.find_one_by_or_raise(
-        session,
-        user_id=user_id,
-        id=digest_id,
-    )
-
     try:
-        Digest.delete(session, digest)
+        Digest.delete_by_or_raise(
+            session,
+            user_id=user_id,
+            id=digest_id,
+        )
+        mark_write(response, user_id)
+        remove_digest_artifacts([digest_id])
         logger.info(
             f"Successfully deleted digest: user_id={user_id}, digest_id={digest_id}"
         )
@@ -169,51 +328,180 @@ def delete_digest_by_id(
     "/{user_id}/{digest_id}/peptides",
     status_code=status.HTTP_200_OK,
 )
-def get_digest_peptides_by_id(
+async def get_digest_peptides_by_id(
     user_id: str,
     digest_id: str,
-    api_key: str = Depends(verify_internal_api_key),
-    session: Session = Depends(get_db),
+    response: Response,
+    params: Annotated[PeptideQueryParams, Query()],
+    accept: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_read_db),
+    primary: LazyAsyncSession = Depends(get_async_primary_db),
 ):
     """
     Get digest peptides by ID for a specific user.
 
     - user_id: User's id
     - digest_id: Digest ID
+    - Send `Accept: application/x-ndjson` to stream the response: the first line
+      holds the digest id and criteria, every following line is one peptide in
+      rank order.
+    - format=columnar returns peptides as parallel arrays with a criteria bitmask
+      per peptide (bit rank - 1 set for each matched criteria rank).
+    - Pagination (min_rank, max_rank, after_rank + limit) and filters
+      (require_criteria, exclude_criteria, length and pI ranges) are applied in
+      the database; a page filled to `limit` returns next_after_rank for the
+      next request, and a shorter page is the last one (next_after_rank null).
+      NDJSON responses carry no cursor: the client resumes with after_rank set
+      to the rank of the last line it received.
+    - The response carries an ETag derived from the digest id, status and
+      updated_at; a matching If-None-Match returns 304 without loading peptides.
+    - Without filters, pagination or format, a completed digest is served from
+      the payload rendered when its job finished (gzip-encoded if the client
+      accepts it); older digests are assembled from peptide rows and serialized
+      the same way, so both bodies are byte-identical under the same ETag.
+    - fields (e.g. fields=sequence,rank,criteria_ranks) reads and returns only
+      those peptide fields, in every layout.
+    - Reads go to the read replica; a digest the replica has not seen complete
+      yet is read from the primary.
     """
     logger.info(f"Received peptides request: user_id={user_id}, digest_id={digest_id}")
 
     try:
-        User.find_one_by_or_raise(
+        await User.aexists_by_or_raise(
             session,
             id=user_id,
         )
 
-        digest: Digest = Digest.find_one_by_or_raise(
+        digest, session = await afind_digest_read_your_writes_or_raise(
             session,
+            primary,
             user_id=user_id,
-            id=digest_id,
+            digest_id=digest_id,
         )
 
-        peptides: list[Peptide] = Peptide.find_by_digest_id_ordered_by_rank_or_raise(
-            session,
-            digest_id=digest_id,
+        stream = request_accepts_ndjson(accept)
+        etag = digest_etag(
+            digest,
+            "peptides",
+            NDJSON_MEDIA_TYPE if stream else params.format.value,
+            params.model_dump_json(exclude_defaults=True),
+        )
+        cache_control = digest_cache_control(digest)
+        if etag_matches(if_none_match, etag):
+            logger.info(
+                f"Peptides not modified: user_id={user_id}, digest_id={digest_id}"
+            )
+            return not_modified_response(etag, cache_control)
+
+        full_document = (
+            not stream
+            and not params.is_active
+            and not params.fields
+            and params.format == PeptideResponseFormatEnum.ROWS
+        )
+        if full_document:
+            payload = await DigestPayload.afind_content(session, digest_id)
+            if payload is not None:
+                logger.info(
+                    f"Serving stored peptides payload: user_id={user_id}, "
+                    f"digest_id={digest_id}"
+                )
+                return digest_payload_response(
+                    payload, accept_encoding, etag, cache_control
+                )
+
+        await aget_criteria_registry(session)
+        await digest.awaitable_attrs.digest_criteria
+
+        if stream:
+            peptide_stream = (
+                await Peptide.astream_by_digest_id_ordered_by_rank_or_raise(
+                    session,
+                    digest_id=digest_id,
+                    filters=params,
+                    digest_sequence=await digest.aload_sequence(),
+                    batch_size=settings.PEPTIDE_STREAM_BATCH_SIZE,
+                    fields=params.fields,
+                )
+            )
+
+            logger.info(
+                f"Streaming peptides request: user_id={user_id}, digest_id={digest_id}"
+            )
+
+            streaming_response = StreamingResponse(
+                stream_digest_peptides_ndjson(
+                    digest.id,
+                    digest.get_criteria_ordered_by_rank(),
+                    peptide_stream,
+                    batch_size=settings.PEPTIDE_STREAM_BATCH_SIZE,
+                    fields=params.fields,
+                ),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+            set_cache_headers(streaming_response, etag, cache_control)
+            return streaming_response
+
+        peptides: list[Peptide] = (
+            await Peptide.afind_by_digest_id_ordered_by_rank_or_raise(
+                session,
+                digest_id=digest_id,
+                filters=params,
+                digest_sequence=await digest.aload_sequence(),
+                fields=params.fields,
+            )
         )
 
         criteria_for_digest = digest.get_criteria_ordered_by_rank()
 
-        response = DigestPeptidesResponse.from_peptides(
-            digest.id, peptides, criteria_for_digest
+        next_after_rank = (
+            peptides[-1].rank
+            if params.limit is not None and len(peptides) == params.limit
+            else None
         )
 
+        peptides_response: DigestPeptidesResponse | DigestPeptidesColumnarResponse
+        if params.format == PeptideResponseFormatEnum.COLUMNAR:
+            peptides_response = DigestPeptidesColumnarResponse.from_peptides(
+                digest.id,
+                peptides,
+                criteria_for_digest,
+                next_after_rank=next_after_rank,
+                fields=params.fields,
+            )
+        else:
+            peptides_response = DigestPeptidesResponse.from_peptides(
+                digest.id,
+                peptides,
+                criteria_for_digest,
+                next_after_rank=next_after_rank,
+                fields=params.fields,
+            )
+
         logger.info(
             f"Successfully returned peptides request: user_id={user_id}, digest_id={digest_id} number={len(peptides)}"
         )
 
-        return response
+        if params.fields:
+            fieldset = fieldset_response(peptides_response)
+            set_cache_headers(fieldset, etag, cache_control)
+            return fieldset
+
+        if full_document and isinstance(peptides_response, DigestPeptidesResponse):
+            # rendered as stored payloads are, since both share the same ETag
+            document = Response(
+                digest_peptides_json(peptides_response), media_type=PAYLOAD_MEDIA_TYPE
+            )
+            set_cache_headers(document, etag, cache_control)
+            return document
+
+        set_cache_headers(response, etag, cache_control)
+        return peptides_response
 
     except HTTPException:
-        # Re-raise HTTPExceptions (404s from find_one_by_or_raise methods)
+        # Re-raise HTTPExceptions (404s from the *_or_raise methods)
         # These should pass through unchanged
         raise
     except (DatabaseError, OperationalError) as e:
@@ -273,18 +561,181 @@ def get_digest_peptides_by_id(
     response_model=DigestResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_digest_by_id(
+async def get_digest_by_id(
     user_id: str,
     digest_id: str,
-    api_key: str = Depends(verify_internal_api_key),
-    session: Session = Depends(get_db),
+    response: Response,
+    params: Annotated[DigestQueryParams, Query()],
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_read_db),
+    primary: LazyAsyncSession = Depends(get_async_primary_db),
 ):
-    """Get a single digest by ID for a specific user."""
-    digest: Digest = Digest.find_one_by_or_raise(
+    """
+    Get a single digest by ID for a specific user.
+
+    The response carries an ETag; a matching If-None-Match returns 304. A digest
+    the read replica has not seen complete yet is read from the primary. With
+    fields (e.g. fields=status,updated_at), only those fields are read and
+    returned; the protein sequence is not read unless it is one of them.
+    """
+    digest, _ = await afind_digest_read_your_writes_or_raise(
         session,
+        primary,
         user_id=user_id,
-        id=digest_id,
+        digest_id=digest_id,
+        fields=params.fields,
     )
 
+    etag = digest_etag(digest, "digest", *(field.value for field in params.fields))
+    cache_control = digest_cache_control(digest)
+    if etag_matches(if_none_match, etag):
+        logger.info(f"Digest not modified: digest={digest_id} user_id={user_id}")
+        return not_modified_response(etag, cache_control)
+
     logger.info(f"Found digest={digest_id} for user_id={user_id}")
-    return DigestResponse.model_validate(digest)
+    if not params.fields:
+        await digest.aload_sequence()
+    digest_response = DigestResponse.from_fields(digest, params.fields)
+    if params.fields:
+        fieldset = fieldset_response(digest_response)
+        set_cache_headers(fieldset, etag, cache_control)
+        return fieldset
+
+    set_cache_headers(response, etag, cache_control)
+    return digest_response
+
+
+@digest_router.get(
+    "/{user_id}/{digest_id}/artifact",
+    status_code=status.HTTP_200_OK,
+    response_class=FileResponse,
+)
+async def get_digest_artifact_by_id(
+    user_id: str,
+    digest_id: str,
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_read_db),
+    primary: LazyAsyncSession = Depends(get_async_primary_db),
+):
+    """
+    Download a completed digest's peptides as an Arrow IPC file.
+
+    - One row per peptide in rank order with every peptide property and the
+      criteria bitmask (bit rank - 1 set for each matched criteria rank); the
+      schema metadata holds the digest id and its criteria codes and ranks.
+    - Loads directly in pandas (`pandas.read_feather`), polars or R
+      (`arrow::read_feather`).
+    - Built on first request and cached on local disk.
+    - Supports Range requests (and If-Range) for resumable downloads.
+    - Returns 409 while the digest is not COMPLETED.
+    """
+    logger.info(f"Received artifact request: user_id={user_id}, digest_id={digest_id}")
+
+    await User.aexists_by_or_raise(session, id=user_id)
+    digest, session = await afind_digest_read_your_writes_or_raise(
+        session,
+        primary,
+        user_id=user_id,
+        digest_id=digest_id,
+    )
+    if digest.status != DigestStatusEnum.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Digest {digest_id} is {digest.status.value}; artifacts are only available for completed digests.",
+        )
+
+    etag = digest_etag(digest, "artifact", settings.DIGEST_ARTIFACT_COMPRESSION)
+    cache_control = digest_cache_control(digest)
+    if etag_matches(if_none_match, etag):
+        logger.info(f"Artifact not modified: user_id={user_id}, digest_id={digest_id}")
+        not_modified = not_modified_response(etag, cache_control)
+        # as on the file response, so the strong ETag used by If-Range is kept
+        not_modified.headers["Accept-Ranges"] = "bytes"
+        return not_modified
+
+    await aget_criteria_registry(session)
+    await digest.awaitable_attrs.digest_criteria
+    path = await aensure_digest_artifact(session, digest)
+
+    logger.info(f"Serving artifact: user_id={user_id}, digest_id={digest_id}")
+    artifact_response = FileResponse(
+        path,
+        media_type=ARTIFACT_MEDIA_TYPE,
+        filename=f"{digest_id}{ARTIFACT_SUFFIX}",
+    )
+    set_cache_headers(artifact_response, etag, cache_control)
+    return artifact_response
+
+
+@digest_router.get(
+    "/{user_id}/{digest_id}/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def export_digest_peptides_by_id(
+    user_id: str,
+    digest_id: str,
+    params: Annotated[PeptideExportQueryParams, Query()],
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_read_db),
+    primary: LazyAsyncSession = Depends(get_async_primary_db),
+):
+    """
+    Export a digest's peptides as a CSV, TSV or FASTA file, in rank order.
+
+    - format=csv (default) or tsv: one row per peptide after a header row, with
+      matched criteria codes joined by ";".
+    - format=fasta: one record per peptide, for import into tools such as
+      Skyline.
+    - Accepts the peptides endpoint's pagination and filters; passes_all_criteria
+      keeps only peptides that match none of the digest's criteria.
+    - Rows are streamed from a server-side cursor, so memory use does not grow
+      with the number of peptides.
+    """
+    logger.info(
+        f"Received peptides export request: user_id={user_id}, "
+        f"digest_id={digest_id}, format={params.format.value}"
+    )
+
+    await User.aexists_by_or_raise(session, id=user_id)
+    digest, session = await afind_digest_read_your_writes_or_raise(
+        session,
+        primary,
+        user_id=user_id,
+        digest_id=digest_id,
+    )
+
+    etag = digest_etag(digest, "export", params.model_dump_json(exclude_defaults=True))
+    cache_control = digest_cache_control(digest)
+    if etag_matches(if_none_match, etag):
+        logger.info(
+            f"Peptides export not modified: user_id={user_id}, digest_id={digest_id}"
+        )
+        return not_modified_response(etag, cache_control)
+
+    await aget_criteria_registry(session)
+    peptide_stream = await Peptide.astream_by_digest_id_ordered_by_rank_or_raise(
+        session,
+        digest_id=digest_id,
+        filters=params,
+        digest_sequence=await digest.aload_sequence(),
+        batch_size=settings.PEPTIDE_STREAM_BATCH_SIZE,
+    )
+
+    export_response = StreamingResponse(
+        stream_digest_peptides_export(
+            digest.id,
+            digest.protein_name,
+            peptide_stream,
+            params.format,
+            batch_size=settings.PEPTIDE_STREAM_BATCH_SIZE,
+        ),
+        media_type=params.format.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{digest_id}.{params.format.value}"'
+            )
+        },
+    )
+    set_cache_headers(export_response, etag, cache_control)
+    return export_response
@@ -1,23 +1,60 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core import settings
+from app.db.pool import render_pool_metrics
+from app.db.session import (
+    async_engine,
+    async_replica_engine,
+    engine,
+    get_db,
+    get_read_db,
+    replica_engine,
+)
 
 health_router = APIRouter()
 
 
-@health_router.get("/health")
-def health(session: Session = Depends(get_db)):
-    """Health check endpoint for container orchestration."""
+def _database_status(session: Session) -> str:
     try:
         session.execute(text("SELECT 1"))
-        db_status = "connected"
+        return "connected"
     except Exception:
-        db_status = "disconnected"
+        return "disconnected"
+
+
+@health_router.get("/health")
+def health(
+    session: Session = Depends(get_db),
+    read_session: Session = Depends(get_read_db),
+):
+    """
+    Health check endpoint for container orchestration.
 
-    return {
+    Reports the read replica separately when DATABASE_REPLICA_URL is set.
+    """
+    health_status = {
         "status": "healthy",
         "service": "qpeptide-finder-backend",
-        "database": db_status,
+        "database": _database_status(session),
     }
+    if settings.DATABASE_REPLICA_URL:
+        health_status["replica"] = _database_status(read_session)
+    return health_status
+
+
+@health_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Connection pool statistics in the Prometheus text format.
+
+    Reports size, checked in/out, overflow, callers waiting for a connection,
+    checkout count, timeouts and checkout wait time for each engine pool.
+    """
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    if settings.DATABASE_REPLICA_URL:
+        pools["replica_sync"] = replica_engine.pool
+        pools["replica_async"] = async_replica_engine.sync_engine.pool
+    return render_pool_metrics(pools)
@@ -1,13 +1,13 @@
 import logging
-from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import verify_internal_api_key
+from app.db.replica import mark_write
 from app.db.session import get_db
-from app.models import User
+from app.helpers import remove_digest_artifacts
+from app.models import Digest, User
 from app.schemas.user import UserCreate, UserResponse
 
 logger = logging.getLogger(__name__)
@@ -18,40 +18,40 @@ users_router = APIRouter(prefix="/users", tags=["users"])
 @users_router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_or_retrieve_user(
     user_request: UserCreate,
-    api_key: str = Depends(verify_internal_api_key),
+    response: Response,
     session: Session = Depends(get_db),
 ):
     """
     Create or retrieve user record base on email address.
 
+    The user is created, or its username updated, by a single upsert keyed on
+    the unique email index.
+
     - username: User's name (3-50 characters)
     - email: Valid email address
     """
     logger.info(f"Received user create/retrieve request: email={user_request.email}")
 
-    existing_user: User | None = User.find_one_by(session, email=user_request.email)
-
     try:
-        if existing_user:
-            updated_user: User = User.update(
-                session,
-                existing_user,
-                values={
-                    "username": user_request.username,
-                    "updated_at": datetime.now(UTC),
-                },
-            )
-            logger.info(f"User successfully updated: email={updated_user.email}")
-            return updated_user
-
-        new_user: User = User.create(
+        user: User = User.upsert_by_email(
             session,
-            flush=True,
             username=user_request.username,
-            email=user_request.email,
+            email=str(user_request.email),
+            commit=False,
         )
-        logger.info(f"User successfully created: email={new_user.email}")
-        return new_user
+
+        # read before commit, which would expire the user's attributes
+        user_response = UserResponse.model_validate(user)
+
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        mark_write(response, user_response.id)
+        logger.info(f"User successfully upserted: email={user_response.email}")
+        return user_response
 
     except IntegrityError as e:
         logger.error(
@@ -73,7 +73,7 @@ def create_or_retrieve_user(
 @users_router.delete("/id/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user_by_id(
     user_id: str,
-    api_key: str = Depends(verify_internal_api_key),
+    response: Response,
     session: Session = Depends(get_db),
 ):
     """
@@ -83,12 +83,19 @@ def delete_user_by_id(
     - Returns 204 No Content on success
     - Returns 404 if user not found
     - Returns 400/500 for other errors
+
+    The user is removed with a single DELETE; digests and everything below them
+    are removed by the database's ON DELETE CASCADE. The cached artifacts of the
+    user's digests, which the cascade cannot reach, are deleted afterwards.
     """
     logger.info(f"Received user delete request: user_id={user_id}")
-    user: User = User.find_one_by_or_raise(session, id=user_id)
-
     try:
-        User.delete(session, user)
+        digest_ids = [
+            row.id for row in Digest.find_by(session, columns=["id"], user_id=user_id)
+        ]
+        User.delete_by_or_raise(session, id=user_id)
+        mark_write(response, user_id)
+        remove_digest_artifacts(digest_ids)
         logger.info(f"User deleted successfully: user_id={user_id}")
         return
     except IntegrityError as e:
@@ -2,7 +2,7 @@ import json
 import logging
 import os
 import sys
-from typing import Annotated, Any, Union, get_args, get_origin
+from typing import Annotated, Any, Literal, Union, get_args, get_origin
 
 from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -136,6 +136,24 @@ class Settings(BaseSettings):
     # Database - MySQL
     DATABASE_URL: str = ""
     DATABASE_ECHO: bool = False
+    # Async driver URL for the request path; derived from DATABASE_URL if empty
+    ASYNC_DATABASE_URL: str = ""
+
+    # Optional read-only replica for GET routes; empty sends every query to the
+    # primary. The async replica URL is derived from it.
+    DATABASE_REPLICA_URL: str = ""
+    # Seconds a user's reads stay on the primary after that user writes (carried
+    # across worker processes by the last_write_at cookie)
+    DATABASE_REPLICA_STICKY_SECONDS: float = 10.0
+
+    # Connection pool (applied to the sync and the async engine separately).
+    # Size the sync pool for the threadpool plus the digest job executor.
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 3600
+    # Connections opened per engine at startup (capped at DATABASE_POOL_SIZE)
+    DATABASE_POOL_WARMUP: int = 5
 
     # API
     API_V1_PREFIX: str = "/api/v1"
@@ -159,6 +177,40 @@ class Settings(BaseSettings):
     # Digest Job limit per User
     DIGEST_JOB_LIMIT: int = 3
 
+    # HTTP caching (Cache-Control max-age in seconds)
+    DIGEST_CACHE_MAX_AGE: int = 86400
+    CRITERIA_CACHE_MAX_AGE: int = 3600
+
+    # Also write one peptide_criteria row per matched criteria (peptides always
+    # carry criteria_mask); only needed by consumers still reading the join table
+    WRITE_PEPTIDE_CRITERIA_ROWS: bool = False
+    # Store peptides as (position, length) only; sequences are sliced from the
+    # digest sequence on read instead of being stored a second time
+    COMPACT_PEPTIDE_STORAGE: bool = False
+
+    # Arrow IPC digest artifacts, cached on local disk; buffer compression is
+    # "none" (memory-mappable zero-copy), or "zstd"/"lz4" for smaller files that
+    # are decompressed on read
+    DIGEST_ARTIFACT_DIR: str = "artifacts"
+    DIGEST_ARTIFACT_COMPRESSION: Literal["zstd", "lz4", "none"] = "none"
+
+    # Peptide streaming (rows fetched per server-side cursor round trip)
+    PEPTIDE_STREAM_BATCH_SIZE: int = 500
+
+    # Response compression (gzip, plus br/zstd if brotli/zstandard are installed);
+    # smaller bodies are sent as they are. Compressed bodies of immutable
+    # responses are cached in memory up to the byte budget (0 disables)
+    RESPONSE_COMPRESSION_MINIMUM_SIZE: int = 1024
+    RESPONSE_COMPRESSION_CACHE_BYTES: int = 64 * 1024 * 1024
+
+    # Retention purge (python -m app.tasks.retention_task); 0 disables a rule
+    RETENTION_MAX_AGE_DAYS: int = 0
+    RETENTION_MAX_DIGESTS_PER_USER: int = 0
+    # Peptide rows and digests deleted per transaction, and the pause between them
+    RETENTION_BATCH_SIZE: int = 1000
+    RETENTION_DIGEST_BATCH_SIZE: int = 50
+    RETENTION_PAUSE_SECONDS: float = 0.2
+
     # Peptide Filter Settings
     MIN_PEPTIDE_LENGTH: int = 7
     MAX_PEPTIDE_LENGTH: int = 30
@@ -0,0 +1,214 @@
+"""
+Connection pool configuration, warm-up and statistics.
+
+The pools of the sync and async engines are sized from Settings and record how
+long callers wait to check out a connection, so pool starvation can be told
+apart from slow queries.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, Pool, QueuePool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolCheckoutStats:
+    """Checkout counters for one pool, updated from any thread."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    waiting: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def start_wait(self) -> float:
+        """Register a caller waiting for a connection and return its start time."""
+        with self._lock:
+            self.waiting += 1
+        return time.perf_counter()
+
+    def end_wait(self, started: float, *, timed_out: bool) -> None:
+        """Record the outcome of a checkout started at ``started``."""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += elapsed
+            self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+
+
+class _CheckoutTimingMixin:
+    """Time every checkout of a QueuePool subclass."""
+
+    stats: PoolCheckoutStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolCheckoutStats()
+
+    def recreate(self) -> Any:
+        new_pool = super().recreate()  # type: ignore[misc]
+        new_pool.stats = self.stats
+        return new_pool
+
+    def _do_get(self) -> Any:
+        started = self.stats.start_wait()
+        try:
+            connection = super()._do_get()  # type: ignore[misc]
+        except Exception:
+            self.stats.end_wait(started, timed_out=True)
+            raise
+        self.stats.end_wait(started, timed_out=False)
+        return connection
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool that records checkout wait statistics."""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait statistics."""
+
+
+def pool_options(database_url: str, *, use_async: bool = False) -> dict[str, Any]:
+    """
+    Return the create_engine pool arguments for a database URL.
+
+    SQLite keeps SQLAlchemy's default pool, which does not take sizing options.
+
+    Args:
+        database_url: SQLAlchemy database URL
+        use_async: If True, return options for create_async_engine
+
+    Returns:
+        Keyword arguments for create_engine / create_async_engine
+    """
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    }
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=(
+            InstrumentedAsyncAdaptedQueuePool if use_async else InstrumentedQueuePool
+        ),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+    )
+    return options
+
+
+def pool_statistics(pool: Pool) -> dict[str, float | int] | None:
+    """
+    Return a snapshot of a queue pool's occupancy and checkout statistics.
+
+    Args:
+        pool: Engine pool
+
+    Returns:
+        Dictionary of statistics, or None if the pool is not a queue pool
+    """
+    if not isinstance(pool, QueuePool):
+        return None
+
+    statistics: dict[str, float | int] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    stats = getattr(pool, "stats", None)
+    if isinstance(stats, PoolCheckoutStats):
+        statistics.update(
+            waiting=stats.waiting,
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            wait_seconds_total=stats.wait_seconds_total,
+            wait_seconds_max=stats.wait_seconds_max,
+        )
+    return statistics
+
+
+def render_pool_metrics(pools: dict[str, Pool]) -> str:
+    """
+    Render pool statistics in the Prometheus text exposition format.
+
+    Args:
+        pools: Pools keyed by the label used for their ``pool`` dimension
+
+    Returns:
+        Metrics text, one sample per line
+    """
+    lines: list[str] = []
+    for name, pool in pools.items():
+        statistics = pool_statistics(pool)
+        if statistics is None:
+            continue
+        for key, value in statistics.items():
+            lines.append(f'db_pool_{key}{{pool="{name}"}} {value}')
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def warm_up_engine(engine: Engine, connections: int) -> int:
+    """
+    Open and return ``connections`` connections so the pool starts populated.
+
+    Args:
+        engine: Sync engine to warm up
+        connections: Number of connections to open (capped at the pool size)
+
+    Returns:
+        Number of connections opened
+    """
+    if connections <= 0 or not isinstance(engine.pool, QueuePool):
+        return 0
+
+    count = min(connections, engine.pool.size())
+    opened = [engine.connect() for _ in range(count)]
+    for connection in opened:
+        connection.close()
+    logger.info(f"Warmed up {count} connections for {engine.url.render_as_string()}")
+    return count
+
+
+async def warm_up_async_engine(engine: AsyncEngine, connections: int) -> int:
+    """
+    Open and return ``connections`` connections so the async pool starts populated.
+
+    Args:
+        engine: Async engine to warm up
+        connections: Number of connections to open (capped at the pool size)
+
+    Returns:
+        Number of connections opened
+    """
+    pool = engine.sync_engine.pool
+    if connections <= 0 or not isinstance(pool, QueuePool):
+        return 0
+
+    count = min(connections, pool.size())
+    opened = [await engine.connect() for _ in range(count)]
+    for connection in opened:
+        await connection.close()
+    logger.info(
+        f"Warmed up {count} async connections for {engine.url.render_as_string()}"
+    )
+    return count
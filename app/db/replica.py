@@ -0,0 +1,126 @@
+"""
+Read-your-writes tracking for read-replica routing.
+
+Reads for a user go to the replica unless that user wrote to the primary within
+the last DATABASE_REPLICA_STICKY_SECONDS, in which case the replica may not have
+caught up yet and the read is sent to the primary instead.
+
+Writes made by a request are marked in a cookie on its response, holding the
+time of the write, so the client's next reads go to the primary whichever
+worker process or host serves them. Writes made by background digest jobs have
+no response to carry a cookie and are only recorded in the process that ran
+the job; reads of a single digest fall back to the primary on their own while
+the replica still shows it PROCESSING (see afind_digest_read_your_writes_or_raise).
+"""
+
+import math
+import threading
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from app.core import settings
+
+# Session.info key set on sessions bound to the read replica
+READ_REPLICA_INFO_KEY = "read_replica"
+
+# Cookie holding the Unix time of the client's last write to the primary
+LAST_WRITE_COOKIE = "last_write_at"
+
+
+class RecentWrites:
+    """
+    Process-wide record of the users that wrote to the primary recently.
+
+    Other worker processes do not see these marks; requests carry them across
+    processes in the LAST_WRITE_COOKIE set by mark_write.
+    """
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self._written_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: str) -> None:
+        """Record that ``user_id`` just wrote to the primary."""
+        now = time.monotonic()
+        with self._lock:
+            self._written_at[user_id] = now
+            self._prune(now)
+
+    def is_recent(self, user_id: str | None) -> bool:
+        """Return True if ``user_id`` wrote to the primary within the window."""
+        if user_id is None:
+            return False
+        with self._lock:
+            written_at = self._written_at.get(user_id)
+        return (
+            written_at is not None
+            and time.monotonic() - written_at < self.window_seconds
+        )
+
+    def clear(self) -> None:
+        """Forget all recorded writes."""
+        with self._lock:
+            self._written_at.clear()
+
+    def _prune(self, now: float) -> None:
+        expired = [
+            user_id
+            for user_id, written_at in self._written_at.items()
+            if now - written_at >= self.window_seconds
+        ]
+        for user_id in expired:
+            del self._written_at[user_id]
+
+
+recent_writes = RecentWrites(settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def mark_write(response: Response, user_id: str) -> None:
+    """
+    Record that a request just wrote to the primary on behalf of ``user_id``.
+
+    The user is marked in this process, and the response sets LAST_WRITE_COOKIE
+    so the client's reads in the next DATABASE_REPLICA_STICKY_SECONDS go to the
+    primary in every process.
+
+    Args:
+        response: Response of the writing request
+        user_id: User the write was for
+    """
+    recent_writes.mark(user_id)
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        f"{time.time():.3f}",
+        max_age=math.ceil(recent_writes.window_seconds),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def wrote_recently(last_write_at: str | None) -> bool:
+    """
+    Return True if a LAST_WRITE_COOKIE value lies within the sticky window.
+
+    Args:
+        last_write_at: Cookie value sent by the client, if any
+
+    Returns:
+        False for a missing or malformed value, or one outside the window
+    """
+    if not last_write_at:
+        return False
+    try:
+        written_at = float(last_write_at)
+    except ValueError:
+        return False
+    # abs() tolerates clock skew between the hosts that write and read
+    return abs(time.time() - written_at) < recent_writes.window_seconds
+
+
+def is_read_replica(session: Session | AsyncSession) -> bool:
+    """Return True if the session reads from the read replica."""
+    return bool(session.info.get(READ_REPLICA_INFO_KEY, False))
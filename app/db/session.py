@@ -1,19 +1,163 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core import settings
+from app.db.pool import pool_options
+from app.db.replica import (
+    LAST_WRITE_COOKIE,
+    READ_REPLICA_INFO_KEY,
+    recent_writes,
+    wrote_recently,
+)
+
+# sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Return the async driver URL for a sync database URL.
+
+    Args:
+        database_url: SQLAlchemy URL using a sync driver
+
+    Returns:
+        The same URL with its async driver (unchanged if already async or unknown)
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def _set_sqlite_foreign_keys(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def enforce_sqlite_foreign_keys(engine: Engine) -> None:
+    """
+    Turn on foreign key enforcement for every SQLite connection of an engine.
+
+    SQLite ignores foreign keys, including ON DELETE CASCADE, unless enabled
+    per connection; bulk deletes rely on the cascade. No-op for other databases.
+
+    Args:
+        engine: Sync engine (use AsyncEngine.sync_engine for async engines)
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_foreign_keys)
+
 
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    **pool_options(settings.DATABASE_URL),
 )
+enforce_sqlite_foreign_keys(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(
+    settings.DATABASE_URL
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.DATABASE_ECHO,
+    **pool_options(ASYNC_DATABASE_URL, use_async=True),
+)
+enforce_sqlite_foreign_keys(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Read replica: without DATABASE_REPLICA_URL the replica engines are the primary
+# engines and replica sessions are ordinary primary sessions.
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=settings.DATABASE_ECHO,
+        **pool_options(settings.DATABASE_REPLICA_URL),
+    )
+    ASYNC_DATABASE_REPLICA_URL = async_database_url(settings.DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL,
+        echo=settings.DATABASE_ECHO,
+        **pool_options(ASYNC_DATABASE_REPLICA_URL, use_async=True),
+    )
+    enforce_sqlite_foreign_keys(replica_engine)
+    enforce_sqlite_foreign_keys(async_replica_engine.sync_engine)
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+_replica_info = {READ_REPLICA_INFO_KEY: bool(settings.DATABASE_REPLICA_URL)}
+
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine, info=_replica_info
+)
+
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine, autoflush=False, expire_on_commit=False, info=_replica_info
+)
+
+
+def async_read_sessionmaker(
+    user_id: str | None, last_write_at: str | None = None
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Return the session factory for a read on behalf of a user.
+
+    Args:
+        user_id: User the read is for, if any
+        last_write_at: The client's LAST_WRITE_COOKIE, if sent
+
+    Returns:
+        The primary factory if the user (in this process) or the client (in any
+        process) wrote recently, else the replica factory
+    """
+    if recent_writes.is_recent(user_id) or wrote_recently(last_write_at):
+        return AsyncSessionLocal
+    return AsyncReplicaSessionLocal
+
+
+class LazyAsyncSession:
+    """
+    Primary session for a read route, opened only if the route asks for it.
+
+    Use as an async context manager; the session, if any, is closed on exit.
+    """
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession]) -> None:
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    def get(self) -> AsyncSession:
+        """Return the session, opening it on first use."""
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    async def __aenter__(self) -> "LazyAsyncSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._session is not None:
+            await self._session.close()
+
 
 def get_db() -> Generator[Session]:
     db = SessionLocal()
@@ -21,3 +165,37 @@ def get_db() -> Generator[Session]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db() -> Generator[Session]:
+    db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession]:
+    """
+    Yield a session for a GET route, on the replica unless the path's user_id,
+    or the client, wrote to the primary recently.
+    """
+    factory = async_read_sessionmaker(
+        request.path_params.get("user_id"), request.cookies.get(LAST_WRITE_COOKIE)
+    )
+    async with factory() as db:
+        yield db
+
+
+async def get_async_primary_db() -> AsyncGenerator[LazyAsyncSession]:
+    """
+    Yield a lazily opened primary session for GET routes that fall back to the
+    primary when the replica is behind.
+    """
+    async with LazyAsyncSession(AsyncSessionLocal) as primary:
+        yield primary
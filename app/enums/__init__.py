@@ -1,4 +1,13 @@
-from app.enums.enums import AminoAcidEnum, CriteriaEnum, DigestStatusEnum, ProteaseEnum
+from app.enums.enums import (
+    AminoAcidEnum,
+    CriteriaEnum,
+    DigestFieldEnum,
+    DigestStatusEnum,
+    PeptideExportFormatEnum,
+    PeptideFieldEnum,
+    PeptideResponseFormatEnum,
+    ProteaseEnum,
+)
 
 __all__ = [
     "AminoAcidEnum",
@@ -6,4 +15,8 @@ __all__ = [
     "ProteaseEnum",
     "CriteriaEnum",
     "AminoAcidEnum",
+    "PeptideResponseFormatEnum",
+    "PeptideExportFormatEnum",
+    "DigestFieldEnum",
+    "PeptideFieldEnum",
 ]
@@ -97,6 +97,58 @@ class DigestStatusEnum(str, Enum):
     FAILED = "failed"
 
 
+class PeptideResponseFormatEnum(str, Enum):
+    """Supported layouts for the digest peptides response."""
+
+    ROWS = "rows"
+    COLUMNAR = "columnar"
+
+
+class DigestFieldEnum(str, Enum):
+    """Fields that can be requested from digest responses."""
+
+    ID = "id"
+    STATUS = "status"
+    USER_ID = "user_id"
+    PROTEASE = "protease"
+    PROTEIN_NAME = "protein_name"
+    SEQUENCE = "sequence"
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+
+
+class PeptideFieldEnum(str, Enum):
+    """Fields that can be requested from digest peptide responses."""
+
+    ID = "id"
+    SEQUENCE = "sequence"
+    POSITION = "position"
+    PI = "pi"
+    CHARGE_STATE = "charge_state"
+    MAX_KD_SCORE = "max_kd_score"
+    RANK = "rank"
+    CRITERIA_RANKS = "criteria_ranks"
+
+
+class PeptideExportFormatEnum(str, Enum):
+    """Supported file formats for digest peptide exports."""
+
+    CSV = "csv"
+    TSV = "tsv"
+    FASTA = "fasta"
+
+    @property
+    def media_type(self) -> str:
+        """Media type of the exported file."""
+        match self:
+            case PeptideExportFormatEnum.CSV:
+                return "text/csv"
+            case PeptideExportFormatEnum.TSV:
+                return "text/tab-separated-values"
+            case PeptideExportFormatEnum.FASTA:
+                return "text/x-fasta"
+
+
 class AminoAcidEnum(str, Enum):
     """All valid amino acids."""
 
@@ -1,13 +1,67 @@
 from app.helpers.database import (
     save_peptides_with_criteria,
 )
+from app.helpers.digest_artifact import (
+    ARTIFACT_MEDIA_TYPE,
+    ARTIFACT_SUFFIX,
+    aensure_digest_artifact,
+    remove_digest_artifacts,
+)
+from app.helpers.digest_export import stream_digest_peptides_export
+from app.helpers.digest_payload import (
+    PAYLOAD_MEDIA_TYPE,
+    accept_encoding_weights,
+    digest_payload_response,
+    digest_peptides_json,
+    request_accepts_gzip,
+    store_digest_peptides_payload,
+)
 from app.helpers.digest_route import (
+    NDJSON_MEDIA_TYPE,
+    afind_digest_read_your_writes_or_raise,
+    afind_digests_read_your_writes_or_raise,
+    fieldset_response,
+    request_accepts_ndjson,
     request_criteria_ids_valid_or_exception,
-    request_within_digest_limit_or_exception,
+    request_user_within_digest_limit_or_exception,
+    stream_digest_peptides_ndjson,
+)
+from app.helpers.http_cache import (
+    build_etag,
+    criteria_cache_control,
+    digest_cache_control,
+    digest_etag,
+    etag_matches,
+    not_modified_response,
+    set_cache_headers,
 )
 
 __all__ = [
     "save_peptides_with_criteria",
-    "request_within_digest_limit_or_exception",
+    "request_user_within_digest_limit_or_exception",
     "request_criteria_ids_valid_or_exception",
+    "NDJSON_MEDIA_TYPE",
+    "afind_digest_read_your_writes_or_raise",
+    "afind_digests_read_your_writes_or_raise",
+    "fieldset_response",
+    "request_accepts_ndjson",
+    "stream_digest_peptides_ndjson",
+    "ARTIFACT_MEDIA_TYPE",
+    "ARTIFACT_SUFFIX",
+    "aensure_digest_artifact",
+    "remove_digest_artifacts",
+    "stream_digest_peptides_export",
+    "PAYLOAD_MEDIA_TYPE",
+    "accept_encoding_weights",
+    "digest_payload_response",
+    "digest_peptides_json",
+    "request_accepts_gzip",
+    "store_digest_peptides_payload",
+    "build_etag",
+    "criteria_cache_control",
+    "digest_cache_control",
+    "digest_etag",
+    "etag_matches",
+    "not_modified_response",
+    "set_cache_headers",
 ]
@@ -4,13 +4,17 @@ Database helper functions for common database operations.
 
 import logging
 from collections.abc import Sequence
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy import Select, select
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core import settings
 from app.domain import PeptideDomain
 from app.enums import CriteriaEnum
 from app.models import Criteria, Peptide, PeptideCriteria
+from app.models.criteria_registry import CriteriaRecord, get_criteria_registry
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +25,11 @@ def save_peptides_with_criteria(
     peptides: Sequence[PeptideDomain],
 ) -> None:
     """
-    Save peptides and their criteria associations to the database.
+    Save peptides, with their matched criteria encoded in criteria_mask.
+
+    Peptides are written with a single bulk INSERT. With COMPACT_PEPTIDE_STORAGE
+    only their position and length are stored, not the sequence. peptide_criteria
+    join rows are only written when WRITE_PEPTIDE_CRITERIA_ROWS is enabled.
 
     Args:
         session: Database session
@@ -29,7 +37,7 @@ def save_peptides_with_criteria(
         peptides: Sequence of PeptideDomain objects to save
 
     Raises:
-        ValueError: If a Criteria record is not found for a CriteriaEnum
+        ValueError: If a criteria record is not found for a CriteriaEnum
         IntegrityError: If database constraints are violated
     """
     if not peptides:
@@ -37,27 +45,18 @@ def save_peptides_with_criteria(
         return
 
     criteria_map = _get_criteria_map(session, peptides)
+    write_join_rows = settings.WRITE_PEPTIDE_CRITERIA_ROWS
+    compact = settings.COMPACT_PEPTIDE_STORAGE
 
     try:
+        peptide_rows: list[dict[str, Any]] = []
+        peptide_criteria_rows: list[dict[str, str]] = []
         for peptide_domain in peptides:
             peptide_domain.get_pI()
             peptide_domain.charge_state_in_formic_acid()
             peptide_domain.max_kyte_dolittle_score_over_sliding_window()
 
-            peptide: Peptide = Peptide.create(
-                session,
-                rank=peptide_domain.rank,
-                digest_id=digest_id,
-                sequence=peptide_domain.sequence_as_str,
-                position=peptide_domain.position,
-                pi=peptide_domain.pI,
-                charge_state=peptide_domain.charge_state,
-                max_kd_score=peptide_domain.max_kd_score,
-                flush=True,
-                refresh=True,
-                commit=False,
-            )
-
+            criteria_records = []
             for criteria_enum in peptide_domain.criteria:
                 criteria_record = criteria_map.get(criteria_enum)
                 if not criteria_record:
@@ -65,16 +64,38 @@ def save_peptides_with_criteria(
                         f"Criteria record not found for {criteria_enum.value}. "
                         "Ensure all criteria are seeded in the database."
                     )
-
-                PeptideCriteria.create(
-                    session,
-                    peptide_id=peptide.id,
-                    criteria_id=criteria_record.id,
-                    flush=False,
-                    refresh=False,
-                    commit=False,
+                criteria_records.append(criteria_record)
+
+            peptide_id = str(uuid4())
+            peptide_rows.append(
+                {
+                    "id": peptide_id,
+                    "rank": peptide_domain.rank,
+                    "digest_id": digest_id,
+                    "sequence": None if compact else peptide_domain.sequence_as_str,
+                    "position": peptide_domain.position,
+                    "length": peptide_domain.length,
+                    "pi": peptide_domain.pI,
+                    "charge_state": peptide_domain.charge_state,
+                    "max_kd_score": peptide_domain.max_kd_score,
+                    "criteria_mask": Criteria.ranks_to_mask(
+                        record.rank for record in criteria_records
+                    ),
+                }
+            )
+            if write_join_rows:
+                peptide_criteria_rows.extend(
+                    {
+                        "id": str(uuid4()),
+                        "peptide_id": peptide_id,
+                        "criteria_id": record.id,
+                    }
+                    for record in criteria_records
                 )
 
+        session.execute(insert(Peptide), peptide_rows)
+        if peptide_criteria_rows:
+            session.execute(insert(PeptideCriteria), peptide_criteria_rows)
         session.commit()
 
         logger.info(
@@ -90,16 +111,16 @@ def save_peptides_with_criteria(
 
 def _get_criteria_map(
     session: Session, peptides: Sequence[PeptideDomain]
-) -> dict[CriteriaEnum, Criteria]:
+) -> dict[CriteriaEnum, CriteriaRecord]:
     """
-    Build a map of CriteriaEnum to Criteria records for efficient lookup.
+    Build a map of CriteriaEnum to criteria records for efficient lookup.
 
     Args:
-        session: Database session
+        session: Database session, only used if the registry is not loaded yet
         peptides: Sequence of peptides to extract criteria from
 
     Returns:
-        Dictionary mapping CriteriaEnum to Criteria records
+        Dictionary mapping CriteriaEnum to criteria registry records
     """
     criteria_enums = set()
     for peptide in peptides:
@@ -108,15 +129,17 @@ def _get_criteria_map(
     if not criteria_enums:
         return {}
 
-    query: Select = select(Criteria).where(Criteria.code.in_(criteria_enums))
-    criteria_records = session.scalars(query).all()
-
-    criteria_map = {record.code: record for record in criteria_records}
+    registry = get_criteria_registry(session)
+    criteria_map = {
+        code: registry.by_code[code]
+        for code in criteria_enums
+        if code in registry.by_code
+    }
     missing = criteria_enums - set(criteria_map.keys())
 
     if missing:
         logger.warning(
-            f"Some criteria not found in database: {[ce.value for ce in missing]}"
+            f"Some criteria not found in registry: {[ce.value for ce in missing]}"
         )
 
     return criteria_map
@@ -0,0 +1,224 @@
+# helper functions for columnar (Arrow IPC) digest result artifacts
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import weakref
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core import settings
+from app.models import Digest, Peptide
+from app.schemas.digest import CriteriaResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+    logger.warning("pyarrow not available. Digest artifact downloads disabled.")
+
+ARTIFACT_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+ARTIFACT_SUFFIX = ".arrow"
+
+# (column, type) pairs, in file order
+ARTIFACT_FIELDS = (
+    [
+        ("id", pa.string()),
+        ("sequence", pa.string()),
+        ("position", pa.int32()),
+        ("length", pa.int32()),
+        ("pi", pa.float64()),
+        ("charge_state", pa.int32()),
+        ("max_kd_score", pa.float64()),
+        ("rank", pa.int32()),
+        ("criteria_mask", pa.int32()),
+    ]
+    if ARROW_AVAILABLE
+    else []
+)
+
+# Per-digest build locks, dropped once no request holds or waits on them
+_build_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def digest_artifact_path(digest_id: str) -> Path:
+    """
+    Return the local cache path of a digest's artifact.
+
+    The name carries DIGEST_ARTIFACT_COMPRESSION, which is also part of the
+    artifact's ETag, so changing the setting builds a new file rather than
+    serving one written with the old compression.
+    """
+    compression = settings.DIGEST_ARTIFACT_COMPRESSION
+    return (
+        Path(settings.DIGEST_ARTIFACT_DIR)
+        / f"{digest_id}.{compression}{ARTIFACT_SUFFIX}"
+    )
+
+
+async def aensure_digest_artifact(session: AsyncSession, digest: Digest) -> Path:
+    """
+    Return the cached Arrow IPC artifact of a completed digest, building it first
+    if it is not on local disk yet.
+
+    The artifact holds one row per peptide in rank order, with every peptide
+    property and the criteria bitmask; the schema metadata carries the digest id
+    and its criteria (code and rank) for decoding the mask. Buffers are
+    compressed with DIGEST_ARTIFACT_COMPRESSION; with the default "none" the file
+    can be memory-mapped and read without copying, while "zstd" or "lz4" trade
+    that for a smaller file. Peptides are written in record batches as they
+    stream from the cursor, and concurrent requests for the same digest in this
+    process share a single build.
+
+    Args:
+        session: Async database session
+        digest: Completed digest with its criteria loaded
+
+    Returns:
+        Path of the artifact file
+
+    Raises:
+        HTTPException: 501 if pyarrow is not installed, 404 if the digest has no
+            peptides
+    """
+    if not ARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Digest artifacts require pyarrow, which is not installed.",
+        )
+
+    path = digest_artifact_path(digest.id)
+    if path.exists():
+        return path
+
+    # one build per digest at a time; concurrent requests wait and reuse it
+    lock = _build_locks.setdefault(digest.id, asyncio.Lock())
+    async with lock:
+        if not path.exists():
+            await _abuild_digest_artifact(session, digest, path)
+    return path
+
+
+async def _abuild_digest_artifact(
+    session: AsyncSession, digest: Digest, path: Path
+) -> None:
+    """
+    Stream a digest's peptides into a new artifact, one record batch of
+    PEPTIDE_STREAM_BATCH_SIZE rows at a time.
+    """
+    batch_size = settings.PEPTIDE_STREAM_BATCH_SIZE
+    peptides = await Peptide.astream_by_digest_id_ordered_by_rank_or_raise(
+        session,
+        digest_id=digest.id,
+        digest_sequence=await digest.aload_sequence(),
+        batch_size=batch_size,
+    )
+    metadata = {
+        "digest_id": digest.id,
+        "criteria": json.dumps(
+            [
+                CriteriaResponse.model_validate(c).model_dump(include={"code", "rank"})
+                for c in digest.get_criteria_ordered_by_rank()
+            ]
+        ),
+    }
+    schema = pa.schema(ARTIFACT_FIELDS, metadata=metadata)
+
+    rows = 0
+    columns = _empty_columns()
+    with open_digest_artifact(path, schema) as writer:
+        async for peptide in peptides:
+            for name, values in columns.items():
+                values.append(getattr(peptide, name))
+            if len(columns["id"]) == batch_size:
+                await run_in_threadpool(write_peptide_batch, writer, schema, columns)
+                rows += batch_size
+                columns = _empty_columns()
+        if columns["id"]:
+            await run_in_threadpool(write_peptide_batch, writer, schema, columns)
+            rows += len(columns["id"])
+    logger.info(
+        f"Built digest artifact: digest_id={digest.id}, "
+        f"peptides={rows}, bytes={path.stat().st_size}"
+    )
+
+
+def _empty_columns() -> dict[str, list]:
+    return {name: [] for name, _ in ARTIFACT_FIELDS}
+
+
+@contextmanager
+def open_digest_artifact(
+    path: Path, schema: "pa.Schema"
+) -> Iterator["pa.ipc.RecordBatchFileWriter"]:
+    """
+    Open an Arrow IPC file writer for an artifact.
+
+    The file is written next to its destination and moved into place when the
+    block exits cleanly, so readers never see a partial artifact.
+
+    Args:
+        path: Destination path
+        schema: Artifact schema, with its metadata
+
+    Yields:
+        Writer to pass record batches to
+    """
+    compression = settings.DIGEST_ARTIFACT_COMPRESSION
+    options = pa.ipc.IpcWriteOptions(
+        compression=None if compression == "none" else compression
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            with pa.ipc.new_file(sink, schema, options=options) as writer:
+                yield writer
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_peptide_batch(
+    writer: "pa.ipc.RecordBatchFileWriter",
+    schema: "pa.Schema",
+    columns: dict[str, list],
+) -> None:
+    """
+    Write one batch of peptide columns to an open artifact.
+
+    Args:
+        writer: Writer from open_digest_artifact
+        schema: Artifact schema
+        columns: Peptide properties as parallel lists, keyed by column name
+    """
+    writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+
+
+def remove_digest_artifacts(digest_ids: Iterable[str]) -> None:
+    """
+    Delete the cached artifacts of digests, whatever compression they were
+    written with.
+
+    Args:
+        digest_ids: IDs of deleted digests
+    """
+    directory = Path(settings.DIGEST_ARTIFACT_DIR)
+    for digest_id in digest_ids:
+        for path in directory.glob(f"{digest_id}.*{ARTIFACT_SUFFIX}"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,111 @@
+# helper functions for streaming digest peptide exports
+
+import csv
+import io
+import logging
+from collections.abc import AsyncIterator
+
+from app.enums import PeptideExportFormatEnum
+from app.models import Criteria, Peptide
+from app.models.criteria_registry import get_criteria_registry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    "rank",
+    "sequence",
+    "position",
+    "length",
+    "pi",
+    "charge_state",
+    "max_kd_score",
+    "criteria",
+    "id",
+]
+
+
+async def stream_digest_peptides_export(
+    digest_id: str,
+    protein_name: str | None,
+    peptides: AsyncIterator[Peptide],
+    export_format: PeptideExportFormatEnum,
+    *,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Render a digest's peptides as CSV, TSV or FASTA chunks.
+
+    CSV and TSV start with a header row; every following row is one peptide in
+    rank order, with its matched criteria codes joined by ";". FASTA holds one
+    record per peptide, headed by the protein name (or digest id), rank and
+    position. Lines are grouped into chunks of ``batch_size`` peptides, so memory
+    use does not grow with the number of peptides.
+
+    Args:
+        digest_id: The digest ID
+        protein_name: Protein name used in FASTA headers (digest id if None)
+        peptides: Async iterator of peptides in rank order
+        export_format: File format to render
+        batch_size: Number of peptides per yielded chunk
+
+    Yields:
+        UTF-8 encoded chunks of the export file
+    """
+    by_rank = get_criteria_registry().by_rank
+    buffer = io.StringIO()
+    writer = None
+    if export_format == PeptideExportFormatEnum.FASTA:
+        name = (protein_name or digest_id).replace(" ", "_")
+    else:
+        writer = csv.writer(
+            buffer,
+            delimiter="\t" if export_format == PeptideExportFormatEnum.TSV else ",",
+            lineterminator="\n",
+        )
+        writer.writerow(EXPORT_COLUMNS)
+
+    count = 0
+    try:
+        async for peptide in peptides:
+            if writer is None:
+                buffer.write(
+                    f">{name}|rank={peptide.rank}|position={peptide.position}"
+                    f"|length={peptide.length}\n{peptide.sequence}\n"
+                )
+            else:
+                writer.writerow(
+                    [
+                        peptide.rank,
+                        peptide.sequence,
+                        peptide.position,
+                        peptide.length,
+                        peptide.pi,
+                        peptide.charge_state,
+                        peptide.max_kd_score,
+                        ";".join(
+                            by_rank[rank].code.value
+                            for rank in Criteria.mask_to_ranks(peptide.criteria_mask)
+                        ),
+                        peptide.id,
+                    ]
+                )
+            count += 1
+            if count % batch_size == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    except Exception as e:
+        logger.error(
+            f"Error exporting peptides: digest_id={digest_id}, "
+            f"format={export_format.value}, exported={count}, error={str(e)}",
+            exc_info=True,
+        )
+        raise
+
+    logger.info(
+        f"Exported peptides: digest_id={digest_id} format={export_format.value} "
+        f"number={count}"
+    )
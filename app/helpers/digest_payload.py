@@ -0,0 +1,174 @@
+# helper functions for pre-rendered digest peptides payloads
+
+import gzip
+import logging
+
+from fastapi import Response
+from sqlalchemy import asc, select
+from sqlalchemy.orm import Session
+
+from app.helpers.http_cache import set_cache_headers
+from app.models import Digest, DigestPayload, Peptide
+from app.schemas.digest import DigestPeptidesResponse
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_MEDIA_TYPE = "application/json"
+
+
+def render_digest_peptides_payload(session: Session, digest: Digest) -> bytes:
+    """
+    Render the full, unfiltered peptides response of a digest, gzip-compressed.
+
+    The body is the same JSON document the endpoint assembles from peptide rows
+    for a request without filters or pagination.
+
+    Args:
+        session: Database session
+        digest: Digest whose peptides have been saved
+
+    Returns:
+        Gzip-compressed JSON body
+    """
+    peptides = list(
+        session.scalars(
+            select(Peptide)
+            .where(Peptide.digest_id == digest.id)
+            .order_by(asc(Peptide.rank))
+        )
+    )
+    for peptide in peptides:
+        peptide.restore_sequence(digest.sequence)
+
+    body = DigestPeptidesResponse.from_peptides(
+        digest.id, peptides, digest.get_criteria_ordered_by_rank()
+    )
+    # mtime=0 keeps the payload deterministic for a given body
+    return gzip.compress(digest_peptides_json(body), mtime=0)
+
+
+def digest_peptides_json(peptides_response: DigestPeptidesResponse) -> bytes:
+    """
+    Serialize a peptides response the way stored payloads are rendered.
+
+    The endpoint uses it for unfiltered responses assembled from rows, which
+    share the payload's strong ETag and so must match it byte for byte.
+
+    Args:
+        peptides_response: Peptides response to serialize
+
+    Returns:
+        JSON body
+    """
+    return peptides_response.model_dump_json().encode()
+
+
+def store_digest_peptides_payload(session: Session, digest: Digest) -> None:
+    """
+    Render and store the peptides payload of a completed digest, in its own
+    transaction.
+
+    The payload is an optimization: if rendering or writing it fails, the error
+    is logged, only the payload is rolled back and the endpoint keeps assembling
+    the response from peptide rows. Call it after the digest's COMPLETED status
+    has been committed, so a failure here never fails the digest.
+
+    Args:
+        session: Database session
+        digest: Digest whose peptides have been saved
+    """
+    try:
+        content = render_digest_peptides_payload(session, digest)
+        # a failed INSERT rolls back to the savepoint, leaving the digest alone
+        with session.begin_nested():
+            session.add(DigestPayload(digest_id=digest.id, content=content))
+        session.commit()
+    except Exception as e:
+        logger.warning(
+            f"Could not store peptides payload for digest_id: {digest.id}. "
+            f"Error: {str(e)}",
+            exc_info=True,
+        )
+        return
+
+    logger.info(
+        f"Rendered peptides payload for digest_id: {digest.id} ({len(content)} bytes)"
+    )
+
+
+def accept_encoding_weights(accept_encoding: str | None) -> dict[str, float]:
+    """
+    Parse an Accept-Encoding header into the q-value of each listed coding.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value (may be None).
+
+    Returns:
+        Lower-cased coding names (including ``*``) mapped to their q-values;
+        a malformed q-value counts as 0.
+    """
+    weights: dict[str, float] = {}
+    if not accept_encoding:
+        return weights
+
+    for part in accept_encoding.split(","):
+        coding, *params = (item.strip().lower() for item in part.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def request_accepts_gzip(accept_encoding: str | None) -> bool:
+    """
+    Check whether the Accept-Encoding header allows a gzip-encoded response.
+
+    An explicit gzip entry takes precedence over ``*``, so
+    ``*, gzip;q=0`` refuses gzip.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value (may be None).
+
+    Returns:
+        True if gzip is accepted (and not refused with q=0).
+    """
+    weights = accept_encoding_weights(accept_encoding)
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def digest_payload_response(
+    content: bytes, accept_encoding: str | None, etag: str, cache_control: str
+) -> Response:
+    """
+    Build the response for a stored payload, with its cache headers.
+
+    Clients that accept gzip get the stored bytes as they are, under a weak ETag
+    (the gzip body is a different representation from the identity one); others
+    get them decompressed under the ETag as given.
+
+    Args:
+        content: Gzip-compressed JSON body
+        accept_encoding: Raw Accept-Encoding header value (may be None)
+        etag: ETag of the peptides representation
+        cache_control: Cache-Control header value
+
+    Returns:
+        JSON response
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if request_accepts_gzip(accept_encoding):
+        headers["Content-Encoding"] = "gzip"
+        etag = etag if etag.startswith("W/") else f"W/{etag}"
+    else:
+        content = gzip.decompress(content)
+    response = Response(content=content, media_type=PAYLOAD_MEDIA_TYPE, headers=headers)
+    set_cache_headers(response, etag, cache_control)
+    return response
@@ -1,29 +1,61 @@
 # helper functions for the digest route
 
-from fastapi import HTTPException, status
+import logging
+from collections.abc import AsyncIterator, Collection, Iterable
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
 from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core import settings
-from app.models import Criteria, Digest
+from app.db.replica import is_read_replica
+from app.db.session import LazyAsyncSession
+from app.enums import DigestFieldEnum, DigestStatusEnum, PeptideFieldEnum
+from app.models import Digest, Peptide, User
+from app.models.criteria_registry import CriteriaRecord, get_criteria_registry
+from app.schemas.digest import (
+    CriteriaResponse,
+    DigestPeptidesStreamHeader,
+    PeptideResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
-def request_within_digest_limit_or_exception(user_id: str, session: Session) -> None:
+def request_user_within_digest_limit_or_exception(
+    user_id: str, session: Session
+) -> None:
     """
-    Check if user has exceeded the digest job limit.
+    Check that the user exists and has not reached the digest job limit.
+
+    Both checks are answered by a single query.
 
     Args:
         user_id: User id to search with
         session: Database session
 
     Raises:
+        HTTPException: 404 if the user does not exist
         HTTPException: 400 if user has exceeded the digest job limit
     """
-    digest_count: int | None = session.scalar(
-        select(func.count(Digest.id)).where(Digest.user_id == user_id)
+    digest_count = (
+        select(func.count(Digest.id)).where(Digest.user_id == User.id).scalar_subquery()
     )
+    row = session.execute(
+        select(User.id, digest_count).where(User.id == user_id)
+    ).first()
 
-    if digest_count is None or digest_count >= settings.DIGEST_JOB_LIMIT:
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No User records found with id={user_id!r}.",
+        )
+
+    if row[1] >= settings.DIGEST_JOB_LIMIT:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=(
@@ -40,11 +72,11 @@ def request_criteria_ids_valid_or_exception(
     criteria_ids: list[str], session: Session
 ) -> None:
     """
-    Check that every criteria_id exists in the criteria table.
+    Check that every criteria_id exists in the criteria registry.
 
     Args:
         criteria_ids: List of criteria IDs from the request (may be empty).
-        session: Database session.
+        session: Database session, only used if the registry is not loaded yet.
 
     Raises:
         HTTPException: 400 if any criteria_id is not found.
@@ -52,10 +84,8 @@ def request_criteria_ids_valid_or_exception(
     if not criteria_ids:
         return
 
-    found_ids = set(
-        session.scalars(select(Criteria.id).where(Criteria.id.in_(criteria_ids))).all()
-    )
-    invalid = [cid for cid in criteria_ids if cid not in found_ids]
+    registry = get_criteria_registry(session)
+    invalid = [cid for cid in criteria_ids if cid not in registry.by_id]
     if invalid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -64,3 +94,224 @@ def request_criteria_ids_valid_or_exception(
                 f"{', '.join(invalid)}."
             ),
         )
+
+
+async def afind_digest_read_your_writes_or_raise(
+    session: AsyncSession,
+    primary: LazyAsyncSession,
+    *,
+    user_id: str,
+    digest_id: str,
+    fields: Collection[DigestFieldEnum] | None = None,
+) -> tuple[Digest, AsyncSession]:
+    """
+    Find a user's digest on the read session, falling back to the primary.
+
+    A replica that is missing the digest, or still shows it PROCESSING, may be
+    behind a job that just completed, so the lookup is repeated on the primary
+    and the caller should keep reading from the session returned.
+
+    Args:
+        session: Read session (replica or primary)
+        primary: Primary session, opened only if the replica is bypassed
+        user_id: Owner of the digest
+        digest_id: Digest id
+        fields: If given, only the columns for these response fields are read
+            (see Digest.afind_one_by_user_id_and_id)
+
+    Returns:
+        The digest and the session it was read from
+
+    Raises:
+        HTTPException: 404 if the digest does not exist for the user
+    """
+    if is_read_replica(session):
+        digest = await _afind_digest(session, user_id, digest_id, fields)
+        if digest is not None and digest.status != DigestStatusEnum.PROCESSING:
+            return digest, session
+
+        logger.debug(f"Replica behind for digest_id={digest_id}, reading primary")
+        session = primary.get()
+
+    if not fields:
+        digest = await Digest.afind_one_by_or_raise(
+            session, user_id=user_id, id=digest_id
+        )
+        return digest, session
+
+    digest = await _afind_digest(session, user_id, digest_id, fields)
+    if digest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=(
+                f"No Digest records found with user_id={user_id!r}, "
+                f"id={digest_id!r}."
+            ),
+        )
+    return digest, session
+
+
+async def _afind_digest(
+    session: AsyncSession,
+    user_id: str,
+    digest_id: str,
+    fields: Collection[DigestFieldEnum] | None,
+) -> Digest | None:
+    """Find a user's digest, with only the columns for ``fields`` if given."""
+    if fields:
+        return await Digest.afind_one_by_user_id_and_id(
+            session, user_id, digest_id, fields=fields
+        )
+    return await Digest.afind_one_by(session, user_id=user_id, id=digest_id)
+
+
+async def afind_digests_read_your_writes_or_raise(
+    session: AsyncSession,
+    primary: LazyAsyncSession,
+    *,
+    user_id: str,
+    digest_ids: list[str],
+    include_sequence: bool = False,
+) -> tuple[list[Digest], AsyncSession]:
+    """
+    Find several of a user's digests on the read session, falling back to the
+    primary.
+
+    As with afind_digest_read_your_writes_or_raise, a replica that is missing
+    any of the digests, or still shows one PROCESSING, is bypassed and all of
+    them are read from the primary.
+
+    Args:
+        session: Read session (replica or primary)
+        primary: Primary session, opened only if the replica is bypassed
+        user_id: Owner of the digests
+        digest_ids: Digest ids (without duplicates)
+        include_sequence: If True, also load the digests' protein sequences
+
+    Returns:
+        The digests, in the order given, and the session they were read from
+
+    Raises:
+        HTTPException: 404 if any digest does not exist for the user
+    """
+    if is_read_replica(session):
+        digests = await Digest.afind_by_user_id_and_ids(
+            session, user_id, digest_ids, include_sequence=include_sequence
+        )
+        if len(digests) == len(digest_ids) and all(
+            digest.status != DigestStatusEnum.PROCESSING for digest in digests
+        ):
+            return digests, session
+
+        logger.debug(f"Replica behind for digest_ids={digest_ids}, reading primary")
+        session = primary.get()
+
+    digests = await Digest.afind_by_user_id_and_ids(
+        session, user_id, digest_ids, include_sequence=include_sequence
+    )
+    if len(digests) < len(digest_ids):
+        found = {digest.id for digest in digests}
+        missing = [digest_id for digest_id in digest_ids if digest_id not in found]
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=(
+                f"No Digest records found with user_id={user_id!r} and "
+                f"id in {missing!r}."
+            ),
+        )
+    return digests, session
+
+
+def request_accepts_ndjson(accept: str | None) -> bool:
+    """
+    Check whether the Accept header asks for newline-delimited JSON.
+
+    Args:
+        accept: Raw Accept header value (may be None).
+
+    Returns:
+        True if NDJSON is one of the accepted media types.
+    """
+    if not accept:
+        return False
+
+    media_types = {part.split(";", 1)[0].strip().lower() for part in accept.split(",")}
+    return NDJSON_MEDIA_TYPE in media_types
+
+
+def fieldset_response(content: BaseModel) -> Response:
+    """
+    Serialize a response built for a sparse fieldset.
+
+    Such responses hold only the requested fields, so they are written with
+    exclude_unset instead of being checked against the full response model.
+
+    Args:
+        content: Response model built with the requested fields only
+
+    Returns:
+        JSON response
+    """
+    return Response(
+        content=content.model_dump_json(exclude_unset=True),
+        media_type="application/json",
+    )
+
+
+async def stream_digest_peptides_ndjson(
+    digest_id: str,
+    criteria: Iterable[CriteriaRecord],
+    peptides: AsyncIterator[Peptide],
+    *,
+    batch_size: int,
+    fields: Collection[PeptideFieldEnum] | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Render a digest's peptides as NDJSON chunks.
+
+    The first line holds the digest id and criteria table; every following line is
+    one peptide in rank order. Lines are grouped into chunks of ``batch_size``
+    peptides so each write to the client carries a full cursor batch.
+
+    Args:
+        digest_id: The digest ID
+        criteria: Criteria used for this digest, in rank order
+        peptides: Async iterator of peptides in rank order
+        batch_size: Number of peptide lines per yielded chunk
+        fields: If given, only these peptide fields are written
+
+    Yields:
+        UTF-8 encoded NDJSON chunks
+    """
+    header = DigestPeptidesStreamHeader(
+        digest_id=digest_id,
+        criteria=[CriteriaResponse.model_validate(c) for c in criteria],
+    )
+    yield header.model_dump_json().encode() + b"\n"
+
+    count = 0
+    lines: list[bytes] = []
+    try:
+        async for peptide in peptides:
+            lines.append(
+                PeptideResponse.from_peptide(peptide, fields)
+                .model_dump_json(exclude_unset=True)
+                .encode()
+            )
+            if len(lines) >= batch_size:
+                count += len(lines)
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+
+        if lines:
+            count += len(lines)
+            yield b"\n".join(lines) + b"\n"
+    except Exception as e:
+        logger.error(
+            f"Error streaming peptides: digest_id={digest_id}, "
+            f"streamed={count}, error={str(e)}",
+            exc_info=True,
+        )
+        raise
+
+    logger.info(f"Streamed peptides: digest_id={digest_id} number={count}")
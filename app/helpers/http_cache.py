@@ -0,0 +1,99 @@
+"""
+Helpers for ETag based conditional GET support.
+"""
+
+import hashlib
+
+from fastapi import Response, status
+
+from app.core import settings
+from app.enums import DigestStatusEnum
+from app.models import Digest
+
+
+def build_etag(*parts: object) -> str:
+    """
+    Build a strong ETag from the values that identify a representation.
+
+    Args:
+        *parts: Values that change whenever the representation changes.
+
+    Returns:
+        Quoted ETag string
+    """
+    value = "|".join(str(part) for part in parts)
+    return f'"{hashlib.sha256(value.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Uses the weak comparison required for If-None-Match, so ``W/"x"`` matches
+    ``"x"``.
+
+    Args:
+        if_none_match: Raw If-None-Match header value (may be None)
+        etag: Current ETag of the representation
+
+    Returns:
+        True if the client already holds the current representation
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def digest_etag(digest: Digest, *variant: object) -> str:
+    """
+    Build the ETag for a representation of a digest.
+
+    Args:
+        digest: Digest record
+        *variant: Values that select between representations of the same
+            digest (endpoint, response format, ...)
+
+    Returns:
+        Quoted ETag string
+    """
+    return build_etag(
+        digest.id,
+        digest.status.value,
+        digest.updated_at.isoformat(),
+        *variant,
+    )
+
+
+def digest_cache_control(digest: Digest) -> str:
+    """
+    Return the Cache-Control value for a representation of a digest.
+
+    Completed digests never change, so they can be cached; anything else must be
+    revalidated on every use.
+    """
+    if digest.status == DigestStatusEnum.COMPLETED:
+        return f"private, max-age={settings.DIGEST_CACHE_MAX_AGE}, immutable"
+    return "private, no-cache"
+
+
+def criteria_cache_control() -> str:
+    """Return the Cache-Control value for the criteria catalogue."""
+    return f"public, max-age={settings.CRITERIA_CACHE_MAX_AGE}"
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    """Set ETag and Cache-Control headers on a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """Build an empty 304 Not Modified response carrying the cache headers."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, cache_control)
+    return response
@@ -1,13 +1,59 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.api import criteria_router, digest_router, health_router, users_router
 from app.core import settings
-from app.middleware import NginxValidatorMiddleware
+from app.db.pool import warm_up_async_engine, warm_up_engine
+from app.db.session import (
+    async_engine,
+    async_replica_engine,
+    engine,
+    replica_engine,
+)
+from app.middleware import CompressionMiddleware, RequestGuardMiddleware
+from app.models.criteria_registry import get_criteria_registry
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warm up the connection pools and load the criteria registry before serving
+    requests; close async connections on shutdown.
+    """
+    try:
+        warm_up_engine(engine, settings.DATABASE_POOL_WARMUP)
+        await warm_up_async_engine(async_engine, settings.DATABASE_POOL_WARMUP)
+        if settings.DATABASE_REPLICA_URL:
+            warm_up_engine(replica_engine, settings.DATABASE_POOL_WARMUP)
+            await warm_up_async_engine(
+                async_replica_engine, settings.DATABASE_POOL_WARMUP
+            )
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not warm up database connection pools: {str(e)}")
 
-app = FastAPI(title="QPeptide Finder Backend", version="0.1.0")
+    try:
+        get_criteria_registry()
+    except SQLAlchemyError as e:
+        logger.warning(
+            f"Could not load criteria registry at startup, "
+            f"will load on first use: {str(e)}"
+        )
+    yield
+    await async_engine.dispose()
+    if settings.DATABASE_REPLICA_URL:
+        await async_replica_engine.dispose()
 
-app.add_middleware(NginxValidatorMiddleware)
+
+app = FastAPI(title="QPeptide Finder Backend", version="0.1.0", lifespan=lifespan)
+
+app.add_middleware(RequestGuardMiddleware, api_prefix=settings.API_V1_PREFIX)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +63,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.RESPONSE_COMPRESSION_MINIMUM_SIZE,
+    cache_bytes=settings.RESPONSE_COMPRESSION_CACHE_BYTES,
+)
+
 app.include_router(health_router)
 app.include_router(users_router, prefix=settings.API_V1_PREFIX)
 app.include_router(digest_router, prefix=settings.API_V1_PREFIX)
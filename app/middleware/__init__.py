@@ -1,3 +1,4 @@
-from app.middleware.nginx_validator import NginxValidatorMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.request_guard import RequestGuardMiddleware
 
-__all__ = ["NginxValidatorMiddleware"]
+__all__ = ["CompressionMiddleware", "RequestGuardMiddleware"]
@@ -0,0 +1,344 @@
+import zlib
+from collections import OrderedDict
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.helpers.digest_payload import accept_encoding_weights
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+class _Encoder(Protocol):
+    """Incremental compressor for one response body."""
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipEncoder:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        chunk: bytes = self._compressor.process(data)
+        return chunk
+
+    def flush(self) -> bytes:
+        chunk: bytes = self._compressor.flush()
+        return chunk
+
+    def finish(self) -> bytes:
+        chunk: bytes = self._compressor.finish()
+        return chunk
+
+
+class _ZstdEncoder:
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        chunk: bytes = self._compressor.compress(data)
+        return chunk
+
+    def flush(self) -> bytes:
+        chunk: bytes = self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return chunk
+
+    def finish(self) -> bytes:
+        chunk: bytes = self._compressor.flush()
+        return chunk
+
+
+# Supported codings in order of preference, for equally weighted Accept-Encoding
+ENCODERS: dict[str, type[_Encoder]] = {
+    **({"zstd": _ZstdEncoder} if ZSTD_AVAILABLE else {}),
+    **({"br": _BrotliEncoder} if BROTLI_AVAILABLE else {}),
+    "gzip": _GzipEncoder,
+}
+
+
+def select_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick the response coding for an Accept-Encoding header.
+
+    The coding with the highest q-value among those available wins; ties go to
+    the order of ENCODERS. ``*`` stands for any coding not listed.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value (may be None).
+
+    Returns:
+        The coding name, or None to send the body unencoded.
+    """
+    weights = accept_encoding_weights(accept_encoding)
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in ENCODERS:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressedBodyCache:
+    """
+    LRU cache of compressed response bodies, bounded by total size.
+
+    Entries are keyed by (ETag, coding); only responses marked immutable are
+    stored, so an ETag always names the same body.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    def get(self, key: tuple[str, str]) -> bytes | None:
+        """Return a cached body and mark it recently used."""
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: tuple[str, str], body: bytes) -> None:
+        """Store a body, evicting the least recently used ones to stay in budget."""
+        if len(body) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.size = 0
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with gzip, or br/zstd when brotli/zstandard are
+    installed and preferred by the client.
+
+    Bodies below ``minimum_size`` are sent as they are. Streamed bodies are
+    compressed chunk by chunk and flushed after each one. Responses that already
+    carry a Content-Encoding (such as stored gzip payloads), byte-range
+    responses and Cache-Control: no-transform responses are left untouched.
+
+    An encoded body is a different representation from the identity one, so its
+    ETag is made weak (``W/"..."``); If-None-Match still matches it, as that
+    comparison is weak. A 304 keeps the ETag form the client revalidated with:
+    it is only weakened when the client's If-None-Match holds the weak tag,
+    i.e. the 200 it stored was encoded.
+
+    Responses that are sent unencoded although they could have been encoded
+    (the client accepted no coding) still get ``Vary: Accept-Encoding``, so
+    caches keep them apart from the encoded ones.
+
+    Compressed bodies of responses with an ETag and Cache-Control: immutable
+    (completed digests) are cached, so a hot digest is compressed once rather
+    than on every request.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, cache_bytes: int = 0
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedBodyCache(cache_bytes) if cache_bytes > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        coding = select_encoding(headers.get("accept-encoding"))
+        responder = _CompressionResponder(
+            self, coding, headers.get("if-none-match"), send
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper of CompressionMiddleware."""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        coding: str | None,
+        if_none_match: str | None,
+        send: Send,
+    ):
+        self.middleware = middleware
+        self.coding = coding
+        self.if_none_match = if_none_match
+        self._send = send
+        self.start: Message | None = None
+        self.encoder: _Encoder | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or "content-range" in headers
+                or "accept-ranges" in headers
+                or "no-transform" in headers.get("cache-control", "")
+            )
+            if message["status"] == 304 and not self.passthrough:
+                headers.add_vary_header("Accept-Encoding")
+                if _revalidates_weak_etag(headers, self.if_none_match):
+                    # the 200 being revalidated was sent encoded, under a weak ETag
+                    _weaken_etag(headers)
+            self.passthrough = self.passthrough or message["status"] in (
+                204,
+                206,
+                304,
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            small = not more_body and len(body) < self.middleware.minimum_size
+            if self.passthrough or small or self.coding is None:
+                if not self.passthrough and not small:
+                    # encodable, but the client accepted no coding
+                    MutableHeaders(raw=start["headers"]).add_vary_header(
+                        "Accept-Encoding"
+                    )
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            if more_body:
+                self.encoder = ENCODERS[self.coding]()
+                self._set_encoding_headers(headers, self.coding)
+                del headers["content-length"]
+                await self._send(start)
+                await self._send(
+                    {
+                        "type": "http.response.body",
+                        "body": self.encoder.compress(body) + self.encoder.flush(),
+                        "more_body": True,
+                    }
+                )
+                return
+
+            compressed = self._compress_once(body, headers, self.coding)
+            self._set_encoding_headers(headers, self.coding)
+            headers["content-length"] = str(len(compressed))
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.passthrough or self.encoder is None:
+            await self._send(message)
+            return
+
+        chunk = self.encoder.compress(body)
+        chunk += self.encoder.flush() if more_body else self.encoder.finish()
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _compress_once(
+        self, body: bytes, headers: MutableHeaders, coding: str
+    ) -> bytes:
+        """Compress a complete body, through the cache for immutable responses."""
+        cache = self.middleware.cache
+        etag = headers.get("etag")
+        key = None
+        if (
+            cache is not None
+            and etag
+            and "immutable" in headers.get("cache-control", "")
+        ):
+            key = (etag, coding)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        encoder = ENCODERS[coding]()
+        compressed = encoder.compress(body) + encoder.finish()
+        if key is not None and cache is not None:
+            cache.put(key, compressed)
+        return compressed
+
+    def _set_encoding_headers(self, headers: MutableHeaders, coding: str) -> None:
+        """Mark the response as encoded for the chosen coding."""
+        headers["content-encoding"] = coding
+        headers.add_vary_header("Accept-Encoding")
+        _weaken_etag(headers)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """Mark a strong ETag weak, as it no longer names the identity body."""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = f"W/{etag}"
+
+
+def _revalidates_weak_etag(headers: MutableHeaders, if_none_match: str | None) -> bool:
+    """
+    Check whether a 304's client revalidated with the weak form of its ETag.
+
+    Args:
+        headers: Headers of the 304 response
+        if_none_match: Raw If-None-Match header of the request (may be None).
+
+    Returns:
+        True if If-None-Match lists ``W/<etag>``, so the 200 the client stored
+        was sent encoded.
+    """
+    etag = headers.get("etag")
+    if not etag or not if_none_match or etag.startswith("W/"):
+        return False
+    return f"W/{etag}" in (tag.strip() for tag in if_none_match.split(","))
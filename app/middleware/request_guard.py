@@ -0,0 +1,142 @@
+import hmac
+import json
+import logging
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import settings
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = "/health"
+METRICS_PATH = "/metrics"
+# Served to nginx or to local probes (Docker healthchecks, metrics scrapers)
+LOCAL_PATHS = frozenset((HEALTH_PATH, METRICS_PATH))
+LOCAL_HOSTS = frozenset(("127.0.0.1", "localhost", "::1"))
+
+DIRECT_ACCESS_DETAIL = "Direct access not allowed. Use nginx proxy."
+MISSING_API_KEY_DETAIL = "Missing API key. X-API-Key header required."
+INVALID_API_KEY_DETAIL = "Invalid API key"
+
+
+def _forbidden_body(detail: str) -> bytes:
+    """Encode a 403 body the way HTTPException would."""
+    return json.dumps({"detail": detail}, separators=(",", ":")).encode()
+
+
+_FORBIDDEN_BODIES = {
+    detail: _forbidden_body(detail)
+    for detail in (DIRECT_ACCESS_DETAIL, MISSING_API_KEY_DETAIL, INVALID_API_KEY_DETAIL)
+}
+
+
+class RequestGuardMiddleware:
+    """
+    Reject requests that did not come through the nginx proxy or that lack the
+    internal API key, before they reach routing.
+
+    - Paths under the API prefix (``API_V1_PREFIX``, where the routers are
+      mounted) need ``X-Forwarded-By: nginx`` and, when ``API_KEY`` is set, a
+      matching ``X-API-Key`` (compared in constant time).
+    - ``/health`` and ``/metrics`` need the nginx header or a localhost
+      client, so Docker healthchecks and local scrapers keep working; they need
+      no API key.
+    - Every other path passes through.
+
+    Rejected requests get a 403 JSON body sent straight over ASGI; no Request
+    object is built and the app is never called.
+    """
+
+    def __init__(self, app: ASGIApp, api_prefix: str | None = None) -> None:
+        self.app = app
+        self.api_prefix = (api_prefix or settings.API_V1_PREFIX).rstrip("/")
+        self._api_prefix_slash = self.api_prefix + "/"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope["path"]
+        if path in LOCAL_PATHS:
+            detail = self._check_local(scope, path)
+        elif path == self.api_prefix or path.startswith(self._api_prefix_slash):
+            detail = self._check_api(scope, path)
+        else:
+            detail = None
+
+        if detail is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _send_forbidden(send, detail)
+
+    @staticmethod
+    def _check_local(scope: Scope, path: str) -> str | None:
+        """Allow /health and /metrics through nginx or from localhost."""
+        forwarded_by, _ = _read_headers(scope)
+        client_host = _client_host(scope)
+        if forwarded_by == b"nginx" or client_host in LOCAL_HOSTS:
+            return None
+        logger.warning(f"Direct access attempt to {path} from {client_host}")
+        return DIRECT_ACCESS_DETAIL
+
+    @staticmethod
+    def _check_api(scope: Scope, path: str) -> str | None:
+        """Allow API paths through nginx with a valid API key."""
+        forwarded_by, api_key = _read_headers(scope)
+        if forwarded_by != b"nginx":
+            logger.warning(
+                f"Direct access attempt to {path} from {_client_host(scope)}"
+            )
+            return DIRECT_ACCESS_DETAIL
+
+        expected = settings.API_KEY
+        if not expected:
+            return None
+        if not api_key:
+            logger.warning("API key missing from request")
+            return MISSING_API_KEY_DETAIL
+        if not hmac.compare_digest(api_key, expected.encode()):
+            logger.warning("Invalid API key attempt from request")
+            return INVALID_API_KEY_DETAIL
+        return None
+
+
+def _read_headers(scope: Scope) -> tuple[bytes | None, bytes | None]:
+    """
+    Read X-Forwarded-By and X-API-Key from the raw ASGI headers in one pass.
+
+    Args:
+        scope: ASGI connection scope (header names are lower-case bytes).
+
+    Returns:
+        (forwarded_by, api_key), each None when the header is absent.
+    """
+    forwarded_by = api_key = None
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-by":
+            forwarded_by = value
+        elif name == b"x-api-key":
+            api_key = value
+    return forwarded_by, api_key
+
+
+def _client_host(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def _send_forbidden(send: Send, detail: str) -> None:
+    body = _FORBIDDEN_BODIES[detail]
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -1,8 +1,19 @@
 from app.models.criteria import Criteria
 from app.models.digest import Digest
 from app.models.digest_criteria import DigestCriteria
+from app.models.digest_payload import DigestPayload
 from app.models.peptide import Peptide
 from app.models.peptide_criteria import PeptideCriteria
+from app.models.protein_sequence import ProteinSequence
 from app.models.user import User
 
-__all__ = ["User", "Peptide", "Digest", "PeptideCriteria", "Criteria", "DigestCriteria"]
+__all__ = [
+    "User",
+    "Peptide",
+    "Digest",
+    "PeptideCriteria",
+    "Criteria",
+    "DigestCriteria",
+    "DigestPayload",
+    "ProteinSequence",
+]
@@ -1,19 +1,58 @@
 import logging
+from collections.abc import Sequence
 from datetime import UTC, datetime
-from typing import Self
-from uuid import uuid4
+from typing import Any, Self, overload
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import DateTime, Select, String, select
+from sqlalchemy import (
+    BINARY,
+    ColumnElement,
+    DateTime,
+    Dialect,
+    Row,
+    Select,
+    String,
+    TypeDecorator,
+    delete,
+    exists,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 logger = logging.getLogger(__name__)
 
 
-class Base(DeclarativeBase):
+class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
+class BinaryUUID(TypeDecorator[str]):
+    """
+    UUID stored as BINARY(16) and exposed to Python as its 36-character string.
+
+    Keys and the indexes that carry them are less than half the size of a
+    String(36) key, while models, queries and API responses keep using the usual
+    string form.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> bytes | None:
+        """Convert a UUID string to its 16 raw bytes."""
+        if value is None:
+            return None
+        return UUID(value).bytes
+
+    def process_result_value(self, value: bytes | None, dialect: Dialect) -> str | None:
+        """Convert 16 raw bytes back to the UUID string."""
+        if value is None:
+            return None
+        return str(UUID(bytes=value))
+
+
 class QueryMixin:
     """Mixin class providing query methods for models."""
 
@@ -71,21 +110,116 @@ class QueryMixin:
 
         return instance
 
+    @overload
+    @classmethod
+    def find_by(
+        cls, session: Session, *, columns: None = None, **kwargs
+    ) -> list[Self]: ...
+
+    @overload
+    @classmethod
+    def find_by(
+        cls, session: Session, *, columns: Sequence[str], **kwargs
+    ) -> list[Row[Any]]: ...
+
     @classmethod
     def find_by(
         cls,
         session: Session,
+        *,
+        columns: Sequence[str] | None = None,
         **kwargs,
-    ) -> list[Self]:
+    ) -> list[Self] | list[Row[Any]]:
         """
         Find all records matching the given criteria.
 
         Args:
             session: Database session
+            columns: If given, select only these fields and return rows instead
+                of model instances.
             **kwargs: Keyword arguments representing field=value pairs to match.
 
         Returns:
-            List of matching records (can be empty)
+            List of matching records, or of rows holding ``columns`` (can be empty)
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        if columns is not None:
+            return list(session.execute(cls._select_by(columns, **kwargs)).all())
+
+        results = session.scalars(cls._select_by(**kwargs)).all()
+        return list(results)
+
+    @classmethod
+    def exists_by(
+        cls,
+        session: Session,
+        **kwargs,
+    ) -> bool:
+        """
+        Check whether any record matches the given criteria without loading it.
+
+        Args:
+            session: Database session
+            **kwargs: Keyword arguments representing field=value pairs to match.
+
+        Returns:
+            True if at least one record matches
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        return bool(session.scalar(cls._exists_by(**kwargs)))
+
+    @classmethod
+    def exists_by_or_raise(
+        cls,
+        session: Session,
+        **kwargs,
+    ) -> None:
+        """
+        Check that a record matches the given criteria, or raise exception.
+
+        Args:
+            session: Database session
+            **kwargs: Keyword arguments representing field=value pairs to match.
+
+        Raises:
+            HTTPException: 404 if no record matches
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        if not cls.exists_by(session, **kwargs):
+            raise cls._not_found(**kwargs)
+
+    @classmethod
+    def _select_by(cls, columns: Sequence[str] | None = None, **kwargs) -> Select:
+        """
+        Build a select of this model filtered by field=value pairs.
+
+        Args:
+            columns: If given, select only these fields instead of the model.
+            **kwargs: Keyword arguments representing field=value pairs to match.
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        query: Select = (
+            select(*(cls._attribute(name) for name in columns))
+            if columns is not None
+            else select(cls)
+        )
+
+        return query.where(*cls._criteria(**kwargs))
+
+    @classmethod
+    def _criteria(cls, **kwargs) -> list[ColumnElement[bool]]:
+        """
+        Build the WHERE clauses for field=value pairs.
 
         Raises:
             ValueError: If no search criteria provided
@@ -96,16 +230,43 @@ class QueryMixin:
                 f"Cannot query {cls.__name__}: no search criteria provided"
             )
 
-        query: Select = select(cls)
+        return [cls._attribute(key) == value for key, value in kwargs.items()]
 
+    @classmethod
+    def _exists_by(cls, **kwargs) -> Select:
+        """Build a SELECT EXISTS(...) for records matching field=value pairs."""
+        return select(exists(cls._select_by(**kwargs)))
+
+    @classmethod
+    def _attribute(cls, name: str) -> Any:
+        """
+        Return the mapped attribute called ``name``.
+
+        Raises:
+            AttributeError: If the model has no such attribute
+        """
+        if not hasattr(cls, name):
+            raise AttributeError(f"{cls.__name__} has no attribute '{name}'")
+        return getattr(cls, name)
+
+    @classmethod
+    def _matches(cls, record: Self | None, **kwargs) -> Self | None:
+        """Return ``record`` if it has every field=value pair, else None."""
+        if record is None:
+            return None
         for key, value in kwargs.items():
-            if not hasattr(cls, key):
-                raise AttributeError(f"{cls.__name__} has no attribute '{key}'")
-            column = getattr(cls, key)
-            query = query.where(column == value)
+            if getattr(record, key) != value:
+                return None
+        return record
 
-        results = session.scalars(query).all()
-        return list(results)
+    @classmethod
+    def _not_found(cls, **kwargs) -> HTTPException:
+        """Build the 404 raised when no record matches the given criteria."""
+        criteria = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {cls.__name__} records found with {criteria}.",
+        )
 
     @classmethod
     def find_by_or_raise(
@@ -131,11 +292,7 @@ class QueryMixin:
         records = cls.find_by(session, **kwargs)
 
         if not records:
-            criteria = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No {cls.__name__} records found with {criteria}.",
-            )
+            raise cls._not_found(**kwargs)
 
         return records
 
@@ -152,6 +309,10 @@ class QueryMixin:
             session: Database session
             **kwargs: Keyword arguments representing field=value pairs to match.
 
+        Lookups that include ``id`` go through Session.get, so a record already
+        in the identity map costs no query; the remaining criteria are checked
+        on the loaded record. Other lookups select with LIMIT 1.
+
         Returns:
             The found record if exists, None otherwise
 
@@ -159,8 +320,24 @@ class QueryMixin:
             ValueError: If no search criteria provided
             AttributeError: If invalid field names provided
         """
-        records = cls.find_by(session, **kwargs)
-        return records[0] if records else None
+        if "id" in kwargs:
+            criteria = dict(kwargs)
+            record = session.get(cls, criteria.pop("id"))
+            return cls._matches(record, **cls._check_attributes(**criteria))
+
+        return session.scalars(cls._select_by(**kwargs).limit(1)).first()
+
+    @classmethod
+    def _check_attributes(cls, **kwargs) -> dict[str, Any]:
+        """
+        Validate field names before matching them against a loaded record.
+
+        Raises:
+            AttributeError: If invalid field names provided
+        """
+        for key in kwargs:
+            cls._attribute(key)
+        return kwargs
 
     @classmethod
     def find_one_by_or_raise(
@@ -183,16 +360,12 @@ class QueryMixin:
             ValueError: If no search criteria provided
             AttributeError: If invalid field names provided
         """
-        records = cls.find_by_or_raise(session, **kwargs)
+        record = cls.find_one_by(session, **kwargs)
 
-        if len(records) > 1:
-            criteria = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
-            logger.warning(
-                f"Multiple {cls.__name__} records found with {criteria}. "
-                f"Returning first result."
-            )
+        if record is None:
+            raise cls._not_found(**kwargs)
 
-        return records[0]
+        return record
 
     @classmethod
     def delete(
@@ -221,6 +394,79 @@ class QueryMixin:
             session.rollback()
             raise
 
+    @classmethod
+    def delete_by(
+        cls,
+        session: Session,
+        *,
+        commit: bool = True,
+        **kwargs,
+    ) -> int:
+        """
+        Delete all records matching the given criteria with one DELETE statement.
+
+        Records are not loaded: child rows are removed by the database through
+        the ON DELETE CASCADE foreign keys, so memory use does not depend on how
+        many children a record has.
+
+        Args:
+            session: Database session
+            commit: If True, commit the transaction.
+            **kwargs: Keyword arguments representing field=value pairs to match.
+
+        Returns:
+            Number of records deleted
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+            IntegrityError: If a database constraint violation occurs
+        """
+        statement = delete(cls).where(*cls._criteria(**kwargs))
+
+        try:
+            result = session.execute(statement)
+            if commit:
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return int(result.rowcount)  # type: ignore[attr-defined]
+
+    @classmethod
+    def delete_by_or_raise(
+        cls,
+        session: Session,
+        *,
+        commit: bool = True,
+        **kwargs,
+    ) -> int:
+        """
+        Delete all records matching the given criteria, or raise exception if
+        none matched.
+
+        Args:
+            session: Database session
+            commit: If True, commit the transaction.
+            **kwargs: Keyword arguments representing field=value pairs to match.
+
+        Returns:
+            Number of records deleted (at least one)
+
+        Raises:
+            HTTPException: 404 if no records matched
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+            IntegrityError: If a database constraint violation occurs
+        """
+        deleted = cls.delete_by(session, commit=commit, **kwargs)
+
+        if not deleted:
+            raise cls._not_found(**kwargs)
+
+        return deleted
+
     @classmethod
     def update(
         cls,
@@ -269,6 +515,274 @@ class QueryMixin:
 
         return record
 
+    @classmethod
+    async def acreate(
+        cls,
+        session: AsyncSession,
+        *,
+        flush: bool = False,
+        refresh: bool = True,
+        commit: bool = True,
+        **kwargs,
+    ) -> Self:
+        """
+        Create a new database record using an async session.
+
+        See create() for the meaning of the arguments.
+
+        Raises:
+            IntegrityError: If a database constraint violation occurs
+            TypeError: If invalid kwargs are provided to the model constructor
+            ValueError: If model validation fails or no kwargs provided
+        """
+        if not kwargs:
+            raise ValueError(
+                f"Cannot create {cls.__name__} record: no keyword arguments provided"
+            )
+
+        instance = cls(**kwargs)
+        session.add(instance)
+
+        if flush:
+            await session.flush()
+
+        if commit:
+            try:
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+        if refresh:
+            await session.refresh(instance)
+
+        return instance
+
+    @overload
+    @classmethod
+    async def afind_by(
+        cls, session: AsyncSession, *, columns: None = None, **kwargs
+    ) -> list[Self]: ...
+
+    @overload
+    @classmethod
+    async def afind_by(
+        cls, session: AsyncSession, *, columns: Sequence[str], **kwargs
+    ) -> list[Row[Any]]: ...
+
+    @classmethod
+    async def afind_by(
+        cls,
+        session: AsyncSession,
+        *,
+        columns: Sequence[str] | None = None,
+        **kwargs,
+    ) -> list[Self] | list[Row[Any]]:
+        """
+        Find all records matching the given criteria using an async session.
+
+        See find_by() for the meaning of the arguments.
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        if columns is not None:
+            result = await session.execute(cls._select_by(columns, **kwargs))
+            return list(result.all())
+
+        results = (await session.scalars(cls._select_by(**kwargs))).all()
+        return list(results)
+
+    @classmethod
+    async def aexists_by(
+        cls,
+        session: AsyncSession,
+        **kwargs,
+    ) -> bool:
+        """
+        Check whether any record matches the given criteria using an async
+        session, without loading it.
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        return bool(await session.scalar(cls._exists_by(**kwargs)))
+
+    @classmethod
+    async def aexists_by_or_raise(
+        cls,
+        session: AsyncSession,
+        **kwargs,
+    ) -> None:
+        """
+        Check that a record matches the given criteria using an async session,
+        or raise exception.
+
+        Raises:
+            HTTPException: 404 if no record matches
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        if not await cls.aexists_by(session, **kwargs):
+            raise cls._not_found(**kwargs)
+
+    @classmethod
+    async def afind_by_or_raise(
+        cls,
+        session: AsyncSession,
+        **kwargs,
+    ) -> list[Self]:
+        """
+        Find all records matching the given criteria using an async session,
+        or raise exception if none found.
+
+        Raises:
+            HTTPException: 404 if no records found
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        records: list[Self] = await cls.afind_by(session, **kwargs)
+
+        if not records:
+            raise cls._not_found(**kwargs)
+
+        return records
+
+    @classmethod
+    async def afind_one_by(
+        cls,
+        session: AsyncSession,
+        **kwargs,
+    ) -> Self | None:
+        """
+        Find a single record matching the given criteria using an async session.
+
+        See find_one_by() for how ``id`` lookups use the identity map.
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        if "id" in kwargs:
+            criteria = dict(kwargs)
+            record = await session.get(cls, criteria.pop("id"))
+            return cls._matches(record, **cls._check_attributes(**criteria))
+
+        return (await session.scalars(cls._select_by(**kwargs).limit(1))).first()
+
+    @classmethod
+    async def afind_one_by_or_raise(
+        cls,
+        session: AsyncSession,
+        **kwargs,
+    ) -> Self:
+        """
+        Find a single record matching the given criteria using an async session,
+        or raise exception if not found.
+
+        Raises:
+            HTTPException: 404 if record not found
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+        """
+        record = await cls.afind_one_by(session, **kwargs)
+
+        if record is None:
+            raise cls._not_found(**kwargs)
+
+        return record
+
+    @classmethod
+    async def adelete(
+        cls,
+        session: AsyncSession,
+        record: Self,
+    ) -> None:
+        """
+        Delete a record instance using an async session.
+
+        Raises:
+            IntegrityError: If a database constraint violation occurs
+        """
+        await session.delete(record)
+
+        try:
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+    @classmethod
+    async def adelete_by(
+        cls,
+        session: AsyncSession,
+        *,
+        commit: bool = True,
+        **kwargs,
+    ) -> int:
+        """
+        Delete all records matching the given criteria with one DELETE statement
+        using an async session.
+
+        See delete_by() for how child rows are removed.
+
+        Raises:
+            ValueError: If no search criteria provided
+            AttributeError: If invalid field names provided
+            IntegrityError: If a database constraint violation occurs
+        """
+        statement = delete(cls).where(*cls._criteria(**kwargs))
+
+        try:
+            result = await session.execute(statement)
+            if commit:
+                await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        return int(result.rowcount)  # type: ignore[attr-defined]
+
+    @classmethod
+    async def aupdate(
+        cls,
+        session: AsyncSession,
+        record: Self,
+        *,
+        values: dict,
+        refresh: bool = True,
+    ) -> Self:
+        """
+        Update a record with new values using an async session.
+
+        Raises:
+            ValueError: If no update values provided
+            AttributeError: If invalid field names provided
+            IntegrityError: If a database constraint violation occurs
+        """
+        if not values:
+            raise ValueError(
+                f"Cannot update {cls.__name__}: no update values provided in 'values'"
+            )
+
+        for key, value in values.items():
+            if not hasattr(record, key):
+                raise AttributeError(f"{cls.__name__} has no attribute '{key}'")
+            setattr(record, key, value)
+
+        try:
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        if refresh:
+            await session.refresh(record)
+
+        return record
+
 
 class BaseModel(QueryMixin, Base):
     """Base model with common fields for all tables."""
@@ -294,6 +808,21 @@ class BaseModel(QueryMixin, Base):
     )
 
 
+class BaseModelBinaryKey(QueryMixin, Base):
+    """
+    Base model with a BINARY(16) UUID primary key (no timestamps), for
+    high-volume tables.
+    """
+
+    __abstract__ = True
+
+    id: Mapped[str] = mapped_column(
+        BinaryUUID(),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+    )
+
+
 class BaseModelNoTimestamps(QueryMixin, Base):
     """Base model with only primary key (no timestamps)."""
 
@@ -1,5 +1,5 @@
 # app/models/criteria.py
-from functools import lru_cache
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 from sqlalchemy import Boolean, Integer, String, Text, asc, select
@@ -57,11 +57,42 @@ class Criteria(BaseModelNoTimestamps):
         back_populates="criteria",
     )
 
+    @staticmethod
+    def ranks_to_mask(ranks: Iterable[int]) -> int:
+        """
+        Encode criteria ranks as a bitmask (bit ``rank - 1`` set for each rank).
+
+        Args:
+            ranks: Criteria ranks (1-based)
+
+        Returns:
+            Integer bitmask of the given ranks
+        """
+        mask = 0
+        for rank in ranks:
+            mask |= 1 << (rank - 1)
+        return mask
+
+    @staticmethod
+    def mask_to_ranks(mask: int) -> list[int]:
+        """
+        Decode a criteria bitmask back into ascending criteria ranks.
+
+        Args:
+            mask: Integer bitmask produced by ranks_to_mask
+
+        Returns:
+            List of criteria ranks (ascending)
+        """
+        return [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+
     @classmethod
-    @lru_cache(maxsize=1)
     def get_all_ordered_by_rank(cls, session: Session) -> list["Criteria"]:
         """
-        Get all criteria ordered by rank (cached).
+        Get all criteria ordered by rank.
+
+        Request and job code should read criteria through the criteria registry
+        (app.models.criteria_registry), which is loaded from this query once.
 
         Args:
             session: Database session
@@ -0,0 +1,171 @@
+"""
+Process-wide, read-only registry of the criteria catalogue.
+
+The criteria table is reference data that only changes through migrations, so
+it is loaded once (at startup, or lazily on first use) into immutable records
+indexed by id, code and rank. Request handlers and job workers resolve criteria
+from the registry instead of querying the database.
+"""
+
+import hashlib
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.enums import CriteriaEnum
+from app.models.criteria import Criteria
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CriteriaRecord:
+    """Detached, immutable copy of a criteria row."""
+
+    id: str
+    code: CriteriaEnum
+    goal: str
+    rationale: str
+    rank: int
+    is_optional: bool
+
+
+@dataclass(frozen=True)
+class CriteriaRegistry:
+    """Immutable snapshot of the criteria catalogue."""
+
+    records: tuple[CriteriaRecord, ...]
+    by_id: Mapping[str, CriteriaRecord]
+    by_code: Mapping[CriteriaEnum, CriteriaRecord]
+    by_rank: Mapping[int, CriteriaRecord]
+    version: str
+
+    @classmethod
+    def from_records(cls, records: list[CriteriaRecord]) -> "CriteriaRegistry":
+        """
+        Build a registry from criteria records.
+
+        Args:
+            records: Criteria records in any order
+
+        Returns:
+            CriteriaRegistry with records ordered by rank and a version stamp
+            derived from their contents
+        """
+        ordered = tuple(sorted(records, key=lambda r: r.rank))
+        version = hashlib.sha256(repr(ordered).encode()).hexdigest()[:16]
+        return cls(
+            records=ordered,
+            by_id=MappingProxyType({r.id: r for r in ordered}),
+            by_code=MappingProxyType({r.code: r for r in ordered}),
+            by_rank=MappingProxyType({r.rank: r for r in ordered}),
+            version=version,
+        )
+
+    @classmethod
+    def from_session(cls, session: Session) -> "CriteriaRegistry":
+        """Load the criteria table into a new registry."""
+        return cls.from_records(
+            [
+                CriteriaRecord(
+                    id=c.id,
+                    code=c.code,
+                    goal=c.goal,
+                    rationale=c.rationale,
+                    rank=c.rank,
+                    is_optional=c.is_optional,
+                )
+                for c in Criteria.get_all_ordered_by_rank(session)
+            ]
+        )
+
+    def for_codes(self, codes: list[str]) -> list[CriteriaRecord]:
+        """
+        Return the records for the given criteria codes, in rank order.
+
+        Args:
+            codes: Criteria codes (enum values)
+
+        Returns:
+            List of matching criteria records ordered by rank
+        """
+        return sorted(
+            (self.by_code[CriteriaEnum(code)] for code in codes),
+            key=lambda r: r.rank,
+        )
+
+
+_registry: CriteriaRegistry | None = None
+_lock = threading.Lock()
+
+
+def load_criteria_registry(session: Session | None = None) -> CriteriaRegistry:
+    """
+    (Re)load the criteria registry from the database and install it.
+
+    Args:
+        session: Database session to read from. If None, a new session is opened.
+
+    Returns:
+        The newly installed registry
+    """
+    global _registry
+    with _lock:
+        if session is not None:
+            registry = CriteriaRegistry.from_session(session)
+        else:
+            with SessionLocal() as own_session:
+                registry = CriteriaRegistry.from_session(own_session)
+        _registry = registry
+
+    logger.info(
+        f"Loaded criteria registry: {len(registry.records)} criteria, "
+        f"version={registry.version}"
+    )
+    return registry
+
+
+def get_criteria_registry(session: Session | None = None) -> CriteriaRegistry:
+    """
+    Return the installed criteria registry, loading it on first use.
+
+    Args:
+        session: Database session to load from if the registry is not loaded yet
+
+    Returns:
+        The current criteria registry
+    """
+    registry = _registry
+    if registry is None:
+        registry = load_criteria_registry(session)
+    return registry
+
+
+async def aget_criteria_registry(session: AsyncSession) -> CriteriaRegistry:
+    """
+    Return the installed criteria registry, loading it through an async session
+    on first use.
+
+    Args:
+        session: Async database session to load from if not loaded yet
+
+    Returns:
+        The current criteria registry
+    """
+    registry = _registry
+    if registry is None:
+        registry = await session.run_sync(load_criteria_registry)
+    return registry
+
+
+def invalidate_criteria_registry() -> None:
+    """Drop the installed registry so the next access reloads it."""
+    global _registry
+    with _lock:
+        _registry = None
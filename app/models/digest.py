@@ -1,20 +1,49 @@
+from collections.abc import Collection
+from datetime import datetime
 from typing import TYPE_CHECKING, Self
+from uuid import uuid4
 
+from sqlalchemy import (
+    Connection,
+    ForeignKey,
+    Index,
+    Row,
+    String,
+    and_,
+    event,
+    or_,
+    select,
+)
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, String
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    Mapped,
+    Mapper,
+    Session,
+    joinedload,
+    load_only,
+    mapped_column,
+    object_session,
+    raiseload,
+    relationship,
+    selectinload,
+)
 
-from app.enums import CriteriaEnum, DigestStatusEnum, ProteaseEnum
+from app.enums import CriteriaEnum, DigestFieldEnum, DigestStatusEnum, ProteaseEnum
 from app.models.base import BaseModel
-from app.models.criteria import Criteria
+from app.models.criteria_registry import get_criteria_registry
 from app.models.digest_criteria import DigestCriteria
+from app.models.protein_sequence import ProteinSequence
 
 if TYPE_CHECKING:
     from app.models import Peptide, User
+    from app.models.criteria_registry import CriteriaRecord
 
 
 class Digest(BaseModel):
     __tablename__ = "digests"
+    __table_args__ = (Index("ix_digests_user_id_created_at", "user_id", "created_at"),)
 
     status: Mapped[DigestStatusEnum] = mapped_column(
         SQLEnum(DigestStatusEnum, native_enum=False, length=20),
@@ -33,9 +62,23 @@ class Digest(BaseModel):
         nullable=False,
     )
     protein_name: Mapped[str] = mapped_column(String(200), nullable=True)
-    sequence: Mapped[str] = mapped_column(String(3000), default="", nullable=False)
+    sequence_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey(
+            "protein_sequences.hash",
+            name="fk_digests_sequence_hash_protein_sequences",
+            ondelete="RESTRICT",
+        ),
+        nullable=False,
+        index=True,
+    )
 
     user: Mapped["User"] = relationship(back_populates="digests")
+    # Loaded only where the sequence is used: see aload_sequence and the
+    # sequence field of afind_one_by_user_id_and_id / afind_by_user_id_and_ids
+    protein_sequence: Mapped[ProteinSequence] = relationship(
+        lazy="select", viewonly=True
+    )
     peptides: Mapped[list["Peptide"]] = relationship(
         back_populates="digest", cascade="all, delete-orphan", passive_deletes=True
     )
@@ -43,8 +86,41 @@ class Digest(BaseModel):
     digest_criteria: Mapped[list["DigestCriteria"]] = relationship(
         back_populates="digest",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
+    @property
+    def sequence(self) -> str:
+        """Protein sequence, stored once per distinct sequence in protein_sequences."""
+        pending: str | None = self.__dict__.get("_pending_sequence")
+        if pending is not None:
+            return pending
+        return self.protein_sequence.sequence
+
+    @sequence.setter
+    def sequence(self, sequence: str) -> None:
+        """
+        Point the digest at a protein sequence by hash.
+
+        The protein_sequences row is written, if missing, just before the digest
+        row is (see _store_protein_sequence).
+        """
+        self._pending_sequence = sequence
+        self.sequence_hash = ProteinSequence.hash_sequence(sequence)
+
+    async def aload_sequence(self) -> str:
+        """
+        Return the protein sequence from async code, loading it if needed.
+
+        Returns:
+            The protein sequence
+        """
+        pending: str | None = self.__dict__.get("_pending_sequence")
+        if pending is not None:
+            return pending
+        protein_sequence: ProteinSequence = await self.awaitable_attrs.protein_sequence
+        return protein_sequence.sequence
+
     @classmethod
     def create(
         cls,
@@ -56,16 +132,37 @@ class Digest(BaseModel):
         criteria_ids: list[str] | None = None,
         **kwargs,
     ) -> Self:
+        """
+        Create a digest together with its digest_criteria links.
+
+        The id is generated client-side and the criteria links are attached
+        through the relationship, so the digest and all of its links are written
+        by a single flush (one INSERT plus one batched INSERT).
+
+        Args:
+            session: Database session to use for the operation
+            flush: If True, flush to DB before commit.
+            refresh: If True, refresh the instance from DB after commit.
+            commit: If True, commit the transaction.
+            criteria_ids: Criteria IDs for this digest (empty means all criteria).
+            **kwargs: Digest field values.
+
+        Returns:
+            The created Digest instance
+        """
         criteria_ids = criteria_ids or []
+        kwargs.setdefault("id", str(uuid4()))
 
         instance = super().create(
             session,
-            flush=True,
+            flush=False,
             commit=False,
             refresh=False,
             **kwargs,
         )
-        instance.add_criteria_from_ids(session, criteria_ids)
+        instance.add_criteria_from_ids(criteria_ids)
+        if flush:
+            session.flush()
         if commit:
             try:
                 session.commit()
@@ -76,6 +173,167 @@ class Digest(BaseModel):
             session.refresh(instance)
         return instance
 
+    @classmethod
+    async def afind_page_by_user_id(
+        cls,
+        session: AsyncSession,
+        user_id: str,
+        *,
+        include_sequence: bool = False,
+        limit: int | None = None,
+        before: tuple[datetime, str] | None = None,
+        fields: Collection[DigestFieldEnum] | None = None,
+    ) -> list[Row]:
+        """
+        Return a page of a user's digests as column rows, newest first.
+
+        Only the listed columns are selected, so the protein sequence is not read
+        unless requested. Pages are keyed on (created_at, id), which is served by
+        the (user_id, created_at) index.
+
+        Args:
+            session: Async database session
+            user_id: Owner of the digests
+            include_sequence: If True, also select the protein sequence
+            limit: Maximum number of rows to return (None for all)
+            before: (created_at, id) of the last row of the previous page
+            fields: If given, select only these columns (plus id and created_at,
+                which key the page); include_sequence is then ignored
+
+        Returns:
+            List of rows with the digest columns as attributes
+        """
+        if fields:
+            include_sequence = DigestFieldEnum.SEQUENCE in fields
+            columns = [cls.id, cls.created_at] + [
+                getattr(cls, field.value)
+                for field in fields
+                if field
+                not in (
+                    DigestFieldEnum.ID,
+                    DigestFieldEnum.CREATED_AT,
+                    DigestFieldEnum.SEQUENCE,
+                )
+            ]
+        else:
+            columns = [
+                cls.id,
+                cls.status,
+                cls.user_id,
+                cls.protease,
+                cls.protein_name,
+                cls.created_at,
+                cls.updated_at,
+            ]
+        if include_sequence:
+            columns.append(ProteinSequence.sequence)
+
+        query = select(*columns)
+        if include_sequence:
+            query = query.join(
+                ProteinSequence, ProteinSequence.hash == cls.sequence_hash
+            )
+        query = query.where(cls.user_id == user_id).order_by(
+            cls.created_at.desc(), cls.id.desc()
+        )
+        if before is not None:
+            created_at, digest_id = before
+            query = query.where(
+                or_(
+                    cls.created_at < created_at,
+                    and_(cls.created_at == created_at, cls.id < digest_id),
+                )
+            )
+        if limit is not None:
+            query = query.limit(limit)
+
+        return list((await session.execute(query)).all())
+
+    @classmethod
+    async def afind_one_by_user_id_and_id(
+        cls,
+        session: AsyncSession,
+        user_id: str,
+        digest_id: str,
+        *,
+        fields: Collection[DigestFieldEnum],
+    ) -> Self | None:
+        """
+        Find a user's digest, reading only the columns for the given response
+        fields.
+
+        The id, user_id, status and updated_at are always read, since the ETag
+        and replica checks need them. The protein sequence is only joined if it
+        is one of the fields.
+
+        Args:
+            session: Async database session
+            user_id: Owner of the digest
+            digest_id: Digest ID
+            fields: Response fields to read
+
+        Returns:
+            The digest, or None if the user has no digest with this id
+        """
+        columns: list[InstrumentedAttribute] = [
+            cls.user_id,
+            cls.status,
+            cls.updated_at,
+        ]
+        columns.extend(
+            getattr(cls, field.value)
+            for field in fields
+            if field not in (DigestFieldEnum.ID, DigestFieldEnum.SEQUENCE)
+        )
+        query = (
+            select(cls)
+            .where(cls.user_id == user_id, cls.id == digest_id)
+            .options(load_only(*columns))
+        )
+        if DigestFieldEnum.SEQUENCE in fields:
+            query = query.options(joinedload(cls.protein_sequence, innerjoin=True))
+        else:
+            query = query.options(raiseload(cls.protein_sequence))
+
+        digest: Self | None = (await session.scalars(query)).first()
+        return digest
+
+    @classmethod
+    async def afind_by_user_id_and_ids(
+        cls,
+        session: AsyncSession,
+        user_id: str,
+        digest_ids: list[str],
+        *,
+        include_sequence: bool = False,
+    ) -> list[Self]:
+        """
+        Return those of the given digests that belong to a user, with their
+        criteria links loaded.
+
+        Ownership of every digest is checked by a single query; the criteria
+        links are loaded by one more IN query for all digests.
+
+        Args:
+            session: Async database session
+            user_id: Owner of the digests
+            digest_ids: Digest IDs to look up
+            include_sequence: If True, join the protein sequences into the
+                ownership query
+
+        Returns:
+            The user's digests among digest_ids, in the order given
+        """
+        query = (
+            select(cls)
+            .where(cls.user_id == user_id, cls.id.in_(digest_ids))
+            .options(selectinload(cls.digest_criteria))
+        )
+        if include_sequence:
+            query = query.options(joinedload(cls.protein_sequence, innerjoin=True))
+        by_id = {digest.id: digest for digest in (await session.scalars(query)).all()}
+        return [by_id[digest_id] for digest_id in digest_ids if digest_id in by_id]
+
     def sort_peptides(self) -> list["Peptide"]:
         """
         Sort peptides by rank (ascending).
@@ -85,46 +343,53 @@ class Digest(BaseModel):
         """
         return sorted(self.peptides, key=lambda x: x.rank)
 
-    def add_criteria_from_ids(self, session: Session, criteria_ids: list[str]) -> None:
+    def add_criteria_from_ids(self, criteria_ids: list[str]) -> None:
         """
         Populate digest_criteria for this digest from the given criteria IDs.
-        Resolves IDs to criteria codes and inserts rows.
+        Resolves IDs to criteria codes from the criteria registry and attaches
+        the rows to the relationship; they are inserted on the next flush.
         If criteria_ids is empty, adds all criteria (digest uses full set).
         """
-        criteria_list = Criteria.get_all_ordered_by_rank(session)
+        criteria_list = list(get_criteria_registry(object_session(self)).records)
         if criteria_ids:
             criteria_ids_set = set(criteria_ids)
             criteria_list = [c for c in criteria_list if c.id in criteria_ids_set]
-        for c in criteria_list:
-            session.add(DigestCriteria(digest_id=self.id, criteria_code=c.code.value))
-        session.flush()
+        self.digest_criteria.extend(
+            DigestCriteria(criteria_code=c.code.value) for c in criteria_list
+        )
 
     def retrieve_criteria_enums(self) -> list[CriteriaEnum]:
         """Return criteria enums for this digest, ordered by criteria rank."""
-        return [
-            dc.criteria.code
-            for dc in sorted(
-                self.digest_criteria,
-                key=lambda dc: dc.criteria.rank,
-            )
-        ]
+        return [c.code for c in self._criteria_records()]
 
-    def get_criteria_ordered_by_rank(self) -> list[Criteria]:
+    def get_criteria_ordered_by_rank(self) -> list["CriteriaRecord"]:
         """
-        Return the Criteria records used for this digest, in rank order.
+        Return the criteria used for this digest, in rank order.
 
         Returns:
-            List of Criteria for this digest (from digest_criteria), sorted by rank.
+            List of criteria records for this digest (from digest_criteria),
+            sorted by rank.
         """
-        criteria_for_digest = [
-            dc.criteria
-            for dc in sorted(
-                self.digest_criteria,
-                key=lambda dc: dc.criteria.rank,
-            )
-        ]
+        criteria_for_digest = self._criteria_records()
         if not criteria_for_digest:
             raise ValueError(
                 f"Digest {self.id} has no criteria; cannot determine criteria for this analysis."
             )
         return criteria_for_digest
+
+    def _criteria_records(self) -> list["CriteriaRecord"]:
+        """Resolve this digest's criteria codes through the criteria registry."""
+        return get_criteria_registry(object_session(self)).for_codes(
+            [dc.criteria_code for dc in self.digest_criteria]
+        )
+
+
+@event.listens_for(Digest, "before_insert")
+@event.listens_for(Digest, "before_update")
+def _store_protein_sequence(
+    mapper: Mapper[Digest], connection: Connection, target: Digest
+) -> None:
+    """Store a newly assigned sequence before the digest row that references it."""
+    pending = target.__dict__.pop("_pending_sequence", None)
+    if pending is not None:
+        ProteinSequence.insert_if_missing(connection, target.sequence_hash, pending)
@@ -0,0 +1,44 @@
+# app/models/digest_payload.py
+from sqlalchemy import ForeignKey, LargeBinary, String, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class DigestPayload(Base):
+    """
+    Pre-rendered, gzip-compressed peptides response of a completed digest.
+
+    Written once when the digest job completes; removed with its digest by
+    ON DELETE CASCADE.
+    """
+
+    __tablename__ = "digest_payloads"
+
+    digest_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("digests.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # MEDIUMBLOB on MySQL (up to 16 MiB compressed)
+    content: Mapped[bytes] = mapped_column(
+        LargeBinary(length=2**24 - 1), nullable=False
+    )
+
+    @classmethod
+    async def afind_content(cls, session: AsyncSession, digest_id: str) -> bytes | None:
+        """
+        Fetch the compressed payload of a digest.
+
+        Args:
+            session: Async database session
+            digest_id: Digest ID
+
+        Returns:
+            The gzip-compressed payload, or None if the digest has none
+        """
+        content: bytes | None = await session.scalar(
+            select(cls.content).where(cls.digest_id == digest_id)
+        )
+        return content
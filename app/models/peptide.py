@@ -1,16 +1,46 @@
+from collections.abc import AsyncIterator, Collection
 from typing import TYPE_CHECKING
 
 from fastapi import HTTPException, status
-from sqlalchemy import Float, ForeignKey, Integer, String, UniqueConstraint, asc, select
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy import (
+    Float,
+    ForeignKey,
+    Integer,
+    Select,
+    String,
+    UniqueConstraint,
+    asc,
+    select,
+)
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    Mapped,
+    load_only,
+    mapped_column,
+    relationship,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.base import BaseModelNoTimestamps
+from app.enums import PeptideFieldEnum
+from app.models.base import BaseModelBinaryKey
+from app.models.criteria import Criteria
+from app.models.criteria_registry import get_criteria_registry
+from app.models.peptide_criteria import PeptideCriteria
 
 if TYPE_CHECKING:
-    from app.models import Digest, PeptideCriteria
+    from app.enums import CriteriaEnum
+    from app.models import Digest
+    from app.schemas.digest import PeptideFilterParams
 
 
-class Peptide(BaseModelNoTimestamps):
+def _sequence_length(context: DefaultExecutionContext) -> int:
+    """Default peptides.length to the length of the inserted sequence."""
+    return len(context.get_current_parameters().get("sequence") or "")
+
+
+class Peptide(BaseModelBinaryKey):
     __tablename__ = "peptides"
     __table_args__ = (
         UniqueConstraint("digest_id", "rank", name="uq_peptide_digest_rank"),
@@ -22,48 +52,267 @@ class Peptide(BaseModelNoTimestamps):
         nullable=False,
         index=True,
     )
-    sequence: Mapped[str] = mapped_column(String(500), nullable=False)
+    # NULL in compact storage, where it is sliced from the digest sequence on read
+    sequence: Mapped[str] = mapped_column(String(500), nullable=True)
     position: Mapped[int] = mapped_column(Integer, nullable=False)
+    length: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=_sequence_length
+    )
 
     pi: Mapped[float | None] = mapped_column(Float, nullable=True)
     charge_state: Mapped[int | None] = mapped_column(Integer, nullable=True)
     max_kd_score: Mapped[float | None] = mapped_column(Float, nullable=True)
     rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    # bit (rank - 1) is set for each matched criteria rank, see Criteria.ranks_to_mask
+    criteria_mask: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     digest: Mapped["Digest"] = relationship(back_populates="peptides")
 
-    criteria: Mapped[list["PeptideCriteria"]] = relationship(
+    criteria: Mapped[list[PeptideCriteria]] = relationship(
         back_populates="peptide",
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
 
+    def restore_sequence(self, digest_sequence: str) -> str:
+        """
+        Slice a compactly stored peptide's sequence out of its digest's sequence.
+
+        The sequence is set as its loaded value, so the peptide is not marked
+        dirty. Peptides that store their own sequence are left unchanged.
+
+        Args:
+            digest_sequence: Full protein sequence of the peptide's digest
+
+        Returns:
+            The peptide sequence
+        """
+        if self.sequence is None:
+            start = self.position - 1
+            set_committed_value(
+                self, "sequence", digest_sequence[start : start + self.length]
+            )
+        return self.sequence
+
+    @staticmethod
+    def _criteria_bits(codes: "list[CriteriaEnum]") -> int:
+        """Combine the criteria_mask bits of the given criteria codes."""
+        registry = get_criteria_registry()
+        return Criteria.ranks_to_mask(registry.by_code[code].rank for code in codes)
+
     @classmethod
-    def find_by_digest_id_ordered_by_rank_or_raise(
+    def _load_only_fields(
+        cls, fields: Collection[PeptideFieldEnum]
+    ) -> list[InstrumentedAttribute]:
+        """
+        Columns to read for the given response fields.
+
+        The id and rank are always read; a sequence also needs the position and
+        length it is sliced with in compact storage.
+        """
+        columns: list[InstrumentedAttribute] = [cls.rank]
+        for field in fields:
+            match field:
+                case PeptideFieldEnum.ID | PeptideFieldEnum.RANK:
+                    continue
+                case PeptideFieldEnum.SEQUENCE:
+                    columns.extend([cls.sequence, cls.position, cls.length])
+                case PeptideFieldEnum.CRITERIA_RANKS:
+                    columns.append(cls.criteria_mask)
+                case _:
+                    columns.append(getattr(cls, field.value))
+        return columns
+
+    @classmethod
+    def _select_by_digest_id_ordered_by_rank(
         cls,
-        session: Session,
         digest_id: str,
+        filters: "PeptideFilterParams | None" = None,
+        fields: Collection[PeptideFieldEnum] | None = None,
+    ) -> Select:
+        """
+        Build the rank-ordered select for the peptides of a digest.
+
+        Rank bounds and the keyset cursor are applied to ``rank`` so the
+        (digest_id, rank) unique index serves both the range and the ordering.
+        With ``fields``, only the columns those fields need are read.
+        """
+        query = select(cls).where(cls.digest_id == digest_id).order_by(asc(cls.rank))
+        if fields:
+            query = query.options(load_only(*cls._load_only_fields(fields)))
+        if filters is None:
+            return query
+
+        if filters.min_rank is not None:
+            query = query.where(cls.rank >= filters.min_rank)
+        if filters.max_rank is not None:
+            query = query.where(cls.rank <= filters.max_rank)
+        if filters.after_rank is not None:
+            query = query.where(cls.rank > filters.after_rank)
+        if filters.min_length is not None:
+            query = query.where(cls.length >= filters.min_length)
+        if filters.max_length is not None:
+            query = query.where(cls.length <= filters.max_length)
+        if filters.min_pi is not None:
+            query = query.where(cls.pi >= filters.min_pi)
+        if filters.max_pi is not None:
+            query = query.where(cls.pi <= filters.max_pi)
+        if filters.require_criteria:
+            required = cls._criteria_bits(filters.require_criteria)
+            query = query.where(cls.criteria_mask.bitwise_and(required) == required)
+        if filters.exclude_criteria:
+            excluded = cls._criteria_bits(filters.exclude_criteria)
+            query = query.where(cls.criteria_mask.bitwise_and(excluded) == 0)
+        if filters.passes_all_criteria:
+            query = query.where(cls.criteria_mask == 0)
+        if filters.limit is not None:
+            query = query.limit(filters.limit)
+
+        return query
+
+    @classmethod
+    async def afind_by_digest_id_ordered_by_rank_or_raise(
+        cls,
+        session: AsyncSession,
+        digest_id: str,
+        filters: "PeptideFilterParams | None" = None,
+        *,
+        digest_sequence: str,
+        fields: Collection[PeptideFieldEnum] | None = None,
     ) -> list["Peptide"]:
         """
-        Find all peptides for a digest, ordered by rank (ascending), or raise exception if none found.
+        Find the peptides for a digest, ordered by rank (ascending), or raise exception if none found.
+
+        Matched criteria are read from criteria_mask, so no join rows are loaded.
+        Compactly stored sequences are sliced from ``digest_sequence``.
 
         Args:
-            session: Database session
+            session: Async database session
             digest_id: Digest ID to filter by
+            filters: Optional pagination and filter parameters pushed into the query
+            digest_sequence: Protein sequence of the digest
+            fields: Optional response fields; other columns are left unloaded
 
         Returns:
-            List of peptides ordered by rank (guaranteed to be non-empty)
+            List of peptides ordered by rank (non-empty unless filters are active)
 
         Raises:
-            HTTPException: 404 if no peptides found
+            HTTPException: 404 if the digest has no peptides
         """
-        query = select(cls).where(cls.digest_id == digest_id).order_by(asc(cls.rank))
-        peptides = list(session.scalars(query).all())
+        query = cls._select_by_digest_id_ordered_by_rank(digest_id, filters, fields)
+        peptides = list((await session.scalars(query)).all())
+        if not fields or PeptideFieldEnum.SEQUENCE in fields:
+            for peptide in peptides:
+                peptide.restore_sequence(digest_sequence)
 
-        if not peptides:
+        if not peptides and not (filters and filters.is_active):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No Peptide records found with digest_id={digest_id!r}.",
             )
 
         return peptides
+
+    @classmethod
+    async def afind_by_digest_ids_ordered_by_rank(
+        cls,
+        session: AsyncSession,
+        digest_sequences: dict[str, str],
+    ) -> dict[str, list["Peptide"]]:
+        """
+        Find the peptides of several digests with one query, grouped by digest.
+
+        Args:
+            session: Async database session
+            digest_sequences: Protein sequence of each digest, keyed by digest ID;
+                used to slice compactly stored sequences
+
+        Returns:
+            Peptides ordered by rank (ascending), keyed by digest ID; digests
+            without peptides map to an empty list
+        """
+        query = (
+            select(cls)
+            .where(cls.digest_id.in_(list(digest_sequences)))
+            .order_by(asc(cls.digest_id), asc(cls.rank))
+        )
+        peptides: dict[str, list[Peptide]] = {
+            digest_id: [] for digest_id in digest_sequences
+        }
+        for peptide in (await session.scalars(query)).all():
+            peptide.restore_sequence(digest_sequences[peptide.digest_id])
+            peptides[peptide.digest_id].append(peptide)
+
+        return peptides
+
+    @classmethod
+    async def astream_by_digest_id_ordered_by_rank_or_raise(
+        cls,
+        session: AsyncSession,
+        digest_id: str,
+        filters: "PeptideFilterParams | None" = None,
+        *,
+        digest_sequence: str,
+        batch_size: int,
+        fields: Collection[PeptideFieldEnum] | None = None,
+    ) -> AsyncIterator["Peptide"]:
+        """
+        Iterate over the peptides of a digest in rank order using a server-side cursor.
+
+        Rows are fetched ``batch_size`` at a time, so memory use does not grow with
+        the number of peptides.
+
+        Args:
+            session: Async database session (must stay open while the iterator is
+                consumed)
+            digest_id: Digest ID to filter by
+            filters: Optional pagination and filter parameters pushed into the query
+            digest_sequence: Protein sequence of the digest, used to slice
+                compactly stored sequences
+            batch_size: Number of rows fetched from the cursor per round trip
+            fields: Optional response fields; other columns are left unloaded
+
+        Returns:
+            Async iterator of peptides ordered by rank (yields at least one unless
+            filters are active)
+
+        Raises:
+            HTTPException: 404 if no peptides found
+        """
+        query = cls._select_by_digest_id_ordered_by_rank(
+            digest_id, filters, fields
+        ).execution_options(yield_per=batch_size)
+        peptides = await session.stream_scalars(query)
+
+        first = await anext(peptides, None)
+        if first is None:
+            await peptides.close()
+            if not (filters and filters.is_active):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No Peptide records found with digest_id={digest_id!r}.",
+                )
+
+        if fields and PeptideFieldEnum.SEQUENCE not in fields:
+            return _prepend(first, peptides, None)
+        return _prepend(first, peptides, digest_sequence)
+
+
+async def _prepend(
+    first: Peptide | None, rest: AsyncIterator[Peptide], digest_sequence: str | None
+) -> AsyncIterator[Peptide]:
+    """
+    Yield ``first`` (unless None) and then the remaining items of ``rest``, with
+    their sequences restored from ``digest_sequence`` (unless None).
+    """
+    if first is None:
+        return
+    if digest_sequence is not None:
+        first.restore_sequence(digest_sequence)
+    yield first
+    async for item in rest:
+        if digest_sequence is not None:
+            item.restore_sequence(digest_sequence)
+        yield item
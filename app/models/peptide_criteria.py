@@ -4,19 +4,19 @@ from typing import TYPE_CHECKING
 from sqlalchemy import ForeignKey, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import BaseModelNoTimestamps
+from app.models.base import BaseModelBinaryKey, BinaryUUID
 
 if TYPE_CHECKING:
     from app.models import Criteria, Peptide
 
 
-class PeptideCriteria(BaseModelNoTimestamps):
+class PeptideCriteria(BaseModelBinaryKey):
     """Join table linking peptides to criteria. Read-only."""
 
     __tablename__ = "peptide_criteria"
 
     peptide_id: Mapped[str] = mapped_column(
-        String(36),
+        BinaryUUID(),
         ForeignKey("peptides.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
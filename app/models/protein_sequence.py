@@ -0,0 +1,79 @@
+# app/models/protein_sequence.py
+import hashlib
+
+from sqlalchemy import Connection, String, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProteinSequence(Base):
+    """
+    Content-addressed protein sequences, shared by every digest of the same
+    sequence. Rows are keyed by the SHA-256 of the sequence and never updated.
+    """
+
+    __tablename__ = "protein_sequences"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    sequence: Mapped[str] = mapped_column(String(3000), nullable=False)
+
+    @staticmethod
+    def hash_sequence(sequence: str) -> str:
+        """
+        Compute the content address of a protein sequence.
+
+        Args:
+            sequence: Protein sequence
+
+        Returns:
+            Hex SHA-256 digest of the sequence (matches MySQL SHA2(sequence, 256))
+        """
+        return hashlib.sha256(sequence.encode()).hexdigest()
+
+    @classmethod
+    def insert_if_missing(
+        cls, connection: Connection, sequence_hash: str, sequence: str
+    ) -> None:
+        """
+        Store a sequence under its hash unless it is already stored.
+
+        On MySQL and SQLite this is a single INSERT that ignores the primary-key
+        conflict, so concurrent digests of the same sequence do not race. Other
+        databases look the hash up first and insert under a savepoint, ignoring
+        the conflict if a concurrent digest stored the sequence in between.
+
+        Args:
+            connection: Connection of the current transaction
+            sequence_hash: Hash of the sequence (see hash_sequence)
+            sequence: Protein sequence
+        """
+        values = {"hash": sequence_hash, "sequence": sequence}
+        dialect = connection.dialect.name
+
+        if dialect == "mysql":
+            mysql_statement = mysql_insert(cls).values(**values)
+            connection.execute(
+                mysql_statement.on_duplicate_key_update(
+                    hash=mysql_statement.inserted.hash
+                )
+            )
+        elif dialect == "sqlite":
+            connection.execute(
+                sqlite_insert(cls)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=[cls.hash])
+            )
+        else:
+            stored = connection.scalar(
+                select(cls.hash).where(cls.hash == sequence_hash)
+            )
+            if stored is None:
+                try:
+                    with connection.begin_nested():
+                        connection.execute(insert(cls).values(**values))
+                except IntegrityError:
+                    pass
@@ -1,7 +1,11 @@
-from typing import TYPE_CHECKING
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Self
+from uuid import uuid4
 
-from sqlalchemy import String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from app.models.base import BaseModel
 
@@ -15,8 +19,96 @@ class User(BaseModel):
     username: Mapped[str] = mapped_column(
         String(50), unique=False, index=True, nullable=False
     )
-    email: Mapped[str] = mapped_column(String(255), nullable=False)
+    email: Mapped[str] = mapped_column(
+        String(255), unique=True, index=True, nullable=False
+    )
 
     digests: Mapped[list["Digest"]] = relationship(
         back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
+
+    @classmethod
+    def upsert_by_email(
+        cls,
+        session: Session,
+        *,
+        username: str,
+        email: str,
+        commit: bool = True,
+    ) -> Self:
+        """
+        Create the user with this email, or update the existing user's username.
+
+        Relies on the unique index on users.email. SQLite runs a single
+        INSERT ... ON CONFLICT DO UPDATE ... RETURNING. MySQL takes two round
+        trips: it cannot return rows from an upsert, and LAST_INSERT_ID() only
+        carries integer keys, not the UUID id, so INSERT ... ON DUPLICATE KEY
+        UPDATE is followed by an indexed lookup by email in the same transaction.
+        Other databases look the user up by email and then insert or update it.
+
+        Args:
+            session: Database session
+            username: Username to store
+            email: Email address identifying the user
+            commit: If True, commit the transaction.
+
+        Returns:
+            The created or updated user
+
+        Raises:
+            IntegrityError: If a database constraint violation occurs, e.g. a
+                concurrent insert of the same email on a database without upsert
+        """
+        now = datetime.now(UTC)
+        values = {
+            "id": str(uuid4()),
+            "username": username,
+            "email": email,
+            "created_at": now,
+            "updated_at": now,
+        }
+        dialect = session.get_bind().dialect.name
+
+        try:
+            if dialect == "mysql":
+                mysql_statement = mysql_insert(cls).values(**values)
+                session.execute(
+                    mysql_statement.on_duplicate_key_update(
+                        username=mysql_statement.inserted.username,
+                        updated_at=mysql_statement.inserted.updated_at,
+                    )
+                )
+                user = session.scalars(
+                    select(cls).where(cls.email == email),
+                    execution_options={"populate_existing": True},
+                ).one()
+            elif dialect == "sqlite":
+                sqlite_statement = sqlite_insert(cls).values(**values)
+                user = session.scalars(
+                    sqlite_statement.on_conflict_do_update(
+                        index_elements=[cls.email],
+                        set_={
+                            "username": sqlite_statement.excluded.username,
+                            "updated_at": sqlite_statement.excluded.updated_at,
+                        },
+                    ).returning(cls),
+                    execution_options={"populate_existing": True},
+                ).one()
+            else:
+                existing = cls.find_one_by(session, email=email)
+                if existing is None:
+                    user = cls(**values)
+                    session.add(user)
+                else:
+                    user = existing
+                    user.username = username
+                    user.updated_at = now
+                session.flush()
+
+            if commit:
+                session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return user
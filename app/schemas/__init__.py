@@ -1,7 +1,9 @@
 from app.schemas.digest import (
     DigestJobRequest,
+    DigestListQueryParams,
     DigestListRequest,
     DigestListResponse,
+    DigestPeptidesColumnarResponse,
     DigestPeptidesResponse,
 )
 from app.schemas.user import UserCreate, UserResponse
@@ -10,7 +12,9 @@ __all__ = [
     "UserCreate",
     "UserResponse",
     "DigestJobRequest",
+    "DigestListQueryParams",
     "DigestListRequest",
     "DigestListResponse",
     "DigestPeptidesResponse",
+    "DigestPeptidesColumnarResponse",
 ]
@@ -1,9 +1,44 @@
+import base64
+import binascii
+from collections.abc import Collection
 from datetime import datetime
-
-from pydantic import BaseModel, ConfigDict, Field, field_validator
-
-from app.enums import AminoAcidEnum, ProteaseEnum
-from app.models import Criteria, Peptide
+from typing import Any, Self
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from app.enums import (
+    AminoAcidEnum,
+    CriteriaEnum,
+    DigestFieldEnum,
+    PeptideExportFormatEnum,
+    PeptideFieldEnum,
+    PeptideResponseFormatEnum,
+    ProteaseEnum,
+)
+from app.models import Criteria, Digest, Peptide
+from app.models.criteria_registry import CriteriaRecord
+
+# Digest list page size when no limit is given, and the largest allowed
+DIGEST_LIST_DEFAULT_LIMIT = 20
+DIGEST_LIST_MAX_LIMIT = 100
+
+
+def _split_fieldset(v: Any) -> Any:
+    """
+    Accept a sparse fieldset as repeated and/or comma-separated values.
+
+    fields=sequence,rank and fields=sequence&fields=rank are equivalent.
+    """
+    if isinstance(v, str):
+        v = [v]
+    if isinstance(v, list):
+        return [
+            part.strip()
+            for item in v
+            for part in (item.split(",") if isinstance(item, str) else [item])
+            if not isinstance(part, str) or part.strip()
+        ]
+    return v
 
 
 class DigestJobRequest(BaseModel):
@@ -80,17 +115,123 @@ class DigestResponse(BaseModel):
     user_id: str = Field(..., description="User ID")
     protease: str = Field(..., description="Protease used")
     protein_name: str | None = Field(None, description="Protein name")
-    sequence: str = Field(..., description="Protein sequence")
+    sequence: str | None = Field(
+        None, description="Protein sequence (omitted from list pages unless requested)"
+    )
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_fields(
+        cls, digest: Any, fields: Collection[DigestFieldEnum] | None
+    ) -> "DigestResponse":
+        """
+        Create a DigestResponse holding only the requested fields.
+
+        Args:
+            digest: Digest model instance or column row
+            fields: Fields to include (all if None or empty)
+
+        Returns:
+            DigestResponse instance; serialize with exclude_unset when fields
+            were given
+        """
+        if not fields:
+            return cls.model_validate(digest)
+        return cls.model_construct(
+            **{field.value: getattr(digest, field.value) for field in fields}
+        )
+
+
+class DigestQueryParams(BaseModel):
+    """Query parameters for the fields of a single digest response."""
+
+    fields: list[DigestFieldEnum] = Field(
+        default_factory=list,
+        description="Only return these fields (comma-separated or repeated)",
+    )
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, v: Any) -> Any:
+        """Accept comma-separated as well as repeated fields values."""
+        return _split_fieldset(v)
+
+
+class DigestListQueryParams(BaseModel):
+    """Query parameters for the projection and keyset pagination of a digest list."""
+
+    include_sequence: bool = Field(
+        False, description="Include the full protein sequence of each digest"
+    )
+    limit: int = Field(
+        DIGEST_LIST_DEFAULT_LIMIT,
+        ge=1,
+        le=DIGEST_LIST_MAX_LIMIT,
+        description="Maximum number of digests to return (page size)",
+    )
+    cursor: str | None = Field(
+        None, description="Opaque cursor from next_cursor of the previous page"
+    )
+    fields: list[DigestFieldEnum] = Field(
+        default_factory=list,
+        description=(
+            "Only return these fields (comma-separated or repeated); "
+            "overrides include_sequence"
+        ),
+    )
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, v: Any) -> Any:
+        """Accept comma-separated as well as repeated fields values."""
+        return _split_fieldset(v)
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, v: str | None) -> str | None:
+        """Reject cursors that were not produced by encode_cursor."""
+        if v is not None:
+            cls.decode_cursor(v)
+        return v
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, digest_id: str) -> str:
+        """Encode the (created_at, id) key of the last digest on a page."""
+        raw = f"{created_at.isoformat()}|{digest_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, str]:
+        """
+        Decode a cursor into the (created_at, id) key it was built from.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            created_at, digest_id = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            )
+            return datetime.fromisoformat(created_at), digest_id
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError("Invalid cursor.") from e
+
+    @property
+    def before(self) -> tuple[datetime, str] | None:
+        """Keyset position decoded from the cursor, if any."""
+        return self.decode_cursor(self.cursor) if self.cursor else None
+
 
 class DigestListResponse(BaseModel):
     """Schema for list of digests response."""
 
     digests: list[DigestResponse] = Field(..., description="List of digests")
+    next_cursor: str | None = Field(
+        None, description="Cursor for the next page, or null on the last page"
+    )
 
 
 class CriteriaResponse(BaseModel):
@@ -109,6 +250,88 @@ class CriteriaResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PeptideFilterParams(BaseModel):
+    """Query parameters for the pagination and filtering of digest peptides."""
+
+    min_rank: int | None = Field(None, ge=1, description="Lowest rank to return")
+    max_rank: int | None = Field(None, ge=1, description="Highest rank to return")
+    after_rank: int | None = Field(
+        None,
+        ge=0,
+        description="Keyset cursor: only return peptides ranked after this rank",
+    )
+    limit: int | None = Field(
+        None, ge=1, le=1000, description="Maximum number of peptides to return"
+    )
+    require_criteria: list[CriteriaEnum] = Field(
+        default_factory=list,
+        description="Only return peptides that match every listed criteria",
+    )
+    exclude_criteria: list[CriteriaEnum] = Field(
+        default_factory=list,
+        description="Only return peptides that match none of the listed criteria",
+    )
+    passes_all_criteria: bool = Field(
+        False,
+        description="Only return peptides that match none of the digest's criteria",
+    )
+    min_length: int | None = Field(None, ge=1, description="Minimum peptide length")
+    max_length: int | None = Field(None, ge=1, description="Maximum peptide length")
+    min_pi: float | None = Field(None, description="Minimum isoelectric point")
+    max_pi: float | None = Field(None, description="Maximum isoelectric point")
+
+    @model_validator(mode="after")
+    def validate_ranges(self) -> Self:
+        """Reject ranges whose lower bound is above their upper bound."""
+        for low, high in (
+            ("min_rank", "max_rank"),
+            ("min_length", "max_length"),
+            ("min_pi", "max_pi"),
+        ):
+            low_value, high_value = getattr(self, low), getattr(self, high)
+            if (
+                low_value is not None
+                and high_value is not None
+                and low_value > high_value
+            ):
+                raise ValueError(f"{low} must not be greater than {high}.")
+        return self
+
+    @property
+    def is_active(self) -> bool:
+        """True if any pagination or filter parameter was given."""
+        return bool(
+            self.model_dump(exclude_defaults=True, exclude={"format", "fields"})
+        )
+
+
+class PeptideQueryParams(PeptideFilterParams):
+    """Query parameters for the layout, fields, pagination and filtering of digest peptides."""
+
+    format: PeptideResponseFormatEnum = Field(
+        PeptideResponseFormatEnum.ROWS,
+        description="Response layout: one object per peptide or parallel arrays",
+    )
+    fields: list[PeptideFieldEnum] = Field(
+        default_factory=list,
+        description="Only return these peptide fields (comma-separated or repeated)",
+    )
+
+    @field_validator("fields", mode="before")
+    @classmethod
+    def split_fields(cls, v: Any) -> Any:
+        """Accept comma-separated as well as repeated fields values."""
+        return _split_fieldset(v)
+
+
+class PeptideExportQueryParams(PeptideFilterParams):
+    """Query parameters for the file format, pagination and filtering of a peptide export."""
+
+    format: PeptideExportFormatEnum = Field(
+        PeptideExportFormatEnum.CSV, description="Export file format"
+    )
+
+
 class PeptideResponse(BaseModel):
     """Schema for peptide response with criteria codes."""
 
@@ -125,6 +348,114 @@ class PeptideResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_peptide(
+        cls,
+        peptide: "Peptide",  # type: ignore
+        fields: Collection[PeptideFieldEnum] | None = None,
+    ) -> "PeptideResponse":
+        """
+        Create a PeptideResponse from a peptide record.
+
+        Args:
+            peptide: Peptide model instance
+            fields: If given, only these fields are read and set
+
+        Returns:
+            PeptideResponse instance; serialize with exclude_unset when fields
+            were given
+        """
+        if fields:
+            values: dict[str, Any] = {
+                field.value: (
+                    Criteria.mask_to_ranks(peptide.criteria_mask)
+                    if field == PeptideFieldEnum.CRITERIA_RANKS
+                    else getattr(peptide, field.value)
+                )
+                for field in fields
+            }
+            return cls.model_construct(set(values), **values)
+        return cls(
+            id=peptide.id,
+            sequence=peptide.sequence,
+            position=peptide.position,
+            pi=peptide.pi,
+            charge_state=peptide.charge_state,
+            max_kd_score=peptide.max_kd_score,
+            rank=peptide.rank,
+            criteria_ranks=Criteria.mask_to_ranks(peptide.criteria_mask),
+        )
+
+
+# PeptideColumns array and Peptide attribute read for each peptide field
+PEPTIDE_COLUMN_NAMES = {
+    PeptideFieldEnum.ID: "ids",
+    PeptideFieldEnum.SEQUENCE: "sequences",
+    PeptideFieldEnum.POSITION: "positions",
+    PeptideFieldEnum.PI: "pi",
+    PeptideFieldEnum.CHARGE_STATE: "charge_state",
+    PeptideFieldEnum.MAX_KD_SCORE: "max_kd_score",
+    PeptideFieldEnum.RANK: "rank",
+    PeptideFieldEnum.CRITERIA_RANKS: "criteria_mask",
+}
+PEPTIDE_COLUMN_ATTRIBUTES = {PeptideFieldEnum.CRITERIA_RANKS: "criteria_mask"}
+
+
+class PeptideColumns(BaseModel):
+    """Schema for peptides as parallel arrays (one entry per peptide, in rank order)."""
+
+    ids: list[str] = Field(..., description="Peptide IDs")
+    sequences: list[str] = Field(..., description="Peptide sequences")
+    positions: list[int] = Field(..., description="Positions in the protein")
+    pi: list[float | None] = Field(..., description="Isoelectric points")
+    charge_state: list[int | None] = Field(..., description="Charge states")
+    max_kd_score: list[float | None] = Field(
+        ..., description="Max Kyte-Doolittle scores"
+    )
+    rank: list[int] = Field(..., description="Peptide ranks (lower is better)")
+    criteria_mask: list[int] = Field(
+        ...,
+        description="Bitmask of matched criteria; bit (rank - 1) is set for each criteria rank",
+    )
+
+    @classmethod
+    def from_peptides(
+        cls,
+        peptides: list[Peptide],
+        fields: Collection[PeptideFieldEnum] | None = None,
+    ) -> "PeptideColumns":
+        """
+        Create PeptideColumns from a list of peptide records.
+
+        Args:
+            peptides: Peptide model instances in rank order
+            fields: If given, only the arrays for these fields are set
+                (criteria_ranks selects criteria_mask)
+
+        Returns:
+            PeptideColumns instance; serialize with exclude_unset when fields
+            were given
+        """
+        columns: dict[str, Any] = {
+            PEPTIDE_COLUMN_NAMES[field]: [
+                getattr(p, PEPTIDE_COLUMN_ATTRIBUTES.get(field, field.value))
+                for p in peptides
+            ]
+            for field in (fields or PeptideFieldEnum)
+        }
+        if fields:
+            return cls.model_construct(set(columns), **columns)
+        return cls(**columns)
+
+
+class DigestPeptidesStreamHeader(BaseModel):
+    """Schema for the first line of a streamed (NDJSON) digest peptides response."""
+
+    digest_id: str = Field(..., description="Digest ID")
+    criteria: list[CriteriaResponse] = Field(
+        ..., description="List of all available criteria"
+    )
+
 
 class DigestPeptidesResponse(BaseModel):
     """Schema for digest peptides response."""
@@ -136,13 +467,20 @@ class DigestPeptidesResponse(BaseModel):
     criteria: list[CriteriaResponse] = Field(
         ..., description="List of all available criteria"
     )
+    next_after_rank: int | None = Field(
+        None,
+        description="Pass as after_rank to fetch the next page (null on the last page)",
+    )
 
     @classmethod
     def from_peptides(
         cls,
         digest_id: str,
         peptides: list["Peptide"],  # type: ignore
-        all_criteria: list["Criteria"],  # type: ignore
+        all_criteria: list["CriteriaRecord"],
+        *,
+        next_after_rank: int | None = None,
+        fields: Collection[PeptideFieldEnum] | None = None,
     ) -> "DigestPeptidesResponse":
         """
         Create a DigestPeptidesResponse from a list of peptide records.
@@ -150,31 +488,146 @@ class DigestPeptidesResponse(BaseModel):
         Args:
             digest_id: The digest ID
             peptides: List of Peptide model instances
-            all_criteria: List of all Criteria model instances
+            all_criteria: Criteria records used for the digest, in rank order
+            next_after_rank: Keyset cursor for the next page, if any
+            fields: If given, only these peptide fields are set
 
         Returns:
             DigestPeptidesResponse instance
         """
-        peptide_responses = []
-        for peptide in peptides:
-            criteria_ranks = [pc.criteria.rank for pc in peptide.criteria]
-            criteria_ranks.sort()
-
-            peptide_responses.append(
-                PeptideResponse(
-                    id=peptide.id,
-                    sequence=peptide.sequence,
-                    position=peptide.position,
-                    pi=peptide.pi,
-                    charge_state=peptide.charge_state,
-                    max_kd_score=peptide.max_kd_score,
-                    rank=peptide.rank,
-                    criteria_ranks=criteria_ranks,
-                )
-            )
+        return cls(
+            digest_id=digest_id,
+            peptides=[
+                PeptideResponse.from_peptide(peptide, fields) for peptide in peptides
+            ],
+            criteria=[CriteriaResponse.model_validate(c) for c in all_criteria],
+            next_after_rank=next_after_rank,
+        )
+
+
+class DigestPeptidesColumnarResponse(BaseModel):
+    """Schema for digest peptides response in columnar (struct-of-arrays) layout."""
+
+    digest_id: str = Field(..., description="Digest ID")
+    peptides: PeptideColumns = Field(
+        ..., description="Peptide properties as parallel arrays ordered by rank"
+    )
+    criteria: list[CriteriaResponse] = Field(
+        ..., description="List of all available criteria"
+    )
+    next_after_rank: int | None = Field(
+        None,
+        description="Pass as after_rank to fetch the next page (null on the last page)",
+    )
+
+    @classmethod
+    def from_peptides(
+        cls,
+        digest_id: str,
+        peptides: list["Peptide"],  # type: ignore
+        all_criteria: list["CriteriaRecord"],
+        *,
+        next_after_rank: int | None = None,
+        fields: Collection[PeptideFieldEnum] | None = None,
+    ) -> "DigestPeptidesColumnarResponse":
+        """
+        Create a DigestPeptidesColumnarResponse from a list of peptide records.
+
+        Args:
+            digest_id: The digest ID
+            peptides: List of Peptide model instances
+            all_criteria: Criteria records used for the digest, in rank order
+            next_after_rank: Keyset cursor for the next page, if any
+            fields: If given, only the arrays for these peptide fields are set
 
+        Returns:
+            DigestPeptidesColumnarResponse instance
+        """
         return cls(
             digest_id=digest_id,
-            peptides=peptide_responses,
+            peptides=PeptideColumns.from_peptides(peptides, fields),
             criteria=[CriteriaResponse.model_validate(c) for c in all_criteria],
+            next_after_rank=next_after_rank,
+        )
+
+
+class DigestBatchPeptidesQueryParams(BaseModel):
+    """Query parameters for fetching the peptides of several digests at once."""
+
+    digest_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="IDs of the digests to return peptides for",
+    )
+
+    @field_validator("digest_ids")
+    @classmethod
+    def validate_digest_ids(cls, v: list[str]) -> list[str]:
+        """Drop repeated digest IDs, keeping the first occurrence."""
+        return list(dict.fromkeys(v))
+
+
+class DigestPeptidesBatchItem(BaseModel):
+    """Schema for the peptides of one digest in a multi-digest response."""
+
+    digest_id: str = Field(..., description="Digest ID")
+    status: str = Field(..., description="Digest status")
+    criteria_ranks: list[int] = Field(
+        ..., description="Ranks of the criteria used for this digest"
+    )
+    peptides: list[PeptideResponse] = Field(
+        ..., description="List of peptides ordered by rank"
+    )
+
+
+class DigestPeptidesBatchResponse(BaseModel):
+    """Schema for the peptides of several digests, with one criteria table."""
+
+    digests: list[DigestPeptidesBatchItem] = Field(
+        ..., description="Peptides of each digest, in the order requested"
+    )
+    criteria: list[CriteriaResponse] = Field(
+        ..., description="Criteria used by any of the digests, in rank order"
+    )
+
+    @classmethod
+    def from_digests(
+        cls,
+        digests: list[Digest],
+        peptides: dict[str, list[Peptide]],
+    ) -> "DigestPeptidesBatchResponse":
+        """
+        Create a DigestPeptidesBatchResponse from digests and their peptides.
+
+        Args:
+            digests: Digest model instances with their criteria links loaded
+            peptides: Peptides of each digest in rank order, keyed by digest ID
+
+        Returns:
+            DigestPeptidesBatchResponse instance
+        """
+        criteria_by_digest = {
+            digest.id: digest.get_criteria_ordered_by_rank() for digest in digests
+        }
+        all_criteria = {
+            c.rank: c for criteria in criteria_by_digest.values() for c in criteria
+        }
+        return cls(
+            digests=[
+                DigestPeptidesBatchItem(
+                    digest_id=digest.id,
+                    status=digest.status,
+                    criteria_ranks=[c.rank for c in criteria_by_digest[digest.id]],
+                    peptides=[
+                        PeptideResponse.from_peptide(peptide)
+                        for peptide in peptides[digest.id]
+                    ],
+                )
+                for digest in digests
+            ],
+            criteria=[
+                CriteriaResponse.model_validate(all_criteria[rank])
+                for rank in sorted(all_criteria)
+            ],
         )
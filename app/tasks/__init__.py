@@ -1,3 +1,4 @@
 from app.tasks.digest_task import process_digest_job
+from app.tasks.retention_task import PurgeReport, purge_expired_digests
 
-__all__ = ["process_digest_job"]
+__all__ = ["process_digest_job", "PurgeReport", "purge_expired_digests"]
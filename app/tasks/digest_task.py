@@ -7,10 +7,11 @@ import time
 
 from sqlalchemy.orm import Session
 
+from app.db.replica import recent_writes
 from app.db.session import SessionLocal
 from app.domain import ProteinDomain
 from app.enums import DigestStatusEnum
-from app.helpers import save_peptides_with_criteria
+from app.helpers import save_peptides_with_criteria, store_digest_peptides_payload
 from app.models import Digest
 from app.services import CriteriaEvaluator
 
@@ -72,6 +73,10 @@ def process_digest_job(protein_domain: ProteinDomain) -> None:
             digest,
             values={"status": DigestStatusEnum.COMPLETED},
         )
+        recent_writes.mark(digest.user_id)
+
+        # written after the status, so a payload failure cannot fail the digest
+        store_digest_peptides_payload(session, digest)
 
         logger.info(
             f"Successfully completed digest job for digest_id: {protein_domain.digest_id}"
@@ -91,6 +96,7 @@ def process_digest_job(protein_domain: ProteinDomain) -> None:
                     digest,
                     values={"status": DigestStatusEnum.FAILED},
                 )
+                recent_writes.mark(digest.user_id)
         except Exception as update_error:
             logger.error(
                 f"Failed to update digest status to FAILED for "
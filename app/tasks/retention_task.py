@@ -0,0 +1,295 @@
+"""
+Retention purge for old digests and their peptides.
+
+Digests older than RETENTION_MAX_AGE_DAYS, or beyond a user's newest
+RETENTION_MAX_DIGESTS_PER_USER, are deleted in small batches: peptides first, at most
+RETENTION_BATCH_SIZE rows per transaction (peptide criteria follow through ON DELETE
+CASCADE), then the emptied digests along with their cached artifacts, and finally the
+protein sequences no digest references any more. Each batch commits on its own and is
+followed by a pause, so the purge never holds long locks.
+
+Run as a command:
+
+    python -m app.tasks.retention_task --max-age-days 180
+"""
+
+import argparse
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Delete,
+    Select,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+)
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.db.session import SessionLocal
+from app.enums import DigestStatusEnum
+from app.helpers import remove_digest_artifacts
+from app.models import Digest, Peptide, ProteinSequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeReport:
+    """Rows removed by a retention purge and how long it took."""
+
+    digests_deleted: int = 0
+    peptides_deleted: int = 0
+    sequences_deleted: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_deleted(self) -> int:
+        """Digest, peptide and sequence rows deleted (peptide criteria not counted)."""
+        return self.digests_deleted + self.peptides_deleted + self.sequences_deleted
+
+    @property
+    def rows_per_second(self) -> float:
+        """Deletion rate over the whole purge, pauses included."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows_deleted / self.elapsed_seconds
+
+    def finish(self) -> "PurgeReport":
+        """Stop the clock and return the report."""
+        self.elapsed_seconds = time.perf_counter() - self.started
+        return self
+
+
+def select_expired_digest_ids(
+    *,
+    max_age_days: int | None,
+    max_digests_per_user: int | None,
+    limit: int,
+    now: datetime | None = None,
+) -> Select:
+    """
+    Build a select of up to ``limit`` digest ids that fall outside retention.
+
+    Digests still PROCESSING are never selected. Oldest digests come first.
+
+    Args:
+        max_age_days: Digests created more than this many days ago expire
+        max_digests_per_user: Digests beyond each user's newest this many expire
+        limit: Maximum number of ids to select
+        now: Reference time for the age cutoff (defaults to the current time)
+
+    Returns:
+        Select of Digest.id
+
+    Raises:
+        ValueError: If neither retention rule is given
+    """
+    if not max_age_days and not max_digests_per_user:
+        raise ValueError("No retention rule: set max_age_days or max_digests_per_user")
+
+    columns: list[Any] = [Digest.id, Digest.created_at, Digest.status]
+    if max_digests_per_user:
+        columns.append(
+            func.row_number()
+            .over(
+                partition_by=Digest.user_id,
+                order_by=(Digest.created_at.desc(), Digest.id.desc()),
+            )
+            .label("user_rank")
+        )
+    ranked = select(*columns).subquery()
+
+    expired: list[ColumnElement[bool]] = []
+    if max_age_days:
+        cutoff = (now or datetime.now(UTC)) - timedelta(days=max_age_days)
+        expired.append(ranked.c.created_at < cutoff)
+    if max_digests_per_user:
+        expired.append(ranked.c.user_rank > max_digests_per_user)
+
+    return (
+        select(ranked.c.id)
+        .where(ranked.c.status != DigestStatusEnum.PROCESSING, or_(*expired))
+        .order_by(ranked.c.created_at, ranked.c.id)
+        .limit(limit)
+    )
+
+
+def purge_expired_digests(
+    *,
+    max_age_days: int | None = None,
+    max_digests_per_user: int | None = None,
+    batch_size: int | None = None,
+    digest_batch_size: int | None = None,
+    pause_seconds: float | None = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+    sleep: Callable[[float], None] = time.sleep,
+) -> PurgeReport:
+    """
+    Delete digests outside retention, and their peptides, in bounded batches.
+
+    Arguments left as None fall back to the RETENTION_* settings.
+
+    Args:
+        max_age_days: Digests created more than this many days ago are deleted
+        max_digests_per_user: Digests beyond each user's newest this many are deleted
+        batch_size: Maximum peptide rows deleted per transaction
+        digest_batch_size: Maximum digests selected and deleted per transaction
+        pause_seconds: Pause after every committed batch
+        session_factory: Factory for the database session
+        sleep: Function used to pause (replaceable in tests)
+
+    Returns:
+        PurgeReport with rows removed, batches run and rows per second
+
+    Raises:
+        ValueError: If neither retention rule is set
+    """
+    max_age_days = (
+        settings.RETENTION_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    )
+    max_digests_per_user = (
+        settings.RETENTION_MAX_DIGESTS_PER_USER
+        if max_digests_per_user is None
+        else max_digests_per_user
+    )
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    digest_batch_size = digest_batch_size or settings.RETENTION_DIGEST_BATCH_SIZE
+    pause_seconds = (
+        settings.RETENTION_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    )
+
+    expired_ids = select_expired_digest_ids(
+        max_age_days=max_age_days,
+        max_digests_per_user=max_digests_per_user,
+        limit=digest_batch_size,
+    )
+
+    report = PurgeReport()
+    session = session_factory()
+    try:
+        while digest_ids := list(session.scalars(expired_ids)):
+            report.peptides_deleted += _delete_peptides_in_batches(
+                session, digest_ids, batch_size, pause_seconds, report, sleep
+            )
+            report.digests_deleted += _commit_delete(
+                session, delete(Digest).where(Digest.id.in_(digest_ids))
+            )
+            remove_digest_artifacts(digest_ids)
+            report.batches += 1
+            logger.info(
+                f"Retention purge: deleted {len(digest_ids)} digests "
+                f"({report.digests_deleted} digests, "
+                f"{report.peptides_deleted} peptides so far)"
+            )
+            sleep(pause_seconds)
+        report.sequences_deleted += _delete_orphaned_sequences(
+            session, batch_size, pause_seconds, report, sleep
+        )
+    finally:
+        session.close()
+
+    report.finish()
+    logger.info(
+        f"Retention purge finished: {report.digests_deleted} digests and "
+        f"{report.peptides_deleted} peptides and {report.sequences_deleted} "
+        f"protein sequences in {report.batches} batches, "
+        f"{report.elapsed_seconds:.2f}s ({report.rows_per_second:.0f} rows/s)"
+    )
+    return report
+
+
+def _delete_peptides_in_batches(
+    session: Session,
+    digest_ids: list[str],
+    batch_size: int,
+    pause_seconds: float,
+    report: PurgeReport,
+    sleep: Callable[[float], None],
+) -> int:
+    """Delete the digests' peptides, at most ``batch_size`` rows per commit."""
+    deleted = 0
+    batch = (
+        select(Peptide.id).where(Peptide.digest_id.in_(digest_ids)).limit(batch_size)
+    )
+    while peptide_ids := list(session.scalars(batch)):
+        deleted += _commit_delete(
+            session, delete(Peptide).where(Peptide.id.in_(peptide_ids))
+        )
+        report.batches += 1
+        sleep(pause_seconds)
+    return deleted
+
+
+def _delete_orphaned_sequences(
+    session: Session,
+    batch_size: int,
+    pause_seconds: float,
+    report: PurgeReport,
+    sleep: Callable[[float], None],
+) -> int:
+    """Delete protein sequences no digest references, ``batch_size`` per commit."""
+    orphaned = ~exists().where(Digest.sequence_hash == ProteinSequence.hash)
+    deleted = 0
+    batch = select(ProteinSequence.hash).where(orphaned).limit(batch_size)
+    while hashes := list(session.scalars(batch)):
+        # re-checked in the DELETE in case a new digest picked the sequence up
+        deleted += _commit_delete(
+            session,
+            delete(ProteinSequence).where(ProteinSequence.hash.in_(hashes), orphaned),
+        )
+        report.batches += 1
+        sleep(pause_seconds)
+    return deleted
+
+
+def _commit_delete(session: Session, statement: Delete) -> int:
+    """Execute a DELETE in its own transaction and return the rows removed."""
+    try:
+        result = session.execute(statement)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return int(result.rowcount)  # type: ignore[attr-defined]
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command line entry point for the retention purge."""
+    parser = argparse.ArgumentParser(
+        description="Delete digests outside retention in small batches."
+    )
+    parser.add_argument("--max-age-days", type=int, default=None)
+    parser.add_argument("--max-digests-per-user", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--digest-batch-size", type=int, default=None)
+    parser.add_argument("--pause-seconds", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    report = purge_expired_digests(
+        max_age_days=args.max_age_days,
+        max_digests_per_user=args.max_digests_per_user,
+        batch_size=args.batch_size,
+        digest_batch_size=args.digest_batch_size,
+        pause_seconds=args.pause_seconds,
+    )
+    print(
+        f"Deleted {report.digests_deleted} digests, {report.peptides_deleted} "
+        f"peptides and {report.sequences_deleted} protein sequences in "
+        f"{report.elapsed_seconds:.2f}s "
+        f"({report.rows_per_second:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,42 @@
 Pytest configuration and shared fixtures.
 """
 
+import sqlite3
 import uuid
 from collections.abc import Generator
 from typing import Any
 from unittest.mock import patch
 
+import aiosqlite
 import pytest
 from factory.alchemy import SQLAlchemyModelFactory
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from app.core.dependencies import verify_internal_api_key
-from app.db.session import get_db
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.core import settings
+from app.db.session import (
+    LazyAsyncSession,
+    enforce_sqlite_foreign_keys,
+    get_async_db,
+    get_async_primary_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+)
 from app.domain import PeptideDomain, ProteinDomain
 from app.enums import AminoAcidEnum, CriteriaEnum, DigestStatusEnum, ProteaseEnum
 from app.main import app
-from app.middleware.nginx_validator import NginxValidatorMiddleware
 
 # Import all models to ensure they're registered with BaseModel.metadata
 from app.models import Criteria, Digest, Peptide, User  # noqa: F401
 from app.models.base import Base
+from app.models.criteria_registry import (
+    invalidate_criteria_registry,
+    load_criteria_registry,
+)
 from app.tasks import process_digest_job
 from tests.factories import PeptideDomainFactory, ProteinDomainFactory, UserFactory
 
@@ -118,6 +132,7 @@ def test_engine():
         poolclass=StaticPool,
         echo=False,
     )
+    enforce_sqlite_foreign_keys(engine)
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
@@ -153,22 +168,74 @@ def db_session(test_engine) -> Generator[Session]:
             session.add(criteria)
         session.commit()
 
+    # criteria ids are regenerated for every test, so reload the registry
+    load_criteria_registry(session)
+
     yield session
 
     for factory_class in SQLAlchemyModelFactory.__subclasses__():
         factory_class._meta.sqlalchemy_session = None
 
+    invalidate_criteria_registry()
     session.close()
     transaction.rollback()
     connection.close()
 
 
+class _SharedSQLiteConnection:
+    """
+    Proxy around the test's sqlite3 connection for use by aiosqlite.
+
+    Async sessions read through the same connection (and so the same open
+    transaction) as db_session; commit, rollback and close are no-ops so they
+    cannot end the per-test transaction.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        object.__setattr__(self, "_connection", connection)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._connection, name, value)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture(scope="function")
+def async_session_factory(db_session: Session) -> async_sessionmaker[AsyncSession]:
+    """
+    Create an async session factory that shares db_session's connection.
+    """
+    dbapi_connection = db_session.connection().connection.dbapi_connection
+    shared_connection = _SharedSQLiteConnection(dbapi_connection)
+
+    async def connect() -> aiosqlite.Connection:
+        return await aiosqlite.Connection(lambda: shared_connection, 64)
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", async_creator=connect, poolclass=NullPool
+    )
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
 @pytest.fixture(scope="function")
-def client(db_session: Session):
+def client(
+    db_session: Session, async_session_factory: async_sessionmaker[AsyncSession]
+):
     """
     Create a test client for the FastAPI application.
-    Overrides the get_db dependency to use the test database session.
-    Also bypasses security middleware and API key validation for testing.
+    Overrides the primary and read session dependencies to use the test database
+    session's connection.
+    Requests carry the nginx and API key headers, so they pass the request guard.
     """
 
     def override_get_db():
@@ -177,24 +244,28 @@ def client(db_session: Session):
         finally:
             pass
 
-    app.dependency_overrides[get_db] = override_get_db
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
 
-    async def override_verify_api_key():
-        """Bypass API key validation in tests."""
-        return "test-api-key"
+    async def override_get_async_primary_db():
+        async with LazyAsyncSession(async_session_factory) as primary:
+            yield primary
 
-    app.dependency_overrides[verify_internal_api_key] = override_verify_api_key
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_async_primary_db] = override_get_async_primary_db
 
-    async def bypass_dispatch(self, request, call_next):
-        """Bypass middleware validation in tests."""
-        return await call_next(request)
+    # Pass the request guard the way nginx does
+    headers = {"X-Forwarded-By": "nginx", "X-API-Key": settings.API_KEY}
 
-    with patch.object(NginxValidatorMiddleware, "dispatch", bypass_dispatch):
-        try:
-            with TestClient(app) as test_client:
-                yield test_client
-        finally:
-            app.dependency_overrides.clear()
+    try:
+        with TestClient(app, headers=headers) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.clear()
 
 
 @pytest.fixture(scope="session")
@@ -298,13 +369,22 @@ def seeded_criteria(db_session: Session) -> list[Criteria]:
 
 
 @pytest.fixture(scope="function")
-def secure_client(db_session: Session):
+def secure_client(
+    db_session: Session, async_session_factory: async_sessionmaker[AsyncSession]
+):
     """
     Create a test client with security enabled (for testing API key validation).
-    This client does NOT bypass middleware or API key validation.
+    Requests carry the nginx header but no API key, so the API key check applies.
     """
     from app.core import settings
-    from app.db.session import get_db
+    from app.db.session import (
+        LazyAsyncSession,
+        get_async_db,
+        get_async_primary_db,
+        get_async_read_db,
+        get_db,
+        get_read_db,
+    )
     from app.main import app
 
     def override_get_db():
@@ -313,13 +393,25 @@ def secure_client(db_session: Session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    async def override_get_async_primary_db():
+        async with LazyAsyncSession(async_session_factory) as primary:
+            yield primary
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_async_primary_db] = override_get_async_primary_db
 
     original_api_key = settings.API_KEY
     settings.API_KEY = "test-secret-api-key-12345"
 
     try:
-        with TestClient(app) as test_client:
+        with TestClient(app, headers={"X-Forwarded-By": "nginx"}) as test_client:
             yield test_client
     finally:
         settings.API_KEY = original_api_key
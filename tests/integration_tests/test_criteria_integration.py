@@ -35,3 +35,21 @@ def test_list_criteria_success(
         assert "rationale" in item
         assert "rank" in item
         assert "is_optional" in item
+
+
+@pytest.mark.integration
+def test_list_criteria_conditional_get(client: TestClient) -> None:
+    """Test that a matching If-None-Match on the criteria catalogue returns 304."""
+    # setup
+    first = client.get("/api/v1/criteria")
+
+    # execute
+    response = client.get(
+        "/api/v1/criteria", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    # validate
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public")
+    assert response.status_code == 304
+    assert response.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,213 @@
+"""
+Integration tests for the Arrow digest artifact download endpoint.
+"""
+
+import json
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import patch
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import settings
+from app.enums import DigestStatusEnum
+from app.helpers.digest_artifact import digest_artifact_path
+from tests.factories import DigestFactory, UserFactory
+
+
+@pytest.fixture(scope="function")
+def artifact_dir(tmp_path: Path) -> Generator[Path]:
+    """Cache artifacts in a temporary directory."""
+    with patch.object(settings, "DIGEST_ARTIFACT_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.mark.integration
+def test_get_digest_artifact_matches_peptides_response(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """The artifact holds the same peptides as the JSON endpoint, and is cached."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}"
+    columnar = client.get(f"{url}/peptides", params={"format": "columnar"}).json()
+
+    # execute
+    response = client.get(f"{url}/artifact")
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.file"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"]
+    cached = digest_artifact_path(digest_id)
+    assert cached.parent == artifact_dir
+    assert cached.read_bytes() == response.content
+
+    with pa.memory_map(str(cached)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    peptides = columnar["peptides"]
+    assert table.column("id").to_pylist() == peptides["ids"]
+    assert table.column("sequence").to_pylist() == peptides["sequences"]
+    assert table.column("rank").to_pylist() == peptides["rank"]
+    assert table.column("criteria_mask").to_pylist() == peptides["criteria_mask"]
+    metadata = table.schema.metadata
+    assert metadata[b"digest_id"].decode() == digest_id
+    assert [c["rank"] for c in json.loads(metadata[b"criteria"])] == [
+        c["rank"] for c in columnar["criteria"]
+    ]
+
+
+@pytest.mark.integration
+def test_get_digest_artifact_written_in_batches(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Peptides are written one PEPTIDE_STREAM_BATCH_SIZE record batch at a time."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}"
+    total = len(client.get(f"{url}/peptides").json()["peptides"])
+
+    # execute
+    with patch.object(settings, "PEPTIDE_STREAM_BATCH_SIZE", 2):
+        response = client.get(f"{url}/artifact")
+
+    # validate
+    assert response.status_code == 200
+    with pa.memory_map(str(digest_artifact_path(digest_id))) as source:
+        reader = pa.ipc.open_file(source)
+        assert reader.num_record_batches == -(-total // 2)
+        assert reader.read_all().num_rows == total
+
+
+@pytest.mark.integration
+def test_get_digest_artifact_serves_byte_ranges(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Range requests return 206 with the requested slice of the file."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/artifact"
+    full = client.get(url).content
+
+    # execute
+    response = client.get(url, headers={"Range": "bytes=0-5"})
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={len(full) + 10}-"})
+
+    # validate
+    assert response.status_code == 206
+    assert response.content == full[:6] == b"ARROW1"
+    assert response.headers["content-range"] == f"bytes 0-5/{len(full)}"
+    assert unsatisfiable.status_code == 416
+
+
+@pytest.mark.integration
+def test_get_digest_artifact_conditional_get(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """A matching If-None-Match returns 304 under the same strong ETag."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/artifact"
+    etag = client.get(url).headers["etag"]
+
+    # execute
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    # validate
+    assert response.status_code == 304
+    assert not etag.startswith("W/")
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.integration
+def test_get_digest_artifact_processing_digest_conflict(
+    client: TestClient,
+    artifact_dir: Path,
+) -> None:
+    """Digests that have not completed have no artifact yet."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(user=user, status=DigestStatusEnum.PROCESSING)
+
+    # execute
+    response = client.get(f"/api/v1/digest/{user.id}/{digest.id}/artifact")
+
+    # validate
+    assert response.status_code == 409
+    assert not any(artifact_dir.iterdir())
+
+
+@pytest.mark.integration
+def test_delete_digest_removes_cached_artifact(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Deleting a digest removes its cached artifact."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    client.get(f"/api/v1/digest/{user_id}/{digest_id}/artifact")
+    assert digest_artifact_path(digest_id).exists()
+
+    # execute
+    response = client.delete(f"/api/v1/digest/delete/{user_id}/{digest_id}")
+
+    # validate
+    assert response.status_code == 204
+    assert not any(artifact_dir.iterdir())
+
+
+@pytest.mark.integration
+def test_delete_user_removes_cached_artifacts(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Deleting a user removes the cached artifacts of their digests."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    client.get(f"/api/v1/digest/{user_id}/{digest_id}/artifact")
+    assert digest_artifact_path(digest_id).exists()
+
+    # execute
+    response = client.delete(f"/api/v1/users/id/{user_id}")
+
+    # validate
+    assert response.status_code == 204
+    assert not any(artifact_dir.iterdir())
+
+
+@pytest.mark.integration
+def test_get_digest_artifact_rebuilt_when_compression_changes(
+    client: TestClient,
+    artifact_dir: Path,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """A new compression gets its own file and ETag instead of the old file."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/artifact"
+    first = client.get(url)
+
+    # execute
+    with patch.object(settings, "DIGEST_ARTIFACT_COMPRESSION", "zstd"):
+        response = client.get(url)
+        compressed = digest_artifact_path(digest_id)
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert compressed.read_bytes() == response.content
+    assert response.content != first.content
+    assert len(list(artifact_dir.iterdir())) == 2
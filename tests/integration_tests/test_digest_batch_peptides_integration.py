@@ -0,0 +1,186 @@
+"""
+Integration tests for the multi-digest peptides endpoint.
+"""
+
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.domain import ProteinDomain
+from app.enums import DigestStatusEnum, ProteaseEnum
+from app.models import Criteria, Digest
+from app.tasks import process_digest_job
+from tests.factories import DigestFactory, UserFactory
+
+
+@pytest.fixture(scope="function")
+def setup_two_digests_with_peptides(
+    universal_protein: ProteinDomain,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> tuple[str, str, str]:
+    """
+    Add a second completed digest, limited to the first criteria, to the user of
+    setup_digest_with_peptides. Returns (user_id, digest_id, second_digest_id).
+    """
+    user_id, digest_id = setup_digest_with_peptides
+    first_criteria = db_session.query(Criteria).filter(Criteria.rank == 1).one()
+
+    second_digest_id = str(uuid.uuid4())
+    universal_protein.digest_id = second_digest_id
+    Digest.create(
+        db_session,
+        flush=True,
+        status=DigestStatusEnum.PROCESSING,
+        user_id=user_id,
+        protease=ProteaseEnum.TRYPSIN,
+        protein_name=None,
+        sequence=universal_protein.sequence_as_str,
+        criteria_ids=[first_criteria.id],
+        id=second_digest_id,
+    )
+
+    with (
+        patch("app.tasks.digest_task.SessionLocal", return_value=db_session),
+        patch.object(db_session, "close", lambda: None),
+    ):
+        process_digest_job(universal_protein)
+
+    db_session.commit()
+
+    return user_id, digest_id, second_digest_id
+
+
+@pytest.mark.integration
+def test_get_peptides_for_digests_matches_single_digest_responses(
+    client: TestClient,
+    setup_two_digests_with_peptides: tuple[str, str, str],
+) -> None:
+    """Each digest's peptides match the single-digest endpoint, in request order."""
+    # setup
+    user_id, digest_id, second_digest_id = setup_two_digests_with_peptides
+    singles = {
+        d: client.get(f"/api/v1/digest/{user_id}/{d}/peptides").json()
+        for d in (digest_id, second_digest_id)
+    }
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/peptides/{user_id}",
+        params={"digest_ids": [second_digest_id, digest_id, second_digest_id]},
+    )
+
+    # validate
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["digest_id"] for d in data["digests"]] == [second_digest_id, digest_id]
+    for item in data["digests"]:
+        single = singles[item["digest_id"]]
+        assert item["status"] == DigestStatusEnum.COMPLETED.value
+        assert item["peptides"] == single["peptides"]
+        assert item["criteria_ranks"] == [c["rank"] for c in single["criteria"]]
+    assert data["digests"][0]["criteria_ranks"] == [1]
+    assert data["criteria"] == singles[digest_id]["criteria"]
+
+
+@pytest.mark.integration
+def test_get_peptides_for_digests_is_four_statements(
+    client: TestClient,
+    async_session_factory: async_sessionmaker[AsyncSession],
+    setup_two_digests_with_peptides: tuple[str, str, str],
+) -> None:
+    """The user, ownership, criteria links and peptides cost one query each."""
+    # setup
+    user_id, digest_id, second_digest_id = setup_two_digests_with_peptides
+    url = f"/api/v1/digest/peptides/{user_id}"
+    params = {"digest_ids": [digest_id, second_digest_id]}
+    client.get(url, params=params)  # load the criteria registry
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        response = client.get(url, params=params)
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    # validate
+    assert response.status_code == 200
+    assert len(statements) == 4
+    assert "peptides" in statements[-1]
+
+
+@pytest.mark.integration
+def test_get_peptides_for_digests_processing_digest_has_no_peptides(
+    client: TestClient,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """A digest that is still processing is returned with an empty list."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    processing = Digest.create(
+        db_session,
+        status=DigestStatusEnum.PROCESSING,
+        user_id=user_id,
+        protease=ProteaseEnum.TRYPSIN,
+        sequence="MKWVTFISLLLLFSSAYSR",
+    )
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/peptides/{user_id}",
+        params={"digest_ids": [digest_id, processing.id]},
+    )
+
+    # validate
+    assert response.status_code == 200
+    digests = response.json()["digests"]
+    assert digests[1]["status"] == DigestStatusEnum.PROCESSING.value
+    assert digests[1]["peptides"] == []
+    assert digests[0]["peptides"]
+
+
+@pytest.mark.integration
+def test_get_peptides_for_digests_other_users_digest_not_found(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Any digest not owned by the user fails the whole request with 404."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    other_digest = DigestFactory.create()
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/peptides/{user_id}",
+        params={"digest_ids": [digest_id, other_digest.id]},
+    )
+
+    # validate
+    assert response.status_code == 404
+    assert other_digest.id in response.json()["detail"]
+    assert digest_id not in response.json()["detail"]
+
+
+@pytest.mark.integration
+def test_get_peptides_for_digests_requires_digest_ids(client: TestClient) -> None:
+    """At least one digest id is required."""
+    # setup
+    user = UserFactory.create()
+
+    # execute
+    response = client.get(f"/api/v1/digest/peptides/{user.id}")
+
+    # validate
+    assert response.status_code == 422
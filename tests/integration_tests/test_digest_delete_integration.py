@@ -2,12 +2,16 @@
 Integration tests for the digest delete endpoint.
 """
 
+import tracemalloc
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 
 from app.enums import DigestStatusEnum
-from app.models import Digest
+from app.models import Criteria, Digest, DigestCriteria, Peptide, PeptideCriteria
 from tests.factories import DigestFactory, UserFactory
 
 
@@ -120,3 +124,128 @@ def test_delete_digest_by_id_digest_belongs_to_other_user(
     )
     assert remaining_digest is not None
     assert remaining_digest.user_id == user2.id
+
+
+@pytest.mark.integration
+def test_delete_digest_cascades_to_children(
+    client: TestClient,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that the database removes peptides, their criteria and criteria links."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    peptide_ids = select(Peptide.id).where(Peptide.digest_id == digest_id)
+    assert db_session.scalar(select(func.count()).select_from(peptide_ids.subquery()))
+
+    # execute
+    response = client.delete(f"/api/v1/digest/delete/{user_id}/{digest_id}")
+
+    # validate
+    assert response.status_code == 204
+    assert (
+        db_session.scalar(
+            select(func.count())
+            .select_from(Peptide)
+            .where(Peptide.digest_id == digest_id)
+        )
+        == 0
+    )
+    assert (
+        db_session.scalar(
+            select(func.count())
+            .select_from(PeptideCriteria)
+            .where(PeptideCriteria.peptide_id.in_(peptide_ids))
+        )
+        == 0
+    )
+    assert (
+        db_session.scalar(
+            select(func.count())
+            .select_from(DigestCriteria)
+            .where(DigestCriteria.digest_id == digest_id)
+        )
+        == 0
+    )
+
+
+def _insert_digest_with_peptides(
+    db_session: Session, peptide_count: int
+) -> tuple[str, str]:
+    """Bulk insert a digest with ``peptide_count`` peptides, each matching a criteria."""
+    digest = DigestFactory.create(status=DigestStatusEnum.COMPLETED)
+    criteria_id = db_session.scalars(select(Criteria.id).limit(1)).one()
+    peptide_ids = [str(uuid.uuid4()) for _ in range(peptide_count)]
+    db_session.execute(
+        insert(Peptide),
+        [
+            {
+                "id": peptide_id,
+                "digest_id": digest.id,
+                "sequence": "AEDIHYK",
+                "position": rank,
+                "rank": rank,
+            }
+            for rank, peptide_id in enumerate(peptide_ids, start=1)
+        ],
+    )
+    db_session.execute(
+        insert(PeptideCriteria),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "peptide_id": peptide_id,
+                "criteria_id": criteria_id,
+            }
+            for peptide_id in peptide_ids
+        ],
+    )
+    db_session.commit()
+    return digest.user_id, digest.id
+
+
+def _delete_peak_memory(db_session: Session, user_id: str, digest_id: str) -> int:
+    """Delete a digest with Digest.delete_by and return the traced peak bytes."""
+    db_session.expunge_all()
+
+    tracemalloc.start()
+    try:
+        deleted = Digest.delete_by(db_session, user_id=user_id, id=digest_id)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert deleted == 1
+    assert (
+        db_session.scalar(
+            select(func.count())
+            .select_from(Peptide)
+            .where(Peptide.digest_id == digest_id)
+        )
+        == 0
+    )
+    return peak
+
+
+@pytest.mark.slow
+@pytest.mark.integration
+def test_delete_digest_memory_is_constant_in_peptide_count(
+    db_session: Session,
+) -> None:
+    """
+    Benchmark: deleting a digest with 10k peptides takes no more memory than one
+    with 100, because no peptide or peptide criteria row is loaded.
+    """
+    # setup
+    small_digest = _insert_digest_with_peptides(db_session, 100)
+    large_digest = _insert_digest_with_peptides(db_session, 10_000)
+
+    # execute
+    small_peak = _delete_peak_memory(db_session, *small_digest)
+    large_peak = _delete_peak_memory(db_session, *large_digest)
+
+    # validate
+    assert large_peak < 2 * small_peak + 64 * 1024, (
+        f"delete peak memory: 100 peptides={small_peak} B, "
+        f"10k peptides={large_peak} B"
+    )
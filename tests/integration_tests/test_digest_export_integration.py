@@ -0,0 +1,149 @@
+"""
+Integration tests for the CSV/TSV/FASTA digest peptides export endpoint.
+"""
+
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.helpers.digest_export import EXPORT_COLUMNS
+from tests.factories import DigestFactory, UserFactory
+
+
+@pytest.mark.integration
+def test_export_digest_peptides_csv_matches_peptides_response(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """CSV export holds a header row and every peptide in rank order."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}"
+    peptides = client.get(f"{url}/peptides").json()["peptides"]
+
+    # execute
+    response = client.get(f"{url}/export")
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert (
+        response.headers["content-disposition"]
+        == f'attachment; filename="{digest_id}.csv"'
+    )
+    assert response.headers["etag"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0].keys()) == EXPORT_COLUMNS
+    assert [row["id"] for row in rows] == [p["id"] for p in peptides]
+    assert [row["sequence"] for row in rows] == [p["sequence"] for p in peptides]
+    assert [int(row["rank"]) for row in rows] == [p["rank"] for p in peptides]
+
+
+@pytest.mark.integration
+def test_export_digest_peptides_tsv(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """TSV export uses tabs and its own media type."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/export", params={"format": "tsv"}
+    )
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/tab-separated-values")
+    lines = response.text.splitlines()
+    assert lines[0].split("\t") == EXPORT_COLUMNS
+    assert all(len(line.split("\t")) == len(EXPORT_COLUMNS) for line in lines[1:])
+
+
+@pytest.mark.integration
+def test_export_digest_peptides_fasta(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """FASTA export holds one header and sequence line per peptide."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}"
+    peptides = client.get(f"{url}/peptides").json()["peptides"]
+
+    # execute
+    response = client.get(f"{url}/export", params={"format": "fasta"})
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/x-fasta")
+    lines = response.text.splitlines()
+    headers, sequences = lines[::2], lines[1::2]
+    assert sequences == [p["sequence"] for p in peptides]
+    assert headers[0] == (
+        f">{digest_id}|rank={peptides[0]['rank']}"
+        f"|position={peptides[0]['position']}|length={len(peptides[0]['sequence'])}"
+    )
+
+
+@pytest.mark.integration
+def test_export_digest_peptides_passes_all_criteria(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """passes_all_criteria exports only peptides that match no criteria."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}"
+    peptides = client.get(f"{url}/peptides").json()["peptides"]
+    expected = [p["id"] for p in peptides if not p["criteria_ranks"]]
+
+    # execute
+    response = client.get(f"{url}/export", params={"passes_all_criteria": True})
+    filtered = client.get(f"{url}/peptides", params={"passes_all_criteria": True})
+
+    # validate
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == expected
+    assert all(row["criteria"] == "" for row in rows)
+    assert [p["id"] for p in filtered.json()["peptides"]] == expected
+
+
+@pytest.mark.integration
+def test_export_digest_peptides_conditional_get(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """A matching If-None-Match returns 304, per format."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/export"
+    etag = client.get(url).headers["etag"]
+
+    # execute
+    response = client.get(url, headers={"If-None-Match": etag})
+    other_format = client.get(
+        url, params={"format": "fasta"}, headers={"If-None-Match": etag}
+    )
+
+    # validate
+    assert response.status_code == 304
+    assert other_format.status_code == 200
+
+
+@pytest.mark.integration
+def test_export_digest_peptides_digest_not_found(client: TestClient) -> None:
+    """Exporting a digest that does not exist returns 404."""
+    # setup
+    user = UserFactory.create()
+    other_digest = DigestFactory.create()
+
+    # execute
+    response = client.get(f"/api/v1/digest/{user.id}/{other_digest.id}/export")
+
+    # validate
+    assert response.status_code == 404
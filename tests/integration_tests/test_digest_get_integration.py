@@ -4,6 +4,8 @@ Integration tests for the get digest by ID endpoint.
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
 from app.enums import DigestStatusEnum
@@ -127,3 +129,84 @@ def test_get_digest_by_id_user_not_found(
 
     # validate
     assert response.status_code == 404
+
+
+@pytest.mark.integration
+def test_get_digest_by_id_conditional_get(
+    client: TestClient,
+    db_session: Session,
+) -> None:
+    """Test that the ETag changes with status and a matching If-None-Match returns 304."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(user=user, status=DigestStatusEnum.PROCESSING)
+    url = f"/api/v1/digest/{user.id}/{digest.id}"
+    processing = client.get(url)
+
+    # execute
+    not_modified = client.get(
+        url, headers={"If-None-Match": processing.headers["etag"]}
+    )
+    digest.status = DigestStatusEnum.COMPLETED
+    db_session.commit()
+    completed = client.get(url, headers={"If-None-Match": processing.headers["etag"]})
+
+    # validate
+    assert processing.status_code == 200
+    assert processing.headers["cache-control"] == "private, no-cache"
+    assert not_modified.status_code == 304
+    assert completed.status_code == 200
+    assert completed.headers["etag"] != processing.headers["etag"]
+    assert "immutable" in completed.headers["cache-control"]
+
+
+@pytest.mark.integration
+def test_get_digest_by_id_sparse_fieldset(
+    client: TestClient,
+    async_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """fields returns only the requested fields and skips the sequence join."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(
+        user=user, status=DigestStatusEnum.COMPLETED, sequence="MKTAYIAKQR"
+    )
+    url = f"/api/v1/digest/{user.id}/{digest.id}"
+    full_etag = client.get(url).headers["etag"]
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        response = client.get(url, params={"fields": "id,status"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+    with_sequence = client.get(url, params={"fields": "sequence"})
+
+    # validate
+    assert response.status_code == 200
+    assert response.json() == {"id": digest.id, "status": "completed"}
+    assert response.headers["etag"] != full_etag
+    assert not any("protein_sequences" in s for s in statements)
+    assert with_sequence.json() == {"sequence": "MKTAYIAKQR"}
+
+
+@pytest.mark.integration
+def test_get_digest_by_id_sparse_fieldset_not_found(client: TestClient) -> None:
+    """A digest of another user is not found with fields either."""
+    # setup
+    user = UserFactory.create()
+    other_digest = DigestFactory.create()
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user.id}/{other_digest.id}", params={"fields": "status"}
+    )
+
+    # validate
+    assert response.status_code == 404
@@ -2,15 +2,20 @@
 Integration tests for the digest peptides endpoint.
 """
 
+import json
 import uuid
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
+from app.core import settings
 from app.domain import ProteinDomain
 from app.enums import DigestStatusEnum, ProteaseEnum
+from app.models import DigestPayload, Peptide
 from tests.factories import DigestFactory, UserFactory
 
 
@@ -63,6 +68,158 @@ def test_get_digest_peptides_by_id_success(
         assert "rank" in criterion
 
 
+@pytest.mark.integration
+def test_get_digest_peptides_by_id_streams_ndjson(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that NDJSON is streamed with the criteria header first and peptides in rank order."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides",
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    header, peptides = lines[0], lines[1:]
+    assert header["digest_id"] == digest_id
+    assert len(header["criteria"]) == 14
+
+    assert [p["rank"] for p in peptides] == [1, 2, 3]
+    json_response = client.get(f"/api/v1/digest/{user_id}/{digest_id}/peptides")
+    assert peptides == json_response.json()["peptides"]
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_by_id_columnar_format(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that format=columnar returns the same peptides as parallel arrays."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    rows = client.get(f"/api/v1/digest/{user_id}/{digest_id}/peptides").json()
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides",
+        params={"format": "columnar"},
+    )
+
+    # validate
+    assert response.status_code == 200
+    data = response.json()
+    assert data["digest_id"] == digest_id
+    assert data["criteria"] == rows["criteria"]
+
+    columns = data["peptides"]
+    assert columns["ids"] == [p["id"] for p in rows["peptides"]]
+    assert columns["sequences"] == [p["sequence"] for p in rows["peptides"]]
+    assert columns["positions"] == [p["position"] for p in rows["peptides"]]
+    assert columns["pi"] == [p["pi"] for p in rows["peptides"]]
+    assert columns["charge_state"] == [p["charge_state"] for p in rows["peptides"]]
+    assert columns["max_kd_score"] == [p["max_kd_score"] for p in rows["peptides"]]
+    assert columns["rank"] == [1, 2, 3]
+    for mask, peptide in zip(columns["criteria_mask"], rows["peptides"], strict=True):
+        ranks = [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+        assert ranks == peptide["criteria_ranks"]
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_by_id_conditional_get(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that a matching If-None-Match returns 304 without loading peptides."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    first = client.get(url)
+    etag = first.headers["etag"]
+
+    # execute
+    with patch(
+        "app.api.routes.digest.Peptide.afind_by_digest_id_ordered_by_rank_or_raise"
+    ) as mock_get_peptides:
+        response = client.get(url, headers={"If-None-Match": etag})
+
+    # validate
+    assert first.status_code == 200
+    assert "immutable" in first.headers["cache-control"]
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    mock_get_peptides.assert_not_called()
+
+    columnar = client.get(
+        url, params={"format": "columnar"}, headers={"If-None-Match": etag}
+    )
+    assert columnar.status_code == 200
+    assert columnar.headers["etag"] != etag
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_conditional_get_skips_sequence(
+    client: TestClient,
+    async_session_factory: async_sessionmaker[AsyncSession],
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """A 304, and a response served from the stored payload, never read the
+    protein sequence."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    etag = client.get(url).headers["etag"]
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        payload = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    # validate
+    assert not_modified.status_code == 304
+    assert payload.status_code == 200
+    assert statements
+    assert not any("protein_sequences" in s for s in statements)
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_by_id_stream_no_peptides_found(
+    client: TestClient,
+    db_session: Session,
+) -> None:
+    """Test that 404 is returned before streaming starts when there are no peptides."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(user=user)
+    db_session.commit()
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user.id}/{digest.id}/peptides",
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    # validate
+    assert response.status_code == 404
+
+
 @pytest.mark.integration
 def test_get_digest_peptides_by_id_user_not_found(
     client: TestClient,
@@ -168,3 +325,368 @@ def test_get_digest_peptides_returns_only_digest_criteria(
         assert "goal" in c
         assert "rationale" in c
         assert "rank" in c
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_keyset_pagination(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that limit and after_rank page through peptides in rank order."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+
+    # execute
+    first_page = client.get(url, params={"limit": 2})
+    second_page = client.get(
+        url, params={"limit": 2, "after_rank": first_page.json()["next_after_rank"]}
+    )
+
+    # validate
+    assert first_page.status_code == 200
+    assert [p["rank"] for p in first_page.json()["peptides"]] == [1, 2]
+    assert first_page.json()["next_after_rank"] == 2
+
+    assert second_page.status_code == 200
+    assert [p["rank"] for p in second_page.json()["peptides"]] == [3]
+    assert second_page.json()["next_after_rank"] is None
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_filters_by_rank_and_length(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that rank and length windows are applied to the returned peptides."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    all_peptides = client.get(url).json()["peptides"]
+    lengths = sorted(len(p["sequence"]) for p in all_peptides)
+
+    # execute
+    by_rank = client.get(url, params={"min_rank": 2, "max_rank": 3})
+    by_length = client.get(url, params={"min_length": lengths[-1]})
+
+    # validate
+    assert by_rank.status_code == 200
+    assert [p["rank"] for p in by_rank.json()["peptides"]] == [2, 3]
+
+    assert by_length.status_code == 200
+    assert by_length.json()["peptides"]
+    assert all(len(p["sequence"]) >= lengths[-1] for p in by_length.json()["peptides"])
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_filters_by_criteria(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that required and excluded criteria partition the peptides."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    data = client.get(url).json()
+    first_peptide = data["peptides"][0]
+    criterion = next(
+        c for c in data["criteria"] if c["rank"] in first_peptide["criteria_ranks"]
+    )
+
+    # execute
+    required = client.get(url, params={"require_criteria": criterion["code"]})
+    excluded = client.get(url, params={"exclude_criteria": criterion["code"]})
+
+    # validate
+    assert required.status_code == 200
+    assert excluded.status_code == 200
+    required_ids = {p["id"] for p in required.json()["peptides"]}
+    excluded_ids = {p["id"] for p in excluded.json()["peptides"]}
+    assert first_peptide["id"] in required_ids
+    assert required_ids.isdisjoint(excluded_ids)
+    assert len(required_ids) + len(excluded_ids) == len(data["peptides"])
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_filters_with_no_matches(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that filters matching nothing return an empty list rather than 404."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides", params={"min_rank": 1000}
+    )
+
+    # validate
+    assert response.status_code == 200
+    assert response.json()["peptides"] == []
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_rejects_inverted_range(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Test that a minimum above its maximum is rejected as a validation error."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides",
+        params={"min_length": 10, "max_length": 5},
+    )
+
+    # validate
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_compact_storage_restores_sequences(
+    client: TestClient,
+    db_session: Session,
+    universal_protein: ProteinDomain,
+    request: pytest.FixtureRequest,
+) -> None:
+    """Peptides stored as (position, length) are served with their sequences."""
+    # setup
+    with patch.object(settings, "COMPACT_PEPTIDE_STORAGE", True):
+        user_id, digest_id = request.getfixturevalue("setup_digest_with_peptides")
+    stored = db_session.scalars(
+        select(Peptide).where(Peptide.digest_id == digest_id)
+    ).all()
+    expected = {p.position: p.sequence_as_str for p in universal_protein.peptides}
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+
+    # execute
+    response = client.get(url)
+    streamed = client.get(url, headers={"Accept": "application/x-ndjson"})
+
+    # validate
+    assert all(peptide.sequence is None for peptide in stored)
+    assert {p.position: p.length for p in stored} == {
+        position: len(sequence) for position, sequence in expected.items()
+    }
+    assert response.status_code == 200
+    assert {p["position"]: p["sequence"] for p in response.json()["peptides"]} == (
+        expected
+    )
+    lines = [json.loads(line) for line in streamed.text.splitlines()[1:]]
+    assert {p["position"]: p["sequence"] for p in lines} == expected
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_serves_stored_payload(
+    client: TestClient,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """A completed digest's unfiltered peptides come from the stored payload."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    stored = db_session.get(DigestPayload, digest_id)
+    assert stored is not None
+
+    # execute
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assembled = client.get(
+        url, params={"min_rank": 1}, headers={"Accept-Encoding": "identity"}
+    )
+
+    # validate
+    assert gzipped.status_code == 200
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"]
+    assert "content-encoding" not in plain.headers
+    assert gzipped.json() == plain.json() == assembled.json()
+    assert "content-encoding" not in assembled.headers
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_without_payload_assembles_rows(
+    client: TestClient,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Digests completed before payloads existed are assembled from rows."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    db_session.execute(delete(DigestPayload))
+    db_session.commit()
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides",
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    # validate
+    assert response.status_code == 200
+    assert [p["rank"] for p in response.json()["peptides"]] == [1, 2, 3]
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_payload_and_rows_bodies_are_identical(
+    client: TestClient,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """
+    The stored payload and the body assembled from rows share one strong ETag,
+    so they must be byte for byte the same.
+    """
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    headers = {"Accept-Encoding": "identity"}
+    from_payload = client.get(url, headers=headers)
+    db_session.execute(delete(DigestPayload))
+    db_session.commit()
+
+    # execute
+    from_rows = client.get(url, headers=headers)
+
+    # validate
+    assert from_payload.status_code == from_rows.status_code == 200
+    assert from_payload.headers["etag"] == from_rows.headers["etag"]
+    assert from_payload.content == from_rows.content
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_sparse_fieldset(
+    client: TestClient,
+    async_session_factory: async_sessionmaker[AsyncSession],
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """fields limits both the columns read and the fields returned."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    full = client.get(url).json()["peptides"]
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        response = client.get(url, params={"fields": "sequence,rank,criteria_ranks"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    # validate
+    assert response.status_code == 200
+    assert response.json()["peptides"] == [
+        {
+            "sequence": p["sequence"],
+            "rank": p["rank"],
+            "criteria_ranks": p["criteria_ranks"],
+        }
+        for p in full
+    ]
+    assert response.json()["criteria"]
+    peptide_select = next(s for s in statements if "FROM peptides" in s)
+    assert "peptides.pi" not in peptide_select
+    assert "peptides.max_kd_score" not in peptide_select
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_sparse_fieldset_columnar_and_stream(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Repeated fields values apply to the columnar layout and NDJSON stream."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    params = {"fields": ["rank", "criteria_ranks"]}
+
+    # execute
+    columnar = client.get(url, params={**params, "format": "columnar"})
+    streamed = client.get(
+        url, params=params, headers={"Accept": "application/x-ndjson"}
+    )
+
+    # validate
+    assert columnar.status_code == 200
+    assert set(columnar.json()["peptides"]) == {"rank", "criteria_mask"}
+    assert columnar.json()["peptides"]["rank"] == [1, 2, 3]
+    lines = [json.loads(line) for line in streamed.text.splitlines()[1:]]
+    assert [set(line) for line in lines] == [{"rank", "criteria_ranks"}] * 3
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_sparse_fieldset_compact_storage(
+    client: TestClient,
+    universal_protein: ProteinDomain,
+    request: pytest.FixtureRequest,
+) -> None:
+    """Compactly stored sequences are restored when only the sequence is requested."""
+    # setup
+    with patch.object(settings, "COMPACT_PEPTIDE_STORAGE", True):
+        user_id, digest_id = request.getfixturevalue("setup_digest_with_peptides")
+    expected = [
+        p.sequence_as_str
+        for p in sorted(universal_protein.peptides, key=lambda p: p.rank)
+    ]
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides", params={"fields": "sequence"}
+    )
+
+    # validate
+    assert response.status_code == 200
+    assert response.json()["peptides"] == [{"sequence": s} for s in expected]
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_rejects_unknown_field(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Unknown field names are rejected."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/{user_id}/{digest_id}/peptides",
+        params={"fields": "sequence,digest_id"},
+    )
+
+    # validate
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+def test_get_digest_peptides_assembled_response_is_compressed(
+    client: TestClient,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """Responses assembled from rows are gzipped for clients that accept it."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    url = f"/api/v1/digest/{user_id}/{digest_id}/peptides"
+    params = {"format": "columnar"}
+
+    # execute
+    compressed = client.get(url, params=params, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+
+    # validate
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) > settings.RESPONSE_COMPRESSION_MINIMUM_SIZE
+    assert compressed.json() == plain.json()
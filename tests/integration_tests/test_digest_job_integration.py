@@ -7,15 +7,33 @@ from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import asc
+from sqlalchemy import asc, event
 from sqlalchemy.orm import Session
 
+from app.core import settings
 from app.domain import ProteinDomain
 from app.enums import CriteriaEnum, DigestStatusEnum, ProteaseEnum
-from app.models import Digest, DigestCriteria, Peptide, PeptideCriteria
+from app.models import (
+    Criteria,
+    Digest,
+    DigestCriteria,
+    DigestPayload,
+    Peptide,
+    PeptideCriteria,
+)
+from app.models.criteria_registry import get_criteria_registry
 from tests.factories import UserFactory
 
 
+def _criteria_codes(peptide: Peptide) -> set[CriteriaEnum]:
+    """Decode a peptide's criteria_mask into criteria codes."""
+    registry = get_criteria_registry()
+    return {
+        registry.by_rank[rank].code
+        for rank in Criteria.mask_to_ranks(peptide.criteria_mask)
+    }
+
+
 @pytest.mark.integration
 def test_create_digest_job_integration(
     universal_protein: ProteinDomain,
@@ -99,13 +117,7 @@ def test_create_digest_job_integration(
             peptide.max_kd_score, float
         )
 
-        criteria = (
-            db_session.query(PeptideCriteria)
-            .filter(PeptideCriteria.peptide_id == peptide.id)
-            .all()
-        )
-
-        criteria_codes = {c.criteria.code for c in criteria}
+        criteria_codes = _criteria_codes(peptide)
 
         if i in {1, 2}:
             assert criteria_codes == expected_bad_peptide_criteria
@@ -236,12 +248,7 @@ def test_create_digest_job_all_criteria_ids_uses_all_criteria(
     )
     assert len(peptides) == 3
     for peptide in peptides:
-        peptide_criteria = (
-            db_session.query(PeptideCriteria)
-            .filter(PeptideCriteria.peptide_id == peptide.id)
-            .all()
-        )
-        assert len(peptide_criteria) > 0
+        assert peptide.criteria_mask > 0
 
 
 @pytest.mark.integration
@@ -294,10 +301,124 @@ def test_create_digest_job_subset_criteria_ids_uses_only_those_criteria(
     )
     assert len(peptides) == 3
     for peptide in peptides:
-        peptide_criteria = (
+        assert {code.value for code in _criteria_codes(peptide)} <= allowed_codes
+
+
+@pytest.mark.integration
+def test_create_digest_job_statement_count(
+    universal_protein: ProteinDomain,
+    client: TestClient,
+    db_session: Session,
+) -> None:
+    """Submitting a job runs one check query, the sequence insert and one batched write for digest and criteria."""
+    # setup
+    user = UserFactory.create()
+    request_data = {
+        "user_id": user.id,
+        "protease": ProteaseEnum.TRYPSIN.value,
+        "protein_name": "Test Protein",
+        "sequence": universal_protein.sequence_as_str,
+    }
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        with patch("app.api.routes.digest.process_digest_job"):
+            response = client.post("/api/v1/digest/job", json=request_data)
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    # validate
+    assert response.status_code == 201
+    assert len(statements) == 4
+    assert statements[0].lstrip().upper().startswith("SELECT")
+    assert "INSERT INTO protein_sequences" in statements[1]
+    assert "INSERT INTO digests" in statements[2]
+    assert "INSERT INTO digest_criteria" in statements[3]
+
+
+@pytest.mark.integration
+def test_digest_job_stores_criteria_mask_without_join_rows(
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """By default matched criteria live only in criteria_mask."""
+    # setup
+    _, digest_id = setup_digest_with_peptides
+
+    # execute
+    peptides = db_session.query(Peptide).filter(Peptide.digest_id == digest_id).all()
+    join_rows = (
+        db_session.query(PeptideCriteria)
+        .filter(PeptideCriteria.peptide_id.in_([p.id for p in peptides]))
+        .count()
+    )
+
+    # validate
+    assert len(peptides) == 3
+    assert all(peptide.criteria_mask > 0 for peptide in peptides)
+    assert join_rows == 0
+
+
+@pytest.mark.integration
+def test_digest_job_writes_join_rows_matching_criteria_mask_when_enabled(
+    universal_protein: ProteinDomain,
+    db_session: Session,
+    request: pytest.FixtureRequest,
+) -> None:
+    """With WRITE_PEPTIDE_CRITERIA_ROWS the join rows mirror criteria_mask."""
+    # setup
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        with patch.object(settings, "WRITE_PEPTIDE_CRITERIA_ROWS", True):
+            _, digest_id = request.getfixturevalue("setup_digest_with_peptides")
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    # validate
+    assert sum("INSERT INTO peptides " in s for s in statements) == 1
+    assert sum("INSERT INTO peptide_criteria " in s for s in statements) == 1
+    peptides = db_session.query(Peptide).filter(Peptide.digest_id == digest_id).all()
+    for peptide in peptides:
+        join_rows = (
             db_session.query(PeptideCriteria)
             .filter(PeptideCriteria.peptide_id == peptide.id)
             .all()
         )
-        for pc in peptide_criteria:
-            assert pc.criteria.code.value in allowed_codes
+        assert {row.criteria.code for row in join_rows} == _criteria_codes(peptide)
+
+
+@pytest.mark.integration
+def test_digest_job_payload_write_failure_keeps_digest_completed(
+    db_session: Session,
+    request: pytest.FixtureRequest,
+) -> None:
+    """A payload that fails to commit is dropped; the digest still completes."""
+    # setup
+    # a NULL payload violates NOT NULL when the payload is committed
+    with patch(
+        "app.helpers.digest_payload.render_digest_peptides_payload", return_value=None
+    ):
+        # execute
+        _, digest_id = request.getfixturevalue("setup_digest_with_peptides")
+
+    # validate
+    digest = db_session.get(Digest, digest_id)
+    assert digest is not None
+    assert digest.status == DigestStatusEnum.COMPLETED
+    assert db_session.get(DigestPayload, digest_id) is None
+    assert db_session.query(Peptide).filter(Peptide.digest_id == digest_id).count()
@@ -2,12 +2,15 @@
 Integration tests for the digest list endpoint.
 """
 
+from datetime import UTC, datetime, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.enums import DigestStatusEnum
 from app.models import Digest
+from app.schemas.digest import DIGEST_LIST_DEFAULT_LIMIT, DIGEST_LIST_MAX_LIMIT
 from tests.factories import DigestFactory, UserFactory
 
 
@@ -92,3 +95,135 @@ def test_get_digests_by_id_empty_list(
 
     db_digests = db_session.query(Digest).filter(Digest.user_id == user.id).all()
     assert len(db_digests) == 0
+
+
+@pytest.mark.integration
+def test_get_digests_by_id_omits_sequence_unless_requested(
+    client: TestClient,
+) -> None:
+    """Test that the list projection leaves out the sequence unless asked for it."""
+    # setup
+    user = UserFactory.create()
+    DigestFactory.create(user=user, sequence="MKTAYIAKQR")
+
+    # execute
+    default_response = client.get(f"/api/v1/digest/list/{user.id}")
+    full_response = client.get(
+        f"/api/v1/digest/list/{user.id}", params={"include_sequence": True}
+    )
+
+    # validate
+    assert default_response.status_code == 200
+    assert default_response.json()["digests"][0]["sequence"] is None
+
+    assert full_response.status_code == 200
+    assert full_response.json()["digests"][0]["sequence"] == "MKTAYIAKQR"
+
+
+@pytest.mark.integration
+def test_get_digests_by_id_keyset_pagination(
+    client: TestClient,
+) -> None:
+    """Test that limit and cursor page through digests newest first without overlap."""
+    # setup
+    user = UserFactory.create()
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    digests = [
+        DigestFactory.create(user=user, created_at=base + timedelta(minutes=i))
+        for i in range(5)
+    ]
+    expected_ids = [d.id for d in reversed(digests)]
+    url = f"/api/v1/digest/list/{user.id}"
+
+    # execute
+    pages = []
+    params: dict = {"limit": 2}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append([d["id"] for d in response.json()["digests"]])
+        next_cursor = response.json()["next_cursor"]
+        if next_cursor is None:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    # validate
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [digest_id for page in pages for digest_id in page] == expected_ids
+
+
+@pytest.mark.integration
+def test_get_digests_by_id_paginates_by_default(
+    client: TestClient,
+) -> None:
+    """Test that the list is paged without a limit and rejects oversized pages."""
+    # setup
+    user = UserFactory.create()
+    for _ in range(DIGEST_LIST_DEFAULT_LIMIT + 1):
+        DigestFactory.create(user=user)
+    url = f"/api/v1/digest/list/{user.id}"
+
+    # execute
+    first = client.get(url)
+    rest = client.get(url, params={"cursor": first.json()["next_cursor"]})
+    oversized = client.get(url, params={"limit": DIGEST_LIST_MAX_LIMIT + 1})
+
+    # validate
+    assert first.status_code == 200
+    assert len(first.json()["digests"]) == DIGEST_LIST_DEFAULT_LIMIT
+    assert len(rest.json()["digests"]) == 1
+    assert rest.json()["next_cursor"] is None
+    assert oversized.status_code == 422
+
+
+@pytest.mark.integration
+def test_get_digests_by_id_invalid_cursor(client: TestClient) -> None:
+    """Test that a malformed cursor is rejected as a validation error."""
+    # setup
+    user = UserFactory.create()
+
+    # execute
+    response = client.get(
+        f"/api/v1/digest/list/{user.id}", params={"cursor": "not-a-cursor"}
+    )
+
+    # validate
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+def test_get_digests_by_id_sparse_fieldset(
+    client: TestClient,
+) -> None:
+    """fields returns only the requested fields, and still pages by cursor."""
+    # setup
+    user = UserFactory.create()
+    now = datetime.now(UTC)
+    digests = [
+        DigestFactory.create(
+            user=user, sequence="MKTAYIAKQR", created_at=now - timedelta(minutes=i)
+        )
+        for i in range(3)
+    ]
+    url = f"/api/v1/digest/list/{user.id}"
+
+    # execute
+    first = client.get(url, params={"fields": "status,sequence", "limit": 2})
+    second = client.get(
+        url,
+        params={
+            "fields": ["status", "sequence"],
+            "limit": 2,
+            "cursor": first.json()["next_cursor"],
+        },
+    )
+
+    # validate
+    assert first.status_code == 200
+    assert first.json()["digests"] == [
+        {"status": d.status.value, "sequence": "MKTAYIAKQR"} for d in digests[:2]
+    ]
+    assert second.json()["digests"] == [
+        {"status": digests[2].status.value, "sequence": "MKTAYIAKQR"}
+    ]
+    assert second.json()["next_cursor"] is None
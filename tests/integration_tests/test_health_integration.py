@@ -17,3 +17,14 @@ def test_health_endpoint(client: TestClient):
     assert data["status"] == "healthy"
     assert data["service"] == "qpeptide-finder-backend"
     assert "database" in data
+
+
+@pytest.mark.integration
+def test_metrics_endpoint(client: TestClient):
+    """Test that pool metrics are served as Prometheus text."""
+    # execute
+    response = client.get("/metrics")
+
+    # validate
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
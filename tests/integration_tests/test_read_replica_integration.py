@@ -0,0 +1,235 @@
+"""
+Integration tests for read-replica routing of the GET endpoints.
+
+The primary is the usual test database; the replica is a second SQLite database
+that only holds the rows a test copies into it, so replication lag can be
+simulated by leaving rows out or copying them in an older state.
+"""
+
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db.replica import LAST_WRITE_COOKIE, READ_REPLICA_INFO_KEY, recent_writes
+from app.db.session import async_database_url, get_async_read_db
+from app.enums import DigestStatusEnum
+from app.main import app
+from app.models import Digest, ProteinSequence, User
+from app.models.base import Base
+from tests.factories import DigestFactory, UserFactory
+
+
+@pytest.fixture(scope="function")
+def replica_sessionmaker(
+    client: TestClient,
+    async_session_factory: async_sessionmaker[AsyncSession],
+    tmp_path: Path,
+) -> Generator[sessionmaker[Session]]:
+    """
+    Route the client's GET endpoints through a separate SQLite replica.
+
+    The real read dependency is used, with its replica factory bound to the
+    replica database and its primary factory bound to the test database.
+    Returns a sessionmaker for seeding the replica.
+    """
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    replica_engine = create_engine(replica_url)
+    Base.metadata.create_all(bind=replica_engine)
+
+    async_replica_factory = async_sessionmaker(
+        create_async_engine(async_database_url(replica_url), poolclass=NullPool),
+        autoflush=False,
+        expire_on_commit=False,
+        info={READ_REPLICA_INFO_KEY: True},
+    )
+    app.dependency_overrides.pop(get_async_read_db)
+    recent_writes.clear()
+
+    with (
+        patch("app.db.session.AsyncReplicaSessionLocal", async_replica_factory),
+        patch("app.db.session.AsyncSessionLocal", async_session_factory),
+    ):
+        yield sessionmaker(bind=replica_engine)
+
+    recent_writes.clear()
+    replica_engine.dispose()
+
+
+def _replicate(
+    replica_sessionmaker: sessionmaker[Session], *records: User | Digest, **values
+) -> None:
+    """
+    Copy records into the replica, overriding digest columns with ``values``.
+
+    Digests bring their protein sequence along.
+    """
+    with replica_sessionmaker() as replica_session:
+        for record in records:
+            if isinstance(record, Digest):
+                ProteinSequence.insert_if_missing(
+                    replica_session.connection(),
+                    record.sequence_hash,
+                    record.sequence,
+                )
+            columns = {
+                column.key: getattr(record, column.key)
+                for column in record.__table__.columns
+            }
+            if isinstance(record, Digest):
+                columns.update(values)
+            replica_session.add(type(record)(**columns))
+            replica_session.flush()
+        replica_session.commit()
+
+
+@pytest.mark.integration
+def test_digest_list_reads_from_replica(
+    client: TestClient,
+    replica_sessionmaker: sessionmaker[Session],
+) -> None:
+    """The digest list is served by the replica, lag included."""
+    # setup
+    user = UserFactory.create()
+    DigestFactory.create(user=user)
+
+    # execute
+    response = client.get(f"/api/v1/digest/list/{user.id}")
+
+    # validate
+    assert response.status_code == 200
+    assert response.json()["digests"] == []
+
+
+@pytest.mark.integration
+def test_digest_list_reads_primary_after_user_write(
+    client: TestClient,
+    replica_sessionmaker: sessionmaker[Session],
+) -> None:
+    """A user that just wrote reads their own writes from the primary."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(user=user)
+    recent_writes.mark(user.id)
+
+    # execute
+    response = client.get(f"/api/v1/digest/list/{user.id}")
+
+    # validate
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()["digests"]] == [digest.id]
+
+
+@pytest.mark.integration
+def test_digest_list_reads_primary_after_write_in_another_process(
+    client: TestClient,
+    db_session: Session,
+    replica_sessionmaker: sessionmaker[Session],
+) -> None:
+    """The last-write cookie routes reads to the primary in every process."""
+    # setup
+    created = client.post(
+        "/api/v1/users", json={"username": "writer", "email": "writer@example.com"}
+    )
+    user_id = created.json()["id"]
+    digest = DigestFactory.create(user=db_session.get(User, user_id))
+    # a different worker would not have seen the write
+    recent_writes.clear()
+
+    # execute
+    response = client.get(f"/api/v1/digest/list/{user_id}")
+
+    # validate
+    assert created.cookies[LAST_WRITE_COOKIE]
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()["digests"]] == [digest.id]
+
+
+@pytest.mark.integration
+def test_get_digest_reads_completed_digest_from_replica(
+    client: TestClient,
+    replica_sessionmaker: sessionmaker[Session],
+) -> None:
+    """A digest the replica already has as COMPLETED is served by the replica."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(
+        user=user, status=DigestStatusEnum.COMPLETED, protein_name="Primary"
+    )
+    _replicate(replica_sessionmaker, user, digest, protein_name="Replica")
+
+    # execute
+    response = client.get(f"/api/v1/digest/{user.id}/{digest.id}")
+
+    # validate
+    assert response.status_code == 200
+    assert response.json()["protein_name"] == "Replica"
+
+
+@pytest.mark.integration
+def test_get_digest_missing_on_replica_reads_primary(
+    client: TestClient,
+    replica_sessionmaker: sessionmaker[Session],
+) -> None:
+    """A digest the replica has not received yet is read from the primary."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(user=user, status=DigestStatusEnum.COMPLETED)
+
+    # execute
+    response = client.get(f"/api/v1/digest/{user.id}/{digest.id}")
+
+    # validate
+    assert response.status_code == 200
+    assert response.json()["id"] == digest.id
+
+
+@pytest.mark.integration
+def test_get_digest_not_found_on_either_database(
+    client: TestClient,
+    replica_sessionmaker: sessionmaker[Session],
+) -> None:
+    """A digest missing from the replica and the primary is a 404."""
+    # setup
+    user = UserFactory.create()
+
+    # execute
+    response = client.get(f"/api/v1/digest/{user.id}/missing-digest-id")
+
+    # validate
+    assert response.status_code == 404
+
+
+@pytest.mark.integration
+def test_peptides_for_just_completed_digest_read_primary(
+    client: TestClient,
+    db_session: Session,
+    replica_sessionmaker: sessionmaker[Session],
+    setup_digest_with_peptides: tuple[str, str],
+) -> None:
+    """
+    Peptides of a digest the replica still shows PROCESSING come from the primary.
+    """
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+    user = db_session.get(User, user_id)
+    digest = db_session.get(Digest, digest_id)
+    assert user is not None and digest is not None
+    _replicate(replica_sessionmaker, user, digest, status=DigestStatusEnum.PROCESSING)
+    # a different worker would not have seen the job's write
+    recent_writes.clear()
+
+    # execute
+    response = client.get(f"/api/v1/digest/{user_id}/{digest_id}/peptides")
+
+    # validate
+    assert response.status_code == 200
+    data = response.json()
+    assert data["digest_id"] == digest_id
+    assert len(data["peptides"]) > 0
@@ -0,0 +1,225 @@
+"""
+Integration tests for the batched retention purge.
+"""
+
+from collections.abc import Callable, Generator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.enums import DigestStatusEnum
+from app.helpers.digest_artifact import digest_artifact_path
+from app.models import Digest, Peptide, ProteinSequence
+from app.tasks import purge_expired_digests
+from tests.factories import DigestFactory, PeptideFactory, UserFactory
+
+
+@pytest.fixture(scope="function")
+def session_factory(db_session: Session) -> Generator[Callable[[], Session]]:
+    """Hand the test session to the purge without letting it close it."""
+    with patch.object(db_session, "close", lambda: None):
+        yield lambda: db_session
+
+
+def _days_ago(days: int) -> datetime:
+    return datetime.now(UTC) - timedelta(days=days)
+
+
+def _remaining_digest_ids(db_session: Session) -> set[str]:
+    return set(db_session.scalars(select(Digest.id)))
+
+
+@pytest.mark.integration
+def test_purge_by_age_deletes_old_digests_and_peptides(
+    db_session: Session, session_factory: Callable[[], Session]
+) -> None:
+    """Digests past the age limit go with their peptides; recent and running stay."""
+    # setup
+    user = UserFactory.create()
+    old = DigestFactory.create(
+        user=user, status=DigestStatusEnum.COMPLETED, created_at=_days_ago(200)
+    )
+    old_processing = DigestFactory.create(
+        user=user, status=DigestStatusEnum.PROCESSING, created_at=_days_ago(200)
+    )
+    recent = DigestFactory.create(
+        user=user, status=DigestStatusEnum.COMPLETED, created_at=_days_ago(1)
+    )
+    for rank in range(1, 4):
+        PeptideFactory.create(digest=old, rank=rank)
+    old_id, kept_ids = old.id, {old_processing.id, recent.id}
+
+    # execute
+    report = purge_expired_digests(
+        max_age_days=180,
+        max_digests_per_user=0,
+        pause_seconds=0,
+        session_factory=session_factory,
+        sleep=lambda _: None,
+    )
+
+    # validate
+    assert report.digests_deleted == 1
+    assert report.peptides_deleted == 3
+    assert report.sequences_deleted == 1
+    assert report.rows_deleted == 5
+    assert report.rows_per_second > 0
+    assert _remaining_digest_ids(db_session) == kept_ids
+    assert (
+        db_session.scalar(
+            select(func.count()).select_from(Peptide).where(Peptide.digest_id == old_id)
+        )
+        == 0
+    )
+
+
+@pytest.mark.integration
+def test_purge_by_per_user_cap_keeps_newest(
+    db_session: Session, session_factory: Callable[[], Session]
+) -> None:
+    """Each user keeps only their newest digests up to the cap."""
+    # setup
+    user = UserFactory.create()
+    other_user = UserFactory.create()
+    digests = [
+        DigestFactory.create(
+            user=user, status=DigestStatusEnum.COMPLETED, created_at=_days_ago(days)
+        )
+        for days in (3, 2, 1)
+    ]
+    other_digest = DigestFactory.create(
+        user=other_user, status=DigestStatusEnum.COMPLETED, created_at=_days_ago(30)
+    )
+    expected = {digests[-1].id, other_digest.id}
+
+    # execute
+    report = purge_expired_digests(
+        max_age_days=0,
+        max_digests_per_user=1,
+        pause_seconds=0,
+        session_factory=session_factory,
+        sleep=lambda _: None,
+    )
+
+    # validate
+    assert report.digests_deleted == 2
+    assert _remaining_digest_ids(db_session) == expected
+
+
+@pytest.mark.integration
+def test_purge_deletes_peptides_in_bounded_batches(
+    db_session: Session, session_factory: Callable[[], Session]
+) -> None:
+    """Peptides are deleted at most batch_size per transaction, pausing after each."""
+    # setup
+    digest = DigestFactory.create(
+        status=DigestStatusEnum.COMPLETED, created_at=_days_ago(400)
+    )
+    for rank in range(1, 26):
+        PeptideFactory.create(digest=digest, rank=rank)
+    sleep = MagicMock()
+
+    # execute
+    report = purge_expired_digests(
+        max_age_days=365,
+        max_digests_per_user=0,
+        batch_size=10,
+        pause_seconds=0.5,
+        session_factory=session_factory,
+        sleep=sleep,
+    )
+
+    # validate
+    assert report.peptides_deleted == 25
+    assert report.digests_deleted == 1
+    # three peptide batches (10, 10, 5), one digest batch and one sequence batch
+    assert report.batches == 5
+    assert sleep.call_count == 5
+    sleep.assert_called_with(0.5)
+
+
+@pytest.mark.unit
+def test_purge_requires_a_retention_rule(
+    session_factory: Callable[[], Session],
+) -> None:
+    """Without an age or per-user limit the purge refuses to run."""
+    # execute / validate
+    with pytest.raises(ValueError):
+        purge_expired_digests(
+            max_age_days=0,
+            max_digests_per_user=0,
+            session_factory=session_factory,
+        )
+
+
+@pytest.mark.integration
+def test_purge_keeps_protein_sequences_still_referenced(
+    db_session: Session, session_factory: Callable[[], Session]
+) -> None:
+    """A purged digest's sequence is only deleted once no digest references it."""
+    # setup
+    user = UserFactory.create()
+    shared, single = "MKTAYIAKQRQISFVKSHFSRQ", "MKWVTFISLLFLFSSAYS"
+    for sequence in (shared, single):
+        DigestFactory.create(
+            user=user,
+            sequence=sequence,
+            status=DigestStatusEnum.COMPLETED,
+            created_at=_days_ago(200),
+        )
+    DigestFactory.create(
+        user=user,
+        sequence=shared,
+        status=DigestStatusEnum.COMPLETED,
+        created_at=_days_ago(1),
+    )
+
+    # execute
+    report = purge_expired_digests(
+        max_age_days=180,
+        max_digests_per_user=0,
+        pause_seconds=0,
+        session_factory=session_factory,
+        sleep=lambda _: None,
+    )
+
+    # validate
+    assert report.digests_deleted == 2
+    assert report.sequences_deleted == 1
+    assert set(db_session.scalars(select(ProteinSequence.sequence))) == {shared}
+
+
+@pytest.mark.integration
+def test_purge_removes_cached_artifacts(
+    db_session: Session, session_factory: Callable[[], Session], tmp_path: Path
+) -> None:
+    """Purged digests lose their cached artifacts; kept digests keep theirs."""
+    # setup
+    user = UserFactory.create()
+    old = DigestFactory.create(
+        user=user, status=DigestStatusEnum.COMPLETED, created_at=_days_ago(200)
+    )
+    recent = DigestFactory.create(
+        user=user, status=DigestStatusEnum.COMPLETED, created_at=_days_ago(1)
+    )
+    with patch.object(settings, "DIGEST_ARTIFACT_DIR", str(tmp_path)):
+        for digest in (old, recent):
+            digest_artifact_path(digest.id).write_bytes(b"arrow")
+        recent_artifact = digest_artifact_path(recent.id)
+
+        # execute
+        purge_expired_digests(
+            max_age_days=180,
+            max_digests_per_user=0,
+            pause_seconds=0,
+            session_factory=session_factory,
+            sleep=lambda _: None,
+        )
+
+    # validate
+    assert list(tmp_path.iterdir()) == [recent_artifact]
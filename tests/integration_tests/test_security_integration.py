@@ -74,3 +74,71 @@ def test_health_endpoint_without_api_key_succeeds(secure_client: TestClient):
     data = response.json()
     assert data["status"] == "healthy"
     assert "service" in data
+
+
+@pytest.mark.integration
+def test_api_endpoint_with_valid_api_key_succeeds(secure_client: TestClient):
+    """
+    Test that API endpoints pass the guard when the API key matches.
+    """
+    # setup
+    user_request = UserCreateFactory.build()
+    user_request_dict = user_request.model_dump()
+
+    # execute
+    response = secure_client.post(
+        "/api/v1/users",
+        json=user_request_dict,
+        headers={"X-API-Key": "test-secret-api-key-12345"},
+    )
+
+    # validate
+    assert response.status_code == 201
+    assert response.json()["email"] == user_request.email
+
+
+@pytest.mark.integration
+def test_api_endpoint_without_nginx_header_fails(secure_client: TestClient):
+    """
+    Test that API endpoints reject direct access, even with a valid API key.
+    """
+    # setup
+    user_request = UserCreateFactory.build()
+    user_request_dict = user_request.model_dump()
+
+    # execute
+    response = secure_client.post(
+        "/api/v1/users",
+        json=user_request_dict,
+        headers={"X-Forwarded-By": "", "X-API-Key": "test-secret-api-key-12345"},
+    )
+
+    # validate
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Direct access not allowed. Use nginx proxy."}
+
+
+@pytest.mark.integration
+def test_health_endpoint_without_nginx_header_fails(secure_client: TestClient):
+    """
+    Test that health endpoint rejects direct access from a non-local client.
+    """
+    # execute
+    response = secure_client.get("/health", headers={"X-Forwarded-By": ""})
+
+    # validate
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Direct access not allowed. Use nginx proxy."}
+
+
+@pytest.mark.integration
+def test_metrics_endpoint_without_nginx_header_fails(secure_client: TestClient):
+    """
+    Test that pool metrics are not served to a direct, non-local client.
+    """
+    # execute
+    response = secure_client.get("/metrics", headers={"X-Forwarded-By": ""})
+
+    # validate
+    assert response.status_code == 403
+    assert response.json() == {"detail": "Direct access not allowed. Use nginx proxy."}
@@ -4,8 +4,10 @@ Tests for the users endpoint with database integration.
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 
+from app.models import Digest, Peptide
 from app.models.user import User
 from tests.factories import UserCreateFactory, UserFactory
 
@@ -73,6 +75,37 @@ def test_update_user(client: TestClient, db_session: Session):
     assert user.username != "foobar"
 
 
+@pytest.mark.unit
+def test_create_or_retrieve_user_is_one_statement(
+    client: TestClient, db_session: Session
+):
+    """Test that logging in an existing user costs a single upsert statement."""
+    # setup
+    user_request: UserCreateFactory = UserCreateFactory.build()
+    user_record: User = UserFactory.create(username="foobar", email=user_request.email)
+    user_id = user_record.id
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+
+    # execute
+    try:
+        response = client.post("/api/v1/users", json=user_request.model_dump())
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    # validate
+    assert response.status_code == 201
+    assert response.json()["id"] == user_id
+    assert response.json()["username"] == user_request.username
+    assert len(statements) == 1
+    assert "ON CONFLICT" in statements[0].upper()
+
+
 @pytest.mark.parametrize(
     "request_body",
     [
@@ -129,3 +162,29 @@ def test_delete_user_by_id_no_user_found(client: TestClient, db_session: Session
     user_retrieved = db_session.query(User).first()
     assert user_retrieved is not None
     assert user_retrieved.id == user.id
+
+
+@pytest.mark.integration
+def test_delete_user_cascades_to_digests_and_peptides(
+    client: TestClient,
+    db_session: Session,
+    setup_digest_with_peptides: tuple[str, str],
+):
+    """Test that deleting a user lets the database remove digests and peptides."""
+    # setup
+    user_id, digest_id = setup_digest_with_peptides
+
+    # execute
+    response = client.delete(f"/api/v1/users/id/{user_id}")
+
+    # validate
+    assert response.status_code == 204
+    assert db_session.scalar(select(func.count()).select_from(Digest)) == 0
+    assert (
+        db_session.scalar(
+            select(func.count())
+            .select_from(Peptide)
+            .where(Peptide.digest_id == digest_id)
+        )
+        == 0
+    )
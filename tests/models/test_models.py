@@ -2,12 +2,30 @@
 Unit tests for QueryMixin methods.
 """
 
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import patch
+from uuid import UUID
+
 import pytest
 from fastapi import HTTPException, status
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
 from app.enums import DigestStatusEnum, ProteaseEnum
-from app.models import Criteria, Digest, Peptide, PeptideCriteria, User
+from app.models import (
+    Criteria,
+    Digest,
+    Peptide,
+    PeptideCriteria,
+    ProteinSequence,
+    User,
+)
+from app.models.criteria_registry import (
+    get_criteria_registry,
+    invalidate_criteria_registry,
+)
 from tests.factories.models import (
     DigestFactory,
     PeptideFactory,
@@ -319,6 +337,150 @@ def test_find_one_by_or_raise_digest_not_found(db_session: Session):
     assert "00000000-0000-0000-0000-000000000000" in exc_info.value.detail
 
 
+@contextmanager
+def _recorded_statements(session: Session) -> Iterator[list[str]]:
+    """Record the SQL statements executed on the session's engine."""
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+
+@pytest.mark.unit
+def test_find_one_by_selects_with_limit_one(db_session: Session):
+    """Test that find_one_by() fetches a single row with LIMIT 1."""
+    # setup
+    user = UserFactory.create()
+    UserFactory.create()
+    email = user.email
+
+    # execute
+    with _recorded_statements(db_session) as statements:
+        found_user = User.find_one_by(db_session, email=email)
+
+    # validate
+    assert found_user is user
+    assert len(statements) == 1
+    assert "LIMIT" in statements[0].upper()
+
+
+@pytest.mark.unit
+def test_find_one_by_id_uses_identity_map(db_session: Session):
+    """Test that an id lookup of a loaded record issues no query."""
+    # setup
+    digest = DigestFactory.create()
+    digest_id, user_id = digest.id, digest.user_id
+
+    # execute
+    with _recorded_statements(db_session) as statements:
+        found_digest = Digest.find_one_by(db_session, id=digest_id, user_id=user_id)
+        wrong_owner = Digest.find_one_by(db_session, id=digest_id, user_id="other")
+
+    # validate
+    assert found_digest is digest
+    assert wrong_owner is None
+    assert statements == []
+
+
+@pytest.mark.unit
+def test_find_one_by_id_rejects_unknown_attribute(db_session: Session):
+    """Test that id lookups still validate the other field names."""
+    # setup
+    user = UserFactory.create()
+
+    # execute / validate
+    with pytest.raises(AttributeError):
+        User.find_one_by(db_session, id=user.id, nickname="x")
+
+
+@pytest.mark.unit
+def test_find_by_with_column_projection(db_session: Session):
+    """Test that find_by(columns=...) returns rows with only those fields."""
+    # setup
+    user = UserFactory.create()
+    digest = DigestFactory.create(user=user, status=DigestStatusEnum.COMPLETED)
+
+    # execute
+    rows = Digest.find_by(db_session, columns=["id", "status"], user_id=user.id)
+
+    # validate
+    assert len(rows) == 1
+    assert rows[0]._fields == ("id", "status")
+    assert (rows[0].id, rows[0].status) == (digest.id, DigestStatusEnum.COMPLETED)
+
+
+@pytest.mark.unit
+def test_exists_by(db_session: Session):
+    """Test exists_by() and exists_by_or_raise()."""
+    # setup
+    user = UserFactory.create()
+    email = user.email
+
+    # execute
+    with _recorded_statements(db_session) as statements:
+        exists = User.exists_by(db_session, email=email)
+    missing = User.exists_by(db_session, email="nobody@example.com")
+    with pytest.raises(HTTPException) as exc_info:
+        User.exists_by_or_raise(db_session, email="nobody@example.com")
+
+    # validate
+    assert exists is True
+    assert missing is False
+    assert "EXISTS" in statements[0].upper()
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.unit
+def test_upsert_user_by_email_creates_then_updates(db_session: Session):
+    """Test that upsert_by_email inserts once and then updates the same user."""
+    # execute
+    created = User.upsert_by_email(
+        db_session, username="firstname", email="upsert@example.com"
+    )
+    created_id = created.id
+    updated = User.upsert_by_email(
+        db_session, username="secondname", email="upsert@example.com"
+    )
+
+    # validate
+    assert updated.id == created_id
+    assert updated.username == "secondname"
+    assert User.find_by(db_session, columns=["id"], email="upsert@example.com") == [
+        (created_id,)
+    ]
+
+
+@pytest.mark.unit
+def test_upsert_user_by_email_without_dialect_upsert(db_session: Session):
+    """Test that other databases fall back to a lookup then insert or update."""
+    # setup
+    dialect = db_session.get_bind().dialect
+
+    # execute
+    with patch.object(dialect, "name", "postgresql"):
+        created = User.upsert_by_email(
+            db_session, username="firstname", email="generic@example.com"
+        )
+        created_id = created.id
+        updated = User.upsert_by_email(
+            db_session, username="secondname", email="generic@example.com"
+        )
+
+    # validate
+    assert updated.id == created_id
+    assert updated.username == "secondname"
+    assert User.find_by(db_session, columns=["id"], email="generic@example.com") == [
+        (created_id,)
+    ]
+
+
 @pytest.mark.unit
 def test_update_user_successfully(db_session: Session):
     """Test successfully updating a user record with User.update()."""
@@ -428,3 +590,189 @@ def test_delete_digest_successfully(db_session: Session):
     # validate
     found_after = db_session.query(Digest).filter(Digest.id == digest_id).first()
     assert found_after is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "ranks,mask",
+    [
+        ([], 0),
+        ([1], 0b1),
+        ([2, 5], 0b10010),
+        ([14, 1, 3], 0b10000000000101),
+    ],
+)
+def test_criteria_ranks_mask_round_trip(ranks: list[int], mask: int):
+    """Test encoding criteria ranks as a bitmask and decoding them back in order."""
+    # execute
+    result = Criteria.ranks_to_mask(ranks)
+
+    # validate
+    assert result == mask
+    assert Criteria.mask_to_ranks(result) == sorted(ranks)
+
+
+@pytest.mark.unit
+def test_criteria_registry_indexes_seeded_criteria(
+    db_session: Session, seeded_criteria: list[Criteria]
+):
+    """Test that the criteria registry mirrors the criteria table by id, code and rank."""
+    # execute
+    registry = get_criteria_registry()
+
+    # validate
+    assert [r.id for r in registry.records] == [c.id for c in seeded_criteria]
+    for criteria in seeded_criteria:
+        assert registry.by_id[criteria.id].code == criteria.code
+        assert registry.by_code[criteria.code].rank == criteria.rank
+        assert registry.by_rank[criteria.rank].id == criteria.id
+
+
+@pytest.mark.unit
+def test_criteria_registry_reload_changes_version(
+    db_session: Session, seeded_criteria: list[Criteria]
+):
+    """Test that a reload after a criteria change yields a new registry version."""
+    # setup
+    version = get_criteria_registry().version
+    Criteria.update(db_session, seeded_criteria[0], values={"goal": "Changed goal"})
+
+    # execute
+    cached = get_criteria_registry()
+    invalidate_criteria_registry()
+    reloaded = get_criteria_registry(db_session)
+
+    # validate
+    assert cached.version == version
+    assert reloaded.version != version
+    assert reloaded.by_id[seeded_criteria[0].id].goal == "Changed goal"
+
+
+@pytest.mark.unit
+async def test_async_query_helpers_round_trip(
+    db_session: Session, async_session_factory: async_sessionmaker[AsyncSession]
+):
+    """Test acreate, afind_by, afind_one_by_or_raise, aupdate and adelete."""
+    # setup
+    async with async_session_factory() as session:
+        # execute
+        user = await User.acreate(
+            session, username="asyncuser", email="async@example.com"
+        )
+        found = await User.afind_by(session, email="async@example.com")
+        one = await User.afind_one_by_or_raise(session, id=user.id)
+        updated = await User.aupdate(session, one, values={"username": "renamed"})
+        await User.adelete(session, updated)
+        missing = await User.afind_one_by(session, id=user.id)
+
+    # validate
+    assert [u.id for u in found] == [user.id]
+    assert one is user
+    assert updated.username == "renamed"
+    assert missing is None
+
+
+@pytest.mark.unit
+async def test_afind_one_by_or_raise_not_found(
+    async_session_factory: async_sessionmaker[AsyncSession],
+):
+    """Test that afind_one_by_or_raise raises 404 when no record matches."""
+    # execute
+    async with async_session_factory() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await User.afind_one_by_or_raise(session, id="missing-id")
+
+    # validate
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+    assert "missing-id" in exc_info.value.detail
+
+
+@pytest.mark.unit
+async def test_async_fast_paths(
+    db_session: Session, async_session_factory: async_sessionmaker[AsyncSession]
+):
+    """Test aexists_by, afind_by(columns=...) and afind_one_by by id and field."""
+    # setup
+    user = UserFactory.create()
+    db_session.flush()
+
+    async with async_session_factory() as session:
+        # execute
+        exists = await User.aexists_by(session, id=user.id)
+        rows = await User.afind_by(session, columns=["email"], id=user.id)
+        by_id = await User.afind_one_by(session, id=user.id)
+        by_email = await User.afind_one_by(session, email=user.email)
+        with pytest.raises(HTTPException) as exc_info:
+            await User.aexists_by_or_raise(session, id="missing-id")
+
+    # validate
+    assert exists is True
+    assert [row.email for row in rows] == [user.email]
+    assert by_id is not None and by_id is by_email
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.unit
+def test_peptide_ids_are_stored_as_binary_uuids(db_session: Session):
+    """Test peptide keys are 16 bytes in the database and UUID strings in Python."""
+    # setup
+    peptide = PeptideFactory.create()
+    peptide_criteria = PeptideCriteria.create(
+        db_session,
+        peptide_id=peptide.id,
+        criteria_id=get_criteria_registry(db_session).records[0].id,
+    )
+
+    # execute
+    raw_ids = db_session.execute(
+        text("SELECT id, peptide_id FROM peptide_criteria")
+    ).one()
+    raw_peptide_id = db_session.scalar(text("SELECT id FROM peptides"))
+    found = Peptide.find_one_by(db_session, id=peptide.id)
+
+    # validate
+    assert raw_peptide_id == UUID(peptide.id).bytes
+    assert raw_ids == (UUID(peptide_criteria.id).bytes, UUID(peptide.id).bytes)
+    assert found is peptide
+    assert [pc.id for pc in peptide.criteria] == [peptide_criteria.id]
+
+
+@pytest.mark.unit
+def test_digests_of_the_same_sequence_share_one_protein_sequence(
+    db_session: Session,
+):
+    """Test digests store their sequence once, keyed by its hash."""
+    # setup
+    user = UserFactory.create()
+    sequence = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQ"
+
+    # execute
+    first = DigestFactory.create(user=user, sequence=sequence)
+    second = DigestFactory.create(user=user, sequence=sequence)
+    other = DigestFactory.create(user=user, sequence="MKWVTFISLLFLFSSAYS")
+    db_session.expire_all()
+
+    # validate
+    stored = db_session.scalars(select(ProteinSequence)).all()
+    assert len(stored) == 2
+    assert first.sequence_hash == second.sequence_hash
+    assert first.sequence_hash == ProteinSequence.hash_sequence(sequence)
+    assert db_session.get(Digest, second.id).sequence == sequence
+    assert db_session.get(Digest, other.id).sequence == "MKWVTFISLLFLFSSAYS"
+
+
+@pytest.mark.unit
+def test_insert_protein_sequence_without_dialect_upsert(db_session: Session):
+    """Test that other databases store a sequence once via lookup and insert."""
+    # setup
+    connection = db_session.connection()
+    sequence = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQ"
+    sequence_hash = ProteinSequence.hash_sequence(sequence)
+
+    # execute
+    with patch.object(connection.dialect, "name", "postgresql"):
+        ProteinSequence.insert_if_missing(connection, sequence_hash, sequence)
+        ProteinSequence.insert_if_missing(connection, sequence_hash, sequence)
+
+    # validate
+    assert db_session.scalars(select(ProteinSequence.sequence)).all() == [sequence]
@@ -0,0 +1,111 @@
+"""
+Unit tests for connection pool configuration, warm-up and statistics.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    pool_options,
+    pool_statistics,
+    render_pool_metrics,
+    warm_up_engine,
+)
+
+
+@pytest.mark.unit
+def test_pool_options_sizes_server_databases() -> None:
+    """MySQL engines get an instrumented, sized queue pool from Settings."""
+    # execute
+    sync_options = pool_options("mysql+pymysql://user:pw@host/db")
+    async_options = pool_options("mysql+aiomysql://user:pw@host/db", use_async=True)
+
+    # validate
+    assert sync_options["poolclass"] is InstrumentedQueuePool
+    assert async_options["poolclass"] is InstrumentedAsyncAdaptedQueuePool
+    for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle"):
+        assert key in sync_options
+
+
+@pytest.mark.unit
+def test_pool_options_leaves_sqlite_pool_alone() -> None:
+    """SQLite engines keep their default pool and take no sizing options."""
+    # execute
+    options = pool_options("sqlite://")
+
+    # validate
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+
+
+@pytest.mark.unit
+def test_instrumented_pool_records_checkouts_and_timeouts(tmp_path: Path) -> None:
+    """Checkouts and checkout timeouts are counted; waiting returns to zero."""
+    # setup
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+
+    # execute
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        statistics = pool_statistics(engine.pool)
+
+    # validate
+    assert statistics is not None
+    assert statistics["checked_out"] == 1
+    assert statistics["checkouts"] == 1
+    assert statistics["timeouts"] == 1
+    assert statistics["waiting"] == 0
+    assert statistics["wait_seconds_max"] >= 0
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_warm_up_engine_populates_pool(tmp_path: Path) -> None:
+    """Warm-up opens connections that stay checked in to the pool."""
+    # setup
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=3,
+        max_overflow=0,
+    )
+
+    # execute
+    opened = warm_up_engine(engine, 5)
+
+    # validate
+    assert opened == 3
+    statistics = pool_statistics(engine.pool)
+    assert statistics is not None
+    assert statistics["checked_in"] == 3
+    assert statistics["checked_out"] == 0
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_render_pool_metrics_prometheus_format(tmp_path: Path) -> None:
+    """Each statistic is rendered as one labelled Prometheus sample."""
+    # setup
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool
+    )
+
+    # execute
+    text = render_pool_metrics({"sync": engine.pool})
+
+    # validate
+    assert 'db_pool_checked_out{pool="sync"} 0' in text.splitlines()
+    assert 'db_pool_waiting{pool="sync"} 0' in text.splitlines()
+    engine.dispose()
@@ -0,0 +1,191 @@
+"""
+Unit tests for read-replica routing and read-your-writes tracking.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from app.db.replica import (
+    LAST_WRITE_COOKIE,
+    READ_REPLICA_INFO_KEY,
+    RecentWrites,
+    is_read_replica,
+    mark_write,
+    wrote_recently,
+)
+from app.db.session import (
+    AsyncSessionLocal,
+    LazyAsyncSession,
+    async_read_sessionmaker,
+)
+
+
+@pytest.mark.unit
+def test_recent_writes_marks_user_within_window() -> None:
+    """A user is recent after a write and until the window elapses."""
+    # setup
+    recent = RecentWrites(window_seconds=60)
+
+    # execute
+    recent.mark("user-1")
+
+    # validate
+    assert recent.is_recent("user-1") is True
+    assert recent.is_recent("user-2") is False
+    assert recent.is_recent(None) is False
+
+
+@pytest.mark.unit
+def test_recent_writes_expire_after_window() -> None:
+    """Writes older than the window no longer pin reads to the primary."""
+    # setup
+    recent = RecentWrites(window_seconds=10)
+
+    with patch("app.db.replica.time.monotonic", side_effect=[100.0, 111.0, 111.0]):
+        # execute
+        recent.mark("user-1")
+        is_recent = recent.is_recent("user-1")
+        recent.mark("user-2")
+
+    # validate
+    assert is_recent is False
+    assert "user-1" not in recent._written_at
+
+
+@pytest.mark.unit
+def test_recent_writes_clear() -> None:
+    """clear forgets every recorded write."""
+    # setup
+    recent = RecentWrites(window_seconds=60)
+    recent.mark("user-1")
+
+    # execute
+    recent.clear()
+
+    # validate
+    assert recent.is_recent("user-1") is False
+
+
+@pytest.mark.unit
+def test_is_read_replica_reads_session_info() -> None:
+    """Only sessions flagged in Session.info count as replica sessions."""
+    # validate
+    assert is_read_replica(Session(info={READ_REPLICA_INFO_KEY: True})) is True
+    assert is_read_replica(Session()) is False
+
+
+@pytest.mark.unit
+def test_async_read_sessionmaker_routes_recent_writers_to_primary() -> None:
+    """Users that wrote recently read from the primary, others from the replica."""
+    # setup
+    replica_factory = MagicMock()
+    recent = RecentWrites(window_seconds=60)
+    recent.mark("writer")
+
+    with (
+        patch("app.db.session.AsyncReplicaSessionLocal", replica_factory),
+        patch("app.db.session.recent_writes", recent),
+    ):
+        # execute
+        writer_factory = async_read_sessionmaker("writer")
+        reader_factory = async_read_sessionmaker("reader")
+        anonymous_factory = async_read_sessionmaker(None)
+
+    # validate
+    assert writer_factory is AsyncSessionLocal
+    assert reader_factory is replica_factory
+    assert anonymous_factory is replica_factory
+
+
+@pytest.mark.unit
+def test_mark_write_sets_last_write_cookie() -> None:
+    """A write marks the user in this process and in a cookie for all others."""
+    # setup
+    recent = RecentWrites(window_seconds=10)
+    response = Response()
+
+    with (
+        patch("app.db.replica.recent_writes", recent),
+        patch("app.db.replica.time.time", return_value=1000.5),
+    ):
+        # execute
+        mark_write(response, "writer")
+
+    # validate
+    assert recent.is_recent("writer") is True
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith(f"{LAST_WRITE_COOKIE}=1000.500;")
+    assert "Max-Age=10" in cookie
+    assert "HttpOnly" in cookie
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "last_write_at,expected",
+    [
+        (None, False),
+        ("", False),
+        ("not-a-time", False),
+        ("995.0", True),
+        ("1004.0", True),
+        ("990.0", False),
+    ],
+)
+def test_wrote_recently_checks_cookie_within_window(
+    last_write_at: str | None, expected: bool
+) -> None:
+    """Only well-formed cookie times within the window count as recent."""
+    # setup
+    recent = RecentWrites(window_seconds=10)
+
+    with (
+        patch("app.db.replica.recent_writes", recent),
+        patch("app.db.replica.time.time", return_value=1000.0),
+    ):
+        # execute
+        result = wrote_recently(last_write_at)
+
+    # validate
+    assert result is expected
+
+
+@pytest.mark.unit
+def test_async_read_sessionmaker_routes_recent_cookie_to_primary() -> None:
+    """A client whose cookie shows a recent write reads from the primary."""
+    # setup
+    replica_factory = MagicMock()
+
+    with (
+        patch("app.db.session.AsyncReplicaSessionLocal", replica_factory),
+        patch("app.db.session.wrote_recently", side_effect=lambda v: v == "now"),
+    ):
+        # execute
+        recent_factory = async_read_sessionmaker("reader", "now")
+        stale_factory = async_read_sessionmaker("reader", "long ago")
+
+    # validate
+    assert recent_factory is AsyncSessionLocal
+    assert stale_factory is replica_factory
+
+
+@pytest.mark.unit
+async def test_lazy_async_session_opens_only_when_used() -> None:
+    """The primary session is created on first use and closed on exit."""
+    # setup
+    session = MagicMock(close=AsyncMock())
+    factory = MagicMock(return_value=session)
+
+    # execute
+    async with LazyAsyncSession(factory):
+        pass
+    async with LazyAsyncSession(factory) as primary:
+        first = primary.get()
+        second = primary.get()
+
+    # validate
+    assert first is second is session
+    factory.assert_called_once_with()
+    session.close.assert_awaited_once_with()
@@ -0,0 +1,107 @@
+"""
+Unit tests for digest artifact helpers.
+"""
+
+import asyncio
+from collections.abc import Generator
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pyarrow as pa
+import pytest
+
+from app.core import settings
+from app.helpers import digest_artifact
+from app.helpers.digest_artifact import (
+    ARTIFACT_FIELDS,
+    aensure_digest_artifact,
+    digest_artifact_path,
+    open_digest_artifact,
+    write_peptide_batch,
+)
+
+
+@pytest.fixture
+def artifact_dir(tmp_path: Path) -> Generator[Path]:
+    """Cache artifacts in a temporary directory."""
+    with patch.object(settings, "DIGEST_ARTIFACT_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+def _columns(count: int) -> dict[str, list]:
+    return {
+        "id": [f"p{i}" for i in range(count)],
+        "sequence": ["PEPTIDEK"] * count,
+        "position": list(range(count)),
+        "length": [8] * count,
+        "pi": [5.5] * count,
+        "charge_state": [1] * count,
+        "max_kd_score": [0.5] * count,
+        "rank": list(range(1, count + 1)),
+        "criteria_mask": [0] * count,
+    }
+
+
+@pytest.mark.unit
+def test_open_digest_artifact_writes_record_batches(artifact_dir: Path) -> None:
+    """Each batch is written as its own record batch of one IPC file."""
+    # setup
+    path = artifact_dir / "d.none.arrow"
+    schema = pa.schema(ARTIFACT_FIELDS, metadata={"digest_id": "d"})
+
+    # execute
+    with open_digest_artifact(path, schema) as writer:
+        write_peptide_batch(writer, schema, _columns(2))
+        write_peptide_batch(writer, schema, _columns(1))
+
+    # validate
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        table = reader.read_all()
+        assert reader.num_record_batches == 2
+    assert table.num_rows == 3
+    assert table.column("id").to_pylist() == ["p0", "p1", "p0"]
+    assert [p.name for p in artifact_dir.iterdir()] == [path.name]
+
+
+@pytest.mark.unit
+def test_open_digest_artifact_removes_partial_file(artifact_dir: Path) -> None:
+    """A failed build leaves neither the artifact nor its temporary file."""
+    # setup
+    path = artifact_dir / "d.none.arrow"
+    schema = pa.schema(ARTIFACT_FIELDS)
+
+    # execute
+    with pytest.raises(RuntimeError):
+        with open_digest_artifact(path, schema) as writer:
+            write_peptide_batch(writer, schema, _columns(1))
+            raise RuntimeError("cursor failed")
+
+    # validate
+    assert not any(artifact_dir.iterdir())
+
+
+@pytest.mark.unit
+async def test_aensure_digest_artifact_builds_once_for_concurrent_requests(
+    artifact_dir: Path,
+) -> None:
+    """Concurrent requests for one digest wait for a single build."""
+    # setup
+    digest = SimpleNamespace(id="d")
+    builds: list[str] = []
+
+    async def build(session, digest, path: Path) -> None:
+        builds.append(digest.id)
+        await asyncio.sleep(0.01)
+        path.write_bytes(b"artifact")
+
+    # execute
+    with patch.object(digest_artifact, "_abuild_digest_artifact", build):
+        paths = await asyncio.gather(
+            *(aensure_digest_artifact(None, digest) for _ in range(3))
+        )
+
+    # validate
+    assert builds == ["d"]
+    assert paths == [digest_artifact_path("d")] * 3
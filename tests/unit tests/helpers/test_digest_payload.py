@@ -0,0 +1,68 @@
+"""
+Unit tests for pre-rendered digest payload helpers.
+"""
+
+import gzip
+
+import pytest
+
+from app.helpers.digest_payload import digest_payload_response, request_accepts_gzip
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "accept_encoding,expected",
+    [
+        (None, False),
+        ("", False),
+        ("identity", False),
+        ("gzip", True),
+        ("br, gzip;q=0.5", True),
+        ("GZIP", True),
+        ("gzip;q=0", False),
+        ("*", True),
+        ("deflate, br", False),
+        ("*;q=1, gzip;q=0", False),
+        ("gzip;q=0, *", False),
+        ("*;q=0, gzip", True),
+        ("gzip;q=abc", False),
+    ],
+)
+def test_request_accepts_gzip(accept_encoding: str | None, expected: bool) -> None:
+    """Accept-Encoding lists, q-values and the wildcard are honoured."""
+    assert request_accepts_gzip(accept_encoding) is expected
+
+
+@pytest.mark.unit
+def test_digest_payload_response_passes_gzip_through() -> None:
+    """Clients accepting gzip receive the stored bytes unchanged."""
+    # setup
+    content = gzip.compress(b'{"digest_id":"d"}', mtime=0)
+
+    # execute
+    response = digest_payload_response(
+        content, "gzip, deflate", '"abc"', "private, immutable"
+    )
+
+    # validate
+    assert response.body == content
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert response.headers["Cache-Control"] == "private, immutable"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.media_type == "application/json"
+
+
+@pytest.mark.unit
+def test_digest_payload_response_decompresses_for_other_clients() -> None:
+    """Clients without gzip support receive the decompressed JSON."""
+    # setup
+    content = gzip.compress(b'{"digest_id":"d"}', mtime=0)
+
+    # execute
+    response = digest_payload_response(content, None, '"abc"', "private, immutable")
+
+    # validate
+    assert response.body == b'{"digest_id":"d"}'
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == '"abc"'
@@ -8,8 +8,14 @@ import pytest
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from app.helpers.digest_route import request_criteria_ids_valid_or_exception
+from app.core import settings
+from app.helpers.digest_route import (
+    request_accepts_ndjson,
+    request_criteria_ids_valid_or_exception,
+    request_user_within_digest_limit_or_exception,
+)
 from app.models import Criteria
+from tests.factories import DigestFactory, UserFactory
 
 
 @pytest.mark.unit
@@ -53,3 +59,67 @@ def test_request_criteria_ids_valid_or_exception_invalid_id_raises(
     assert exc_info.value.status_code == 400
     assert "Invalid criteria_id" in exc_info.value.detail
     assert invalid_id in exc_info.value.detail
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        (None, False),
+        ("*/*", False),
+        ("application/json", False),
+        ("application/x-ndjson", True),
+        ("application/json;q=0.5, application/x-ndjson", True),
+        ("Application/X-NDJSON; charset=utf-8", True),
+    ],
+)
+def test_request_accepts_ndjson(accept: str | None, expected: bool) -> None:
+    """NDJSON is only selected when explicitly listed in the Accept header."""
+    assert request_accepts_ndjson(accept) is expected
+
+
+@pytest.mark.unit
+def test_request_user_within_digest_limit_or_exception_under_limit(
+    db_session: Session,
+) -> None:
+    """When the user exists and is under the digest limit, the function does not raise."""
+    # setup
+    user = UserFactory.create()
+
+    # execute and validate
+    with nullcontext():
+        request_user_within_digest_limit_or_exception(user.id, db_session)
+
+
+@pytest.mark.unit
+def test_request_user_within_digest_limit_or_exception_missing_user(
+    db_session: Session,
+) -> None:
+    """When the user does not exist, the function raises HTTPException 404."""
+    # setup
+    user_id = "00000000-0000-0000-0000-000000000000"
+
+    # execute
+    with pytest.raises(HTTPException) as exc_info:
+        request_user_within_digest_limit_or_exception(user_id, db_session)
+
+    # validate
+    assert exc_info.value.status_code == 404
+    assert user_id in exc_info.value.detail
+
+
+@pytest.mark.unit
+def test_request_user_within_digest_limit_or_exception_at_limit(
+    db_session: Session,
+) -> None:
+    """When the user already has DIGEST_JOB_LIMIT digests, the function raises 400."""
+    # setup
+    user = UserFactory.create()
+    DigestFactory.create_batch(settings.DIGEST_JOB_LIMIT, user=user)
+
+    # execute
+    with pytest.raises(HTTPException) as exc_info:
+        request_user_within_digest_limit_or_exception(user.id, db_session)
+
+    # validate
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,36 @@
+"""
+Unit tests for ETag helpers.
+"""
+
+import pytest
+
+from app.helpers.http_cache import build_etag, etag_matches
+
+
+@pytest.mark.unit
+def test_build_etag_is_stable_and_quoted() -> None:
+    """The same parts always produce the same strong ETag."""
+    # execute
+    etag = build_etag("digest", "id-1", "completed")
+
+    # validate
+    assert etag == build_etag("digest", "id-1", "completed")
+    assert etag != build_etag("digest", "id-1", "processing")
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "if_none_match,expected",
+    [
+        (None, False),
+        ('"other"', False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matches(if_none_match: str | None, expected: bool) -> None:
+    """If-None-Match uses weak comparison and accepts lists and the wildcard."""
+    assert etag_matches(if_none_match, '"abc"') is expected
@@ -0,0 +1,287 @@
+"""
+Unit tests for the response compression middleware.
+"""
+
+import gzip
+import json
+import zlib
+from collections.abc import AsyncIterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.middleware import compression
+from app.middleware.compression import (
+    CompressedBodyCache,
+    CompressionMiddleware,
+    select_encoding,
+)
+
+BODY = json.dumps([{"sequence": "PEPTIDEK", "rank": i} for i in range(200)]).encode()
+
+
+def _app(tmp_path: Path, cache_bytes: int = 0) -> Starlette:
+    """Build a small app behind the middleware."""
+    artifact = tmp_path / "artifact.bin"
+    artifact.write_bytes(BODY)
+
+    async def large(request):
+        return Response(BODY, media_type="application/json")
+
+    async def small(request):
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    async def immutable(request):
+        return Response(
+            BODY,
+            media_type="application/json",
+            headers={"ETag": '"v1"', "Cache-Control": "private, immutable"},
+        )
+
+    async def not_modified(request):
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    async def encoded(request):
+        return Response(
+            gzip.compress(BODY),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    async def stream(request):
+        async def chunks() -> AsyncIterator[bytes]:
+            for i in range(0, len(BODY), 1000):
+                yield BODY[i : i + 1000]
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    async def file(request):
+        return FileResponse(artifact)
+
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/immutable", immutable),
+            Route("/not-modified", not_modified),
+            Route("/encoded", encoded),
+            Route("/stream", stream),
+            Route("/file", file),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=500, cache_bytes=cache_bytes)
+    return app
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "accept_encoding,expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("GZIP, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("*, gzip;q=0", None),
+        ("br", None),
+    ],
+)
+def test_select_encoding(accept_encoding: str | None, expected: str | None) -> None:
+    """Only available codings are chosen, honouring q-values and the wildcard."""
+    with patch.dict(
+        compression.ENCODERS, {"gzip": compression._GzipEncoder}, clear=True
+    ):
+        assert select_encoding(accept_encoding) == expected
+
+
+@pytest.mark.unit
+def test_select_encoding_prefers_highest_weight_then_server_order() -> None:
+    """Ties go to the server's order; a higher q-value wins otherwise."""
+    # setup
+    encoders = {"zstd": object, "br": object, "gzip": compression._GzipEncoder}
+
+    # execute / validate
+    with patch.dict(compression.ENCODERS, encoders, clear=True):
+        assert select_encoding("gzip, br, zstd") == "zstd"
+        assert select_encoding("gzip, br;q=0.9") == "gzip"
+        assert select_encoding("br, gzip") == "br"
+
+
+@pytest.mark.unit
+def test_compresses_large_body(tmp_path: Path) -> None:
+    """Bodies over the threshold are gzipped, with Vary and Content-Length set."""
+    # setup
+    client = TestClient(_app(tmp_path))
+
+    # execute
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    raw = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    # validate
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.content == BODY
+    assert "content-encoding" not in raw.headers
+    assert raw.content == BODY
+
+
+@pytest.mark.unit
+def test_leaves_small_encoded_and_ranged_bodies(tmp_path: Path) -> None:
+    """Small bodies, already encoded bodies and file responses pass through."""
+    # setup
+    client = TestClient(_app(tmp_path))
+    headers = {"Accept-Encoding": "gzip"}
+
+    # execute
+    small = client.get("/small", headers=headers)
+    encoded = client.get("/encoded", headers=headers)
+    file = client.get("/file", headers=headers)
+    ranged = client.get("/file", headers={**headers, "Range": "bytes=0-9"})
+
+    # validate
+    assert "content-encoding" not in small.headers
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.content == BODY
+    assert "content-encoding" not in file.headers
+    assert file.content == BODY
+    assert ranged.status_code == 206
+    assert ranged.content == BODY[:10]
+
+
+@pytest.mark.unit
+def test_compresses_streamed_body(tmp_path: Path) -> None:
+    """Streamed bodies are compressed chunk by chunk, without a Content-Length."""
+    # setup
+    client = TestClient(_app(tmp_path))
+
+    # execute
+    with client.stream(
+        "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    # validate
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert zlib.decompress(raw, 31) == BODY
+
+
+@pytest.mark.unit
+def test_reuses_cached_body_for_immutable_responses(tmp_path: Path) -> None:
+    """An immutable response is compressed once per ETag and coding."""
+    # setup
+    client = TestClient(_app(tmp_path, cache_bytes=1024 * 1024))
+    headers = {"Accept-Encoding": "gzip"}
+
+    # execute
+    with (
+        patch.object(
+            compression, "_GzipEncoder", wraps=compression._GzipEncoder
+        ) as encoder,
+        patch.dict(compression.ENCODERS, {"gzip": encoder}, clear=True),
+    ):
+        first = client.get("/immutable", headers=headers)
+        second = client.get("/immutable", headers=headers)
+        client.get("/large", headers=headers)
+        client.get("/large", headers=headers)
+
+    # validate
+    assert first.content == second.content == BODY
+    assert second.headers["content-encoding"] == "gzip"
+    assert encoder.call_count == 3
+
+
+@pytest.mark.unit
+def test_compressed_body_cache_evicts_least_recently_used() -> None:
+    """The cache stays within its byte budget, evicting the oldest entries."""
+    # setup
+    cache = CompressedBodyCache(max_bytes=10)
+
+    # execute
+    cache.put(("a", "gzip"), b"1234")
+    cache.put(("b", "gzip"), b"1234")
+    cache.get(("a", "gzip"))
+    cache.put(("c", "gzip"), b"1234")
+    cache.put(("big", "gzip"), b"x" * 11)
+
+    # validate
+    assert cache.get(("a", "gzip")) == b"1234"
+    assert cache.get(("b", "gzip")) is None
+    assert cache.get(("c", "gzip")) == b"1234"
+    assert cache.get(("big", "gzip")) is None
+    assert cache.size == 8
+
+
+@pytest.mark.unit
+def test_encoded_responses_carry_weak_etags(tmp_path: Path) -> None:
+    """An encoded body gets a weak ETag; identity and byte-range responses keep
+    the strong one."""
+    # setup
+    client = TestClient(_app(tmp_path, cache_bytes=1024 * 1024))
+    gzip_headers = {"Accept-Encoding": "gzip"}
+
+    # execute
+    encoded = client.get("/immutable", headers=gzip_headers)
+    cached = client.get("/immutable", headers=gzip_headers)
+    identity = client.get("/immutable", headers={"Accept-Encoding": "identity"})
+    file = client.get("/file", headers=gzip_headers)
+
+    # validate
+    assert encoded.headers["etag"] == cached.headers["etag"] == 'W/"v1"'
+    assert identity.headers["etag"] == '"v1"'
+    assert not file.headers["etag"].startswith("W/")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "if_none_match,expected",
+    [
+        ('W/"v1"', 'W/"v1"'),
+        ('"v0", W/"v1"', 'W/"v1"'),
+        ('"v1"', '"v1"'),
+        ("*", '"v1"'),
+    ],
+)
+def test_not_modified_keeps_the_revalidated_etag_form(
+    tmp_path: Path, if_none_match: str, expected: str
+) -> None:
+    """A 304 is only weakened when the client stored the encoded, weak-tagged 200."""
+    # setup
+    client = TestClient(_app(tmp_path))
+
+    # execute
+    response = client.get(
+        "/not-modified",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match},
+    )
+
+    # validate
+    assert response.status_code == 304
+    assert response.headers["etag"] == expected
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.unit
+def test_unencoded_responses_vary_when_they_could_be_encoded(tmp_path: Path) -> None:
+    """Encodable bodies sent as they are still vary on Accept-Encoding."""
+    # setup
+    client = TestClient(_app(tmp_path))
+
+    # execute
+    refused = client.get("/large", headers={"Accept-Encoding": "identity"})
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip;q=0"})
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    # validate
+    assert "content-encoding" not in refused.headers
+    assert refused.headers["vary"] == "Accept-Encoding"
+    assert streamed.headers["vary"] == "Accept-Encoding"
+    assert "vary" not in small.headers
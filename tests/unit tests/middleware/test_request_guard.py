@@ -0,0 +1,306 @@
+"""
+Unit tests for the request guard middleware.
+"""
+
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.routing import Route
+
+from app.core import settings
+from app.middleware import request_guard
+from app.middleware.request_guard import RequestGuardMiddleware
+
+API_KEY = "unit-test-api-key"
+NGINX = {"X-Forwarded-By": "nginx"}
+
+
+def _app(calls: list[str], api_prefix: str | None = None) -> Starlette:
+    """Build a small app behind the guard that records the paths it serves."""
+
+    async def endpoint(request):
+        calls.append(request.url.path)
+        return StarletteJSONResponse({"ok": True})
+
+    app = Starlette(
+        routes=[
+            Route("/health", endpoint),
+            Route("/api/v1/items", endpoint),
+            Route("/metrics", endpoint),
+            Route("/docs", endpoint),
+            Route("/v2/items", endpoint),
+            Route("/v20/items", endpoint),
+        ]
+    )
+    app.add_middleware(RequestGuardMiddleware, api_prefix=api_prefix)
+    return app
+
+
+@pytest.fixture
+def api_key():
+    """Require API_KEY on API paths for the duration of a test."""
+    with patch.object(settings, "API_KEY", API_KEY):
+        yield API_KEY
+
+
+@pytest.mark.unit
+def test_api_path_requires_nginx_header(api_key: str) -> None:
+    """/api requests without X-Forwarded-By: nginx never reach the app."""
+    # setup
+    calls: list[str] = []
+    client = TestClient(_app(calls))
+
+    # execute
+    missing = client.get("/api/v1/items", headers={"X-API-Key": api_key})
+    spoofed = client.get(
+        "/api/v1/items", headers={"X-Forwarded-By": "other", "X-API-Key": api_key}
+    )
+
+    # validate
+    for response in (missing, spoofed):
+        assert response.status_code == 403
+        assert response.json() == {"detail": request_guard.DIRECT_ACCESS_DETAIL}
+    assert calls == []
+
+
+@pytest.mark.unit
+def test_api_path_requires_matching_api_key(api_key: str) -> None:
+    """A missing or wrong X-API-Key is rejected; the right one passes."""
+    # setup
+    calls: list[str] = []
+    client = TestClient(_app(calls))
+
+    # execute
+    missing = client.get("/api/v1/items", headers=NGINX)
+    wrong = client.get("/api/v1/items", headers={**NGINX, "X-API-Key": "wrong"})
+    valid = client.get("/api/v1/items", headers={**NGINX, "X-API-Key": api_key})
+
+    # validate
+    assert missing.status_code == 403
+    assert missing.json() == {"detail": request_guard.MISSING_API_KEY_DETAIL}
+    assert wrong.status_code == 403
+    assert wrong.json() == {"detail": request_guard.INVALID_API_KEY_DETAIL}
+    assert valid.status_code == 200
+    assert calls == ["/api/v1/items"]
+
+
+@pytest.mark.unit
+def test_api_prefix_follows_configured_prefix(api_key: str) -> None:
+    """Routers mounted outside /api are still guarded when given as the prefix."""
+    # setup
+    calls: list[str] = []
+    client = TestClient(_app(calls, api_prefix="/v2"))
+
+    # execute
+    direct = client.get("/v2/items", headers={"X-API-Key": api_key})
+    missing_key = client.get("/v2/items", headers=NGINX)
+    valid = client.get("/v2/items", headers={**NGINX, "X-API-Key": api_key})
+
+    # validate
+    assert direct.json() == {"detail": request_guard.DIRECT_ACCESS_DETAIL}
+    assert missing_key.json() == {"detail": request_guard.MISSING_API_KEY_DETAIL}
+    assert valid.status_code == 200
+    assert calls == ["/v2/items"]
+
+
+@pytest.mark.unit
+def test_api_prefix_matches_whole_path_segments(api_key: str) -> None:
+    """The prefix guards itself and paths below it, not paths that extend it."""
+    # setup
+    calls: list[str] = []
+    client = TestClient(_app(calls, api_prefix="/v2"))
+
+    # execute
+    below = client.get("/v2/items")
+    sibling = client.get("/v20/items")
+
+    # validate
+    assert below.status_code == 403
+    assert sibling.status_code == 200
+    assert calls == ["/v20/items"]
+
+
+@pytest.mark.unit
+def test_api_prefix_defaults_to_api_v1_prefix() -> None:
+    """Without an explicit prefix the guard protects settings.API_V1_PREFIX."""
+    # setup
+    with patch.object(settings, "API_V1_PREFIX", "/v2"):
+        guard = RequestGuardMiddleware(_app([]))
+
+    # validate
+    assert guard.api_prefix == "/v2"
+
+
+@pytest.mark.unit
+def test_api_key_is_compared_in_constant_time(api_key: str) -> None:
+    """The key check goes through hmac.compare_digest."""
+    # setup
+    client = TestClient(_app([]))
+
+    # execute
+    with patch.object(
+        request_guard.hmac, "compare_digest", wraps=request_guard.hmac.compare_digest
+    ) as compare_digest:
+        response = client.get("/api/v1/items", headers={**NGINX, "X-API-Key": "x"})
+
+    # validate
+    assert response.status_code == 403
+    compare_digest.assert_called_once_with(b"x", api_key.encode())
+
+
+@pytest.mark.unit
+def test_api_key_check_skipped_when_unset() -> None:
+    """With no API_KEY configured, the nginx header alone is enough."""
+    # setup
+    client = TestClient(_app([]))
+
+    # execute
+    with patch.object(settings, "API_KEY", ""):
+        response = client.get("/api/v1/items", headers=NGINX)
+
+    # validate
+    assert response.status_code == 200
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", ["/health", "/metrics"])
+def test_local_paths_allow_nginx_or_localhost(api_key: str, path: str) -> None:
+    """/health and /metrics need no API key, only nginx or a localhost client."""
+    # setup
+    remote = TestClient(_app([]))
+    local = TestClient(_app([]), client=("127.0.0.1", 50000))
+
+    # execute
+    direct = remote.get(path)
+    proxied = remote.get(path, headers=NGINX)
+    probe = local.get(path)
+
+    # validate
+    assert direct.status_code == 403
+    assert direct.json() == {"detail": request_guard.DIRECT_ACCESS_DETAIL}
+    assert proxied.status_code == 200
+    assert probe.status_code == 200
+
+
+@pytest.mark.unit
+def test_other_paths_pass_through(api_key: str) -> None:
+    """Paths outside the API prefix, /health and /metrics are not guarded."""
+    # setup
+    client = TestClient(_app([]))
+
+    # execute
+    response = client.get("/docs")
+
+    # validate
+    assert response.status_code == 200
+
+
+class _LegacyNginxValidator(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware nginx check the guard replaced, for the benchmark."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path.startswith("/api"):
+            if request.headers.get("X-Forwarded-By") != "nginx":
+                return JSONResponse(status_code=403, content={"detail": "Direct"})
+        return await call_next(request)
+
+
+async def _legacy_verify_api_key(
+    x_api_key: str | None = Header(None, alias="X-API-Key")
+) -> str:
+    """The per-route API key dependency the guard replaced, for the benchmark."""
+    if x_api_key != settings.API_KEY:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+    return x_api_key
+
+
+def _benchmark_app(variant: str) -> FastAPI:
+    """Build a one-route app: unguarded, legacy-guarded or guard-protected."""
+    app = FastAPI()
+    dependencies = [Depends(_legacy_verify_api_key)] if variant == "legacy" else []
+
+    @app.get("/api/v1/items", dependencies=dependencies)
+    async def items() -> dict[str, bool]:
+        return {"ok": True}
+
+    if variant == "legacy":
+        app.add_middleware(_LegacyNginxValidator)
+    elif variant == "guard":
+        app.add_middleware(RequestGuardMiddleware)
+    return app
+
+
+async def _time_requests(app: FastAPI, requests: int) -> float:
+    """Drive the app over raw ASGI and return the mean seconds per request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/items",
+        "raw_path": b"/api/v1/items",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"x-forwarded-by", b"nginx"), (b"x-api-key", API_KEY.encode())],
+        "client": ("10.0.0.2", 50000),
+        "server": ("backend", 8000),
+    }
+    statuses: list[int] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await app(dict(scope), receive, send)  # build the middleware stack
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - start
+    assert set(statuses) == {200}
+    return elapsed / requests
+
+
+@pytest.mark.slow
+@pytest.mark.unit
+@pytest.mark.skipif(
+    not os.environ.get("RUN_BENCHMARKS"),
+    reason="wall-clock benchmark; set RUN_BENCHMARKS=1 to run it",
+)
+def test_guard_overhead_is_below_legacy_middleware_and_dependency(
+    api_key: str,
+) -> None:
+    """
+    Benchmark: the per-request cost of the guard, over an unguarded app, is below
+    that of the BaseHTTPMiddleware nginx check plus the per-route key dependency.
+    """
+    # setup
+    requests = 3000
+    apps = {v: _benchmark_app(v) for v in ("bare", "legacy", "guard")}
+
+    # execute
+    timings = {
+        v: min(asyncio.run(_time_requests(app, requests)) for _ in range(3))
+        for v, app in apps.items()
+    }
+
+    # validate
+    legacy_overhead = timings["legacy"] - timings["bare"]
+    guard_overhead = timings["guard"] - timings["bare"]
+    assert guard_overhead < legacy_overhead, (
+        f"per-request: bare={timings['bare'] * 1e6:.1f} us, "
+        f"legacy overhead={legacy_overhead * 1e6:.1f} us, "
+        f"guard overhead={guard_overhead * 1e6:.1f} us"
+    )
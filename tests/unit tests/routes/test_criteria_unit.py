@@ -2,30 +2,35 @@
 Unit tests for the list criteria endpoint.
 """
 
-from unittest.mock import ANY, MagicMock, patch
+from unittest.mock import ANY, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 from app.enums import CriteriaEnum
+from app.models.criteria_registry import CriteriaRecord, CriteriaRegistry
 
 
 @pytest.mark.unit
 def test_list_criteria_success(client: TestClient) -> None:
-    """Test successfully getting all criteria with get_all_ordered_by_rank patched."""
+    """Test successfully getting all criteria with the criteria registry patched."""
     # setup
-    mock_criterion = MagicMock()
-    mock_criterion.id = "test-criteria-id-1"
-    mock_criterion.code = CriteriaEnum.NOT_UNIQUE
-    mock_criterion.goal = "Filter duplicate sequences"
-    mock_criterion.rationale = "Rationale text"
-    mock_criterion.rank = 1
-    mock_criterion.is_optional = False
-    criteria_records = [mock_criterion]
+    registry = CriteriaRegistry.from_records(
+        [
+            CriteriaRecord(
+                id="test-criteria-id-1",
+                code=CriteriaEnum.NOT_UNIQUE,
+                goal="Filter duplicate sequences",
+                rationale="Rationale text",
+                rank=1,
+                is_optional=False,
+            )
+        ]
+    )
 
     with patch(
-        "app.api.routes.criteria.Criteria.get_all_ordered_by_rank",
-        return_value=criteria_records,
+        "app.api.routes.criteria.aget_criteria_registry",
+        return_value=registry,
     ) as mock_get_criteria:
         # execute
         response = client.get("/api/v1/criteria")
@@ -19,12 +19,9 @@ def test_delete_digest_by_id_success(client: TestClient) -> None:
     user = UserFactory.build()
     digest = DigestFactory.create(user=user)
 
-    with (
-        patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
-        ) as mock_find_digest,
-        patch("app.api.routes.digest.Digest.delete") as mock_delete,
-    ):
+    with patch(
+        "app.api.routes.digest.Digest.delete_by_or_raise", return_value=1
+    ) as mock_delete:
         # execute
         response = client.delete(f"/api/v1/digest/delete/{user.id}/{digest.id}")
 
@@ -32,12 +29,11 @@ def test_delete_digest_by_id_success(client: TestClient) -> None:
     assert response.status_code == 204
     assert response.content == b""
 
-    mock_find_digest.assert_called_once_with(
+    mock_delete.assert_called_once_with(
         ANY,
         user_id=user.id,
         id=digest.id,
     )
-    mock_delete.assert_called_once_with(ANY, digest)
 
 
 @pytest.mark.unit
@@ -47,12 +43,13 @@ def test_delete_digest_by_id_user_not_found(client: TestClient) -> None:
     nonexistent_user_id = "fc502bbe-5a1b-4f99-b716-e1970db2aef7"
     digest_id = "some-digest-id"
 
-    with (
-        patch("app.api.routes.digest.Digest.find_one_by_or_raise") as mock_find_digest,
-    ):
-        mock_find_digest.side_effect = HTTPException(
+    with patch("app.api.routes.digest.Digest.delete_by_or_raise") as mock_delete:
+        mock_delete.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No User records found with id='{nonexistent_user_id}'.",
+            detail=(
+                f"No Digest records found with user_id='{nonexistent_user_id}', "
+                f"id='{digest_id}'."
+            ),
         )
 
         # execute
@@ -64,12 +61,9 @@ def test_delete_digest_by_id_user_not_found(client: TestClient) -> None:
     assert response.status_code == 404
     response_data = response.json()
     assert "detail" in response_data
-    assert "User" in response_data["detail"]
     assert nonexistent_user_id in response_data["detail"]
 
-    mock_find_digest.assert_called_once_with(
-        ANY, user_id=nonexistent_user_id, id=digest_id
-    )
+    mock_delete.assert_called_once_with(ANY, user_id=nonexistent_user_id, id=digest_id)
 
 
 @pytest.mark.unit
@@ -79,10 +73,8 @@ def test_delete_digest_by_id_digest_not_found(client: TestClient) -> None:
     user = UserFactory.build()
     nonexistent_digest_id = "fc502bbe-5a1b-4f99-b716-e1970db2aef7"
 
-    with (
-        patch("app.api.routes.digest.Digest.find_one_by_or_raise") as mock_find_digest,
-    ):
-        mock_find_digest.side_effect = HTTPException(
+    with patch("app.api.routes.digest.Digest.delete_by_or_raise") as mock_delete:
+        mock_delete.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No Digest records found with user_id='{user.id}', id='{nonexistent_digest_id}'.",
         )
@@ -99,9 +91,7 @@ def test_delete_digest_by_id_digest_not_found(client: TestClient) -> None:
     assert "Digest" in response_data["detail"]
     assert nonexistent_digest_id in response_data["detail"]
 
-    mock_find_digest.assert_called_once_with(
-        ANY, user_id=user.id, id=nonexistent_digest_id
-    )
+    mock_delete.assert_called_once_with(ANY, user_id=user.id, id=nonexistent_digest_id)
 
 
 @pytest.mark.unit
@@ -112,12 +102,7 @@ def test_delete_digest_by_id_integrity_error(client: TestClient) -> None:
     user_id = user.id
     digest = DigestFactory.create(user=user)
 
-    with (
-        patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
-        ) as mock_find_digest,
-        patch("app.api.routes.digest.Digest.delete") as mock_delete,
-    ):
+    with patch("app.api.routes.digest.Digest.delete_by_or_raise") as mock_delete:
         mock_delete.side_effect = IntegrityError(
             statement="DELETE FROM digests",
             params=None,
@@ -133,9 +118,8 @@ def test_delete_digest_by_id_integrity_error(client: TestClient) -> None:
     assert "detail" in response_data
     assert "constraint violation" in response_data["detail"].lower()
 
-    mock_find_digest.assert_called_once_with(
+    mock_delete.assert_called_once_with(
         ANY,
         user_id=user_id,
         id=digest.id,
     )
-    mock_delete.assert_called_once_with(ANY, digest)
@@ -11,7 +11,12 @@ from pydantic import ValidationError
 from sqlalchemy.exc import DatabaseError
 
 from app.models import Criteria
-from app.schemas.digest import CriteriaResponse, DigestPeptidesResponse, PeptideResponse
+from app.schemas.digest import (
+    CriteriaResponse,
+    DigestPeptidesResponse,
+    PeptideQueryParams,
+    PeptideResponse,
+)
 from tests.factories import DigestFactory, PeptideFactory, UserFactory
 
 
@@ -57,13 +62,13 @@ def test_get_digest_peptides_by_id_success(
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
         patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+            "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
         ) as mock_get_digest,
         patch(
-            "app.api.routes.digest.Peptide.find_by_digest_id_ordered_by_rank_or_raise",
+            "app.api.routes.digest.Peptide.afind_by_digest_id_ordered_by_rank_or_raise",
             return_value=peptides,
         ) as mock_get_peptides,
         patch(
@@ -87,9 +92,17 @@ def test_get_digest_peptides_by_id_success(
 
     mock_get_user.assert_called_once_with(ANY, id=user.id)
     mock_get_digest.assert_called_once_with(ANY, user_id=user.id, id=digest.id)
-    mock_get_peptides.assert_called_once_with(ANY, digest_id=digest.id)
+    mock_get_peptides.assert_called_once_with(
+        ANY,
+        digest_id=digest.id,
+        filters=PeptideQueryParams(),
+        digest_sequence=digest.sequence,
+        fields=[],
+    )
     mock_get_criteria_ordered_by_rank.assert_called_once()
-    mock_from_peptides.assert_called_once_with(digest.id, peptides, criteria)
+    mock_from_peptides.assert_called_once_with(
+        digest.id, peptides, criteria, next_after_rank=None, fields=[]
+    )
 
 
 @pytest.mark.unit
@@ -99,7 +112,7 @@ def test_get_digest_peptides_user_not_found(client: TestClient) -> None:
     user_id = "non-existent-user-id"
     digest = DigestFactory.create()
 
-    with patch("app.api.routes.digest.User.find_one_by_or_raise") as mock_get_user:
+    with patch("app.api.routes.digest.User.aexists_by_or_raise") as mock_get_user:
         mock_get_user.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No User records found with id={user_id!r}.",
@@ -124,9 +137,9 @@ def test_get_digest_peptides_digest_not_found(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
-        patch("app.api.routes.digest.Digest.find_one_by_or_raise") as mock_get_digest,
+        patch("app.api.routes.digest.Digest.afind_one_by_or_raise") as mock_get_digest,
     ):
         mock_get_digest.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,9 +169,9 @@ def test_get_digest_peptides_digest_belongs_to_different_user(
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
-        patch("app.api.routes.digest.Digest.find_one_by_or_raise") as mock_get_digest,
+        patch("app.api.routes.digest.Digest.afind_one_by_or_raise") as mock_get_digest,
     ):
         mock_get_digest.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -185,13 +198,13 @@ def test_get_digest_peptides_no_peptides_found(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
         patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+            "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
         ) as mock_get_digest,
         patch(
-            "app.api.routes.digest.Peptide.find_by_digest_id_ordered_by_rank_or_raise"
+            "app.api.routes.digest.Peptide.afind_by_digest_id_ordered_by_rank_or_raise"
         ) as mock_get_peptides,
     ):
         mock_get_peptides.side_effect = HTTPException(
@@ -208,7 +221,13 @@ def test_get_digest_peptides_no_peptides_found(client: TestClient) -> None:
     assert digest.id in data["detail"]
     mock_get_user.assert_called_once_with(ANY, id=user.id)
     mock_get_digest.assert_called_once_with(ANY, user_id=user.id, id=digest.id)
-    mock_get_peptides.assert_called_once_with(ANY, digest_id=digest.id)
+    mock_get_peptides.assert_called_once_with(
+        ANY,
+        digest_id=digest.id,
+        filters=PeptideQueryParams(),
+        digest_sequence=digest.sequence,
+        fields=[],
+    )
 
 
 @pytest.mark.unit
@@ -221,13 +240,13 @@ def test_get_digest_peptides_database_error(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
         patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+            "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
         ) as mock_get_digest,
         patch(
-            "app.api.routes.digest.Peptide.find_by_digest_id_ordered_by_rank_or_raise",
+            "app.api.routes.digest.Peptide.afind_by_digest_id_ordered_by_rank_or_raise",
             return_value=peptides,
         ) as mock_get_peptides,
         patch(
@@ -247,7 +266,13 @@ def test_get_digest_peptides_database_error(client: TestClient) -> None:
     assert "database error" in data["detail"].lower()
     mock_get_user.assert_called_once_with(ANY, id=user.id)
     mock_get_digest.assert_called_once_with(ANY, user_id=user.id, id=digest.id)
-    mock_get_peptides.assert_called_once_with(ANY, digest_id=digest.id)
+    mock_get_peptides.assert_called_once_with(
+        ANY,
+        digest_id=digest.id,
+        filters=PeptideQueryParams(),
+        digest_sequence=digest.sequence,
+        fields=[],
+    )
     mock_get_criteria_ordered_by_rank.assert_called_once()
 
 
@@ -265,13 +290,13 @@ def test_get_digest_peptides_validation_error(
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
         patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+            "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
         ) as mock_get_digest,
         patch(
-            "app.api.routes.digest.Peptide.find_by_digest_id_ordered_by_rank_or_raise",
+            "app.api.routes.digest.Peptide.afind_by_digest_id_ordered_by_rank_or_raise",
             return_value=peptides,
         ) as mock_get_peptides,
         patch(
@@ -310,9 +335,17 @@ def test_get_digest_peptides_validation_error(
     )
     mock_get_user.assert_called_once_with(ANY, id=user.id)
     mock_get_digest.assert_called_once_with(ANY, user_id=user.id, id=digest.id)
-    mock_get_peptides.assert_called_once_with(ANY, digest_id=digest.id)
+    mock_get_peptides.assert_called_once_with(
+        ANY,
+        digest_id=digest.id,
+        filters=PeptideQueryParams(),
+        digest_sequence=digest.sequence,
+        fields=[],
+    )
     mock_get_criteria_ordered_by_rank.assert_called_once()
-    mock_from_peptides.assert_called_once_with(digest.id, peptides, criteria)
+    mock_from_peptides.assert_called_once_with(
+        digest.id, peptides, criteria, next_after_rank=None, fields=[]
+    )
 
 
 @pytest.mark.unit
@@ -332,13 +365,13 @@ def test_get_digest_peptides_attribute_error(
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
+            "app.api.routes.digest.User.aexists_by_or_raise", return_value=None
         ) as mock_get_user,
         patch(
-            "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+            "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
         ) as mock_get_digest,
         patch(
-            "app.api.routes.digest.Peptide.find_by_digest_id_ordered_by_rank_or_raise",
+            "app.api.routes.digest.Peptide.afind_by_digest_id_ordered_by_rank_or_raise",
             return_value=peptides,
         ) as mock_get_peptides,
         patch(
@@ -365,9 +398,17 @@ def test_get_digest_peptides_attribute_error(
     )
     mock_get_user.assert_called_once_with(ANY, id=user.id)
     mock_get_digest.assert_called_once_with(ANY, user_id=user.id, id=digest.id)
-    mock_get_peptides.assert_called_once_with(ANY, digest_id=digest.id)
+    mock_get_peptides.assert_called_once_with(
+        ANY,
+        digest_id=digest.id,
+        filters=PeptideQueryParams(),
+        digest_sequence=digest.sequence,
+        fields=[],
+    )
     mock_get_criteria_ordered_by_rank.assert_called_once_with()
-    mock_from_peptides.assert_called_once_with(digest.id, peptides, criteria)
+    mock_from_peptides.assert_called_once_with(
+        digest.id, peptides, criteria, next_after_rank=None, fields=[]
+    )
 
 
 @pytest.mark.unit
@@ -377,7 +418,7 @@ def test_get_digest_peptides_unexpected_error(client: TestClient) -> None:
     user = UserFactory.build()
     digest = DigestFactory.build(user=user)
 
-    with (patch("app.api.routes.digest.User.find_one_by_or_raise") as mock_get_user,):
+    with (patch("app.api.routes.digest.User.aexists_by_or_raise") as mock_get_user,):
         mock_get_user.side_effect = RuntimeError("Unexpected runtime error")
 
         # execute
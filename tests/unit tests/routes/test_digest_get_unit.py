@@ -20,7 +20,7 @@ def test_get_digest_by_id_success(client: TestClient) -> None:
     digest = DigestFactory.create(user=user, status=DigestStatusEnum.COMPLETED)
 
     with patch(
-        "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+        "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
     ) as mock_find_digest:
         # execute
         response = client.get(f"/api/v1/digest/{user.id}/{digest.id}")
@@ -49,7 +49,7 @@ def test_get_digest_by_id_processing(client: TestClient) -> None:
     digest = DigestFactory.create(user=user, status=DigestStatusEnum.PROCESSING)
 
     with patch(
-        "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+        "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
     ) as mock_find_digest:
         # execute
         response = client.get(f"/api/v1/digest/{user.id}/{digest.id}")
@@ -75,7 +75,7 @@ def test_get_digest_by_id_failed(client: TestClient) -> None:
     digest = DigestFactory.create(user=user, status=DigestStatusEnum.FAILED)
 
     with patch(
-        "app.api.routes.digest.Digest.find_one_by_or_raise", return_value=digest
+        "app.api.routes.digest.Digest.afind_one_by_or_raise", return_value=digest
     ) as mock_find_digest:
         # execute
         response = client.get(f"/api/v1/digest/{user.id}/{digest.id}")
@@ -100,7 +100,9 @@ def test_get_digest_by_id_not_found(client: TestClient) -> None:
     user = UserFactory.build()
     nonexistent_digest_id = "fc502bbe-5a1b-4f99-b716-e1970db2aef7"
 
-    with patch("app.api.routes.digest.Digest.find_one_by_or_raise") as mock_find_digest:
+    with patch(
+        "app.api.routes.digest.Digest.afind_one_by_or_raise"
+    ) as mock_find_digest:
         mock_find_digest.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No Digest records found with user_id='{user.id}', id='{nonexistent_digest_id}'.",
@@ -130,7 +132,9 @@ def test_get_digest_by_id_user_not_found(client: TestClient) -> None:
     nonexistent_user_id = "fc502bbe-5a1b-4f99-b716-e1970db2aef7"
     digest_id = "some-digest-id"
 
-    with patch("app.api.routes.digest.Digest.find_one_by_or_raise") as mock_find_digest:
+    with patch(
+        "app.api.routes.digest.Digest.afind_one_by_or_raise"
+    ) as mock_find_digest:
         mock_find_digest.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No Digest records found with user_id='{nonexistent_user_id}', id='{digest_id}'.",
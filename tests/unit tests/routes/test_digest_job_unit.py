@@ -31,11 +31,8 @@ def test_create_digest_job_success(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
-        ) as mock_get_user,
-        patch(
-            "app.api.routes.digest.request_within_digest_limit_or_exception"
-        ) as mock_limit_check,
+            "app.api.routes.digest.request_user_within_digest_limit_or_exception"
+        ) as mock_user_limit_check,
         patch(
             "app.api.routes.digest.Digest.create", return_value=digest
         ) as mock_create,
@@ -56,8 +53,7 @@ def test_create_digest_job_success(client: TestClient) -> None:
     data = response.json()
     assert data["digest_id"] == digest.id
 
-    mock_get_user.assert_called_once_with(ANY, id=user.id)
-    mock_limit_check.assert_called_once()
+    mock_user_limit_check.assert_called_once_with(user.id, ANY)
     mock_create.assert_called_once()
     mock_from_digest.assert_called_once_with(digest)
     mock_process_job.assert_called_once_with(protein_domain)
@@ -74,8 +70,10 @@ def test_create_digest_job_user_not_found(client: TestClient) -> None:
         "sequence": "MKTAYIAKQR",
     }
 
-    with patch("app.api.routes.digest.User.find_one_by_or_raise") as mock_get_user:
-        mock_get_user.side_effect = HTTPException(
+    with patch(
+        "app.api.routes.digest.request_user_within_digest_limit_or_exception"
+    ) as mock_user_limit_check:
+        mock_user_limit_check.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No User records found with id='fc502bbe-5a1b-4f99-b716-e1970db2aef7'.",
         )
@@ -90,8 +88,8 @@ def test_create_digest_job_user_not_found(client: TestClient) -> None:
     assert response.status_code == 404
     data = response.json()
     assert "fc502bbe-5a1b-4f99-b716-e1970db2aef7" in data["detail"]
-    mock_get_user.assert_called_once_with(
-        ANY, id="fc502bbe-5a1b-4f99-b716-e1970db2aef7"
+    mock_user_limit_check.assert_called_once_with(
+        "fc502bbe-5a1b-4f99-b716-e1970db2aef7", ANY
     )
 
 
@@ -109,11 +107,8 @@ def test_create_digest_job_integrity_error(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
-        ) as mock_get_user,
-        patch(
-            "app.api.routes.digest.request_within_digest_limit_or_exception"
-        ) as mock_limit_check,
+            "app.api.routes.digest.request_user_within_digest_limit_or_exception"
+        ) as mock_user_limit_check,
         patch("app.api.routes.digest.Digest.create") as mock_create,
     ):
         mock_create.side_effect = IntegrityError(
@@ -133,8 +128,7 @@ def test_create_digest_job_integrity_error(client: TestClient) -> None:
         "database constraint violation" in data["detail"].lower()
         or "constraint" in data["detail"].lower()
     )
-    mock_get_user.assert_called_once_with(ANY, id=user.id)
-    mock_limit_check.assert_called_once()
+    mock_user_limit_check.assert_called_once_with(user.id, ANY)
     mock_create.assert_called_once()
 
 
@@ -152,11 +146,8 @@ def test_create_digest_job_value_error(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.User.find_one_by_or_raise", return_value=user
-        ) as mock_get_user,
-        patch(
-            "app.api.routes.digest.request_within_digest_limit_or_exception"
-        ) as mock_limit_check,
+            "app.api.routes.digest.request_user_within_digest_limit_or_exception"
+        ) as mock_user_limit_check,
         patch("app.api.routes.digest.Digest.create") as mock_create,
     ):
         mock_create.side_effect = ValueError("Invalid digest job data")
@@ -171,6 +162,5 @@ def test_create_digest_job_value_error(client: TestClient) -> None:
     assert response.status_code == 400
     data = response.json()
     assert "invalid digest job data" in data["detail"].lower()
-    mock_get_user.assert_called_once_with(ANY, id=user.id)
-    mock_limit_check.assert_called_once()
+    mock_user_limit_check.assert_called_once_with(user.id, ANY)
     mock_create.assert_called_once()
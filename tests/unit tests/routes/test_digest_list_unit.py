@@ -22,7 +22,8 @@ def test_get_digests_by_id_success(client: TestClient) -> None:
 
     with (
         patch(
-            "app.api.routes.digest.Digest.find_by", return_value=digests
+            "app.api.routes.digest.Digest.afind_page_by_user_id",
+            return_value=digests,
         ) as mock_find_digests,
     ):
         # execute
@@ -38,4 +39,8 @@ def test_get_digests_by_id_success(client: TestClient) -> None:
     assert data["digests"][0]["user_id"] == user_id
     assert data["digests"][1]["user_id"] == user_id
 
-    mock_find_digests.assert_called_once_with(ANY, user_id=user_id)
+    assert data["next_cursor"] is None
+
+    mock_find_digests.assert_called_once_with(
+        ANY, user_id, include_sequence=False, limit=20, before=None, fields=[]
+    )
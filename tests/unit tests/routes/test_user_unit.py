@@ -8,30 +8,28 @@ from unittest.mock import ANY, patch
 import pytest
 from fastapi import HTTPException, status
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
 
 from tests.factories import UserCreateFactory, UserFactory
 
 
 @pytest.mark.unit
-def test_create_user(client: TestClient) -> None:
-    """Test creating a new user with all functions patched."""
+def test_create_or_retrieve_user(client: TestClient) -> None:
+    """Test creating or updating a user through the upsert with all functions patched."""
     # setup
     user_request = UserCreateFactory.build()
     user_request_dict = user_request.model_dump()
     now = datetime.datetime.now(datetime.UTC)
-    new_user = UserFactory.build(
+    user = UserFactory.build(
         username=user_request.username,
         email=user_request.email,
         created_at=now,
         updated_at=now,
     )
 
-    with (
-        patch(
-            "app.api.routes.users.User.find_one_by", return_value=None
-        ) as mock_find_one_by,
-        patch("app.api.routes.users.User.create", return_value=new_user) as mock_create,
-    ):
+    with patch(
+        "app.api.routes.users.User.upsert_by_email", return_value=user
+    ) as mock_upsert:
         # execute
         response = client.post(
             "/api/v1/users",
@@ -43,64 +41,31 @@ def test_create_user(client: TestClient) -> None:
     data = response.json()
     assert data["username"] == user_request.username
     assert data["email"] == user_request.email
-    assert data["id"] == new_user.id
+    assert data["id"] == user.id
 
-    mock_find_one_by.assert_called_once_with(ANY, email=user_request.email)
-    mock_create.assert_called_once()
+    mock_upsert.assert_called_once_with(
+        ANY,
+        username=user_request.username,
+        email=user_request.email,
+        commit=False,
+    )
 
 
 @pytest.mark.unit
-def test_update_user(client: TestClient) -> None:
-    """Test updating an existing user with all functions patched."""
+def test_create_or_retrieve_user_integrity_error(client: TestClient) -> None:
+    """Test that a constraint violation during the upsert returns 400."""
     # setup
     user_request = UserCreateFactory.build()
-    user_request_dict = user_request.model_dump()
-    now = datetime.datetime.now(datetime.UTC)
-    existing_user = UserFactory.build(
-        username="foobar",
-        email=user_request.email,
-        created_at=now,
-        updated_at=now,
-    )
-    updated_user = UserFactory.build(
-        id=existing_user.id,
-        username=user_request.username,
-        email=user_request.email,
-        created_at=now,
-        updated_at=now,
-    )
 
-    with (
-        patch(
-            "app.api.routes.users.User.find_one_by", return_value=existing_user
-        ) as mock_find_one_by,
-        patch(
-            "app.api.routes.users.User.update", return_value=updated_user
-        ) as mock_update,
-    ):
+    with patch("app.api.routes.users.User.upsert_by_email") as mock_upsert:
+        mock_upsert.side_effect = IntegrityError("INSERT", {}, Exception("dup"))
+
         # execute
-        response = client.post(
-            "/api/v1/users",
-            json=user_request_dict,
-        )
+        response = client.post("/api/v1/users", json=user_request.model_dump())
 
     # validate
-    assert response.status_code == 201
-    data = response.json()
-    assert data["username"] == user_request.username
-    assert data["email"] == user_request.email
-    assert data["id"] == existing_user.id
-    assert data["username"] != "foobar"
-
-    mock_find_one_by.assert_called_once_with(ANY, email=user_request.email)
-    mock_update.assert_called_once_with(
-        ANY,
-        existing_user,
-        values={
-            "username": user_request.username,
-            "updated_at": ANY,
-        },
-    )
+    assert response.status_code == 400
+    assert "database constraint violation" in response.json()["detail"]
 
 
 @pytest.mark.unit
@@ -109,12 +74,9 @@ def test_delete_user_by_id_success(client: TestClient) -> None:
     # setup
     user = UserFactory.build()
 
-    with (
-        patch(
-            "app.api.routes.users.User.find_one_by_or_raise", return_value=user
-        ) as mock_find_one,
-        patch("app.api.routes.users.User.delete") as mock_delete,
-    ):
+    with patch(
+        "app.api.routes.users.User.delete_by_or_raise", return_value=1
+    ) as mock_delete:
         # execute
         response = client.delete(f"/api/v1/users/id/{user.id}")
 
@@ -122,16 +84,15 @@ def test_delete_user_by_id_success(client: TestClient) -> None:
     assert response.status_code == 204
     assert response.content == b""
 
-    mock_find_one.assert_called_once_with(ANY, id=user.id)
-    mock_delete.assert_called_once_with(ANY, user)
+    mock_delete.assert_called_once_with(ANY, id=user.id)
 
 
 @pytest.mark.unit
 def test_delete_user_by_id_no_user_found(client: TestClient) -> None:
     """Test delete user when user is not found with all functions patched."""
     # setup
-    with patch("app.api.routes.users.User.find_one_by_or_raise") as mock_find_one:
-        mock_find_one.side_effect = HTTPException(
+    with patch("app.api.routes.users.User.delete_by_or_raise") as mock_delete:
+        mock_delete.side_effect = HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No User records found with id='id_wont_be_found'.",
         )
@@ -146,4 +107,4 @@ def test_delete_user_by_id_no_user_found(client: TestClient) -> None:
     assert "User" in response_data["detail"]
     assert "id_wont_be_found" in response_data["detail"]
 
-    mock_find_one.assert_called_once_with(ANY, id="id_wont_be_found")
+    mock_delete.assert_called_once_with(ANY, id="id_wont_be_found")